@@ -1,18 +1,68 @@
 import requests
+import difflib
+import hashlib
 import json
 import os
-from typing import List, Dict, Any
+import re
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import List, Dict, Any, Optional, Tuple
 
 COOK_COUNTY_API_URL = "https://datacatalog.cookcountyil.gov/api/views/metadata/v1"
 KEYWORDS = ["industrial", "property", "zoning"]
 FIELDS_OF_INTEREST = ["PIN", "property id", "zoning", "square footage", "construction year", "address"]
 SCHEMA_DIR = os.path.join(os.path.dirname(__file__), '../../data/schemas')
+CATALOG_CACHE_PATH = os.path.join(os.path.dirname(__file__), '../../data/cache/catalog.json')
+NORMALIZATION_CACHE_PATH = os.path.join(os.path.dirname(__file__), '../../data/cache/field_normalization.json')
 os.makedirs(SCHEMA_DIR, exist_ok=True)
+STANDARD_FIELDS = ["property_id", "zoning", "square_feet", "construction_year", "address", "latitude", "longitude"]
+FIELD_SYNONYMS = {
+    "property_id": ["pin", "parcel", "apn", "propid", "acct"],
+    "zoning": ["zoning", "zone", "zn", "landuse"],
+    "square_feet": ["sqft", "footage", "gba", "sqfeet"],
+    "construction_year": ["yrblt", "blt", "built", "yearbuilt", "construct", "construction", "constructed"],
+    "address": ["address", "addr", "situs"],
+    "latitude": ["latitude", "lat"],
+    "longitude": ["longitude", "lon", "lng"]
+}
+FUZZY_CUTOFF = 0.8
+# Synonyms this short only match exactly ("lat" must not match "flat")
+FUZZY_MIN_LENGTH = 5
+# Backends whose answers are cached; fuzzy guesses are cheap to recompute
+# and must not outlive a later switch to a better backend
+CACHED_BACKENDS = {"openai"}
+OPENAI_BATCH_SIZE = 200
+DISCOVERY_WORKERS = int(os.getenv("DISCOVERY_WORKERS", 8))
 
-def query_api_catalog() -> List[Dict[str, Any]]:
-    response = requests.get(COOK_COUNTY_API_URL)
+def load_catalog_cache() -> Dict[str, Any]:
+    try:
+        with open(CATALOG_CACHE_PATH, "r") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def query_api_catalog() -> Tuple[List[Dict[str, Any]], bool]:
+    """Fetch the catalog, revalidating the cached copy with ETag/Last-Modified.
+    Returns (catalog, modified); modified is False when the cache was reused."""
+    cached = load_catalog_cache()
+    headers = {}
+    if cached.get("etag"):
+        headers["If-None-Match"] = cached["etag"]
+    if cached.get("last_modified"):
+        headers["If-Modified-Since"] = cached["last_modified"]
+    response = requests.get(COOK_COUNTY_API_URL, headers=headers)
+    if response.status_code == 304 and "catalog" in cached:
+        print("Catalog not modified, using cached copy")
+        return cached["catalog"], False
     response.raise_for_status()
-    return response.json()
+    catalog = response.json()
+    os.makedirs(os.path.dirname(CATALOG_CACHE_PATH), exist_ok=True)
+    with open(CATALOG_CACHE_PATH, "w") as f:
+        json.dump({
+            "etag": response.headers.get("ETag"),
+            "last_modified": response.headers.get("Last-Modified"),
+            "catalog": catalog
+        }, f)
+    return catalog, True
 
 def extract_datasets(catalog: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
     datasets = []
@@ -23,19 +73,19 @@ def extract_datasets(catalog: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
             datasets.append(dataset)
     return datasets
 
-def parse_schema(dataset: Dict[str, Any]) -> List[Dict[str, str]]:
+def parse_schema(dataset: Dict[str, Any], normalized: Optional[Dict[str, str]] = None) -> List[Dict[str, str]]:
     fields = []
     columns = dataset.get('columns', [])
+    if normalized is None:
+        normalized = normalize_fields([col.get('fieldName', '') for col in columns])
     for col in columns:
         field_name = col.get('fieldName', '')
         field_type = col.get('dataTypeName', '')
-        normalized = normalize_field(field_name)
-        fields.append({"original": field_name, "normalized": normalized, "type": field_type})
+        fields.append({"original": field_name, "normalized": normalized[field_name], "type": field_type})
     return fields
 
-def normalize_field(field_name: str) -> str:
+def rule_normalize(field_name: str) -> Optional[str]:
     name = field_name.lower()
-    # Local rules
     if "pin" in name or "property_id" in name:
         return "property_id"
     if "zoning" in name:
@@ -50,27 +100,120 @@ def normalize_field(field_name: str) -> str:
         return "latitude"
     if "lon" in name or "lng" in name:
         return "longitude"
-    
-    # Use OpenAI API for advanced normalization
+    return None
+
+def load_normalization_cache() -> Dict[str, Dict[str, str]]:
+    """Cached normalizations per backend: {backend: {field_name: normalized}}"""
     try:
-        from openai import OpenAI
-        client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
-        prompt = f"Normalize the field name '{field_name}' to a standard property schema field (e.g., square_feet, property_id, zoning, construction_year, address, latitude, longitude). Return only the normalized field name."
+        with open(NORMALIZATION_CACHE_PATH, "r") as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    # Entries from the old flat {field_name: normalized} layout are dropped
+    return {k: v for k, v in cache.items() if isinstance(v, dict)} if isinstance(cache, dict) else {}
+
+def save_normalization_cache(cache: Dict[str, Dict[str, str]]):
+    os.makedirs(os.path.dirname(NORMALIZATION_CACHE_PATH), exist_ok=True)
+    tmp_path = NORMALIZATION_CACHE_PATH + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(cache, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, NORMALIZATION_CACHE_PATH)
+
+def _tokens(field_name: str) -> List[str]:
+    spaced = re.sub(r"([a-z])([A-Z])", r"\1 \2", field_name)
+    return [t for t in re.split(r"[^a-z0-9]+", spaced.lower()) if t]
+
+def fuzzy_normalize(field_names: List[str]) -> Dict[str, str]:
+    """Offline backend: match name tokens against per-field synonyms"""
+    result = {}
+    for field_name in field_names:
+        tokens = _tokens(field_name)
+        best, best_score = None, 0.0
+        for standard, synonyms in FIELD_SYNONYMS.items():
+            score = 0.0
+            for token in tokens:
+                if token in synonyms:
+                    score += 1.0
+                    continue
+                long_synonyms = [s for s in synonyms if len(s) >= FUZZY_MIN_LENGTH]
+                match = difflib.get_close_matches(token, long_synonyms, n=1, cutoff=FUZZY_CUTOFF)
+                if match:
+                    score += difflib.SequenceMatcher(None, token, match[0]).ratio()
+            if score > best_score:
+                best, best_score = standard, score
+        if best is not None:
+            result[field_name] = best
+    return result
+
+def openai_normalize(field_names: List[str]) -> Dict[str, str]:
+    """Normalize many field names with one chat completion per batch"""
+    from openai import OpenAI
+    client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+    result = {}
+    for start in range(0, len(field_names), OPENAI_BATCH_SIZE):
+        batch = field_names[start:start + OPENAI_BATCH_SIZE]
+        prompt = (
+            "Normalize each of these field names to a standard property schema field "
+            f"({', '.join(STANDARD_FIELDS)}), or repeat the name unchanged if none fits. "
+            "Return only a JSON object mapping each original name to its normalized name.\n"
+            + json.dumps(batch)
+        )
         response = client.chat.completions.create(
             model="gpt-3.5-turbo",
             messages=[{"role": "user", "content": prompt}],
-            max_tokens=10
+            max_tokens=20 * len(batch) + 20
         )
-        normalized = response.choices[0].message.content.strip()
+        content = response.choices[0].message.content.strip()
+        content = content.strip("`").removeprefix("json").strip()
+        mapping = json.loads(content)
+        result.update({k: v for k, v in mapping.items() if k in batch and isinstance(v, str) and v})
+    return result
+
+NORMALIZER_BACKENDS = {
+    "openai": openai_normalize,
+    "fuzzy": fuzzy_normalize
+}
+
+def normalizer_backend() -> str:
+    default = "openai" if os.getenv("OPENAI_API_KEY") else "fuzzy"
+    return os.getenv("FIELD_NORMALIZER", default)
+
+def normalize_fields(field_names: List[str], backend: Optional[str] = None) -> Dict[str, str]:
+    """Normalize field names via local rules, then the backend's on-disk
+    cache, then one batched call to the backend for whatever is left."""
+    result = {}
+    backend = backend or normalizer_backend()
+    cache = load_normalization_cache()
+    cached = cache.get(backend, {})
+    unresolved = []
+    for field_name in field_names:
+        if field_name in result:
+            continue
+        normalized = rule_normalize(field_name) or cached.get(field_name)
         if normalized:
-            return normalized
-    except Exception as e:
-        print(f"OpenAI normalization failed: {e}")
-        pass
-    return field_name
+            result[field_name] = normalized
+        elif field_name not in unresolved:
+            unresolved.append(field_name)
+
+    if unresolved:
+        try:
+            resolved = NORMALIZER_BACKENDS[backend](unresolved)
+        except Exception as e:
+            print(f"{backend} normalization failed: {e}")
+            resolved = {}
+        if resolved and backend in CACHED_BACKENDS:
+            cache[backend] = {**cached, **resolved}
+            save_normalization_cache(cache)
+        for field_name in unresolved:
+            # Unresolved names are not cached so a later run can retry them
+            result[field_name] = resolved.get(field_name, field_name)
+    return result
+
+def normalize_field(field_name: str) -> str:
+    return normalize_fields([field_name])[field_name]
 
 def detect_fields_of_interest(fields: List[Dict[str, str]]) -> List[Dict[str, str]]:
-    return [f for f in fields if f["normalized"] in ["property_id", "zoning", "square_feet", "construction_year", "address", "latitude", "longitude"]]
+    return [f for f in fields if f["normalized"] in STANDARD_FIELDS]
 
 def detect_response_format(dataset: Dict[str, Any]) -> str:
     return dataset.get('viewType', 'json')
@@ -78,66 +221,125 @@ def detect_response_format(dataset: Dict[str, Any]) -> str:
 def check_auth_required(dataset: Dict[str, Any]) -> bool:
     return dataset.get('requiresApiKey', False)
 
-def detect_rate_limits(dataset_id: str) -> Dict[str, Any]:
-    # Try a sample request to the dataset endpoint
-    sample_url = f"https://datacatalog.cookcountyil.gov/resource/{dataset_id}.json?$limit=1"
+def detect_rate_limits(dataset_id: str, probe: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """Try a sample request to the dataset's own endpoint: the ``probe``
+    ingestion sources describe, else the Cook County resource"""
+    if probe is None:
+        probe = {"url": f"https://datacatalog.cookcountyil.gov/resource/{dataset_id}.json", "params": {"$limit": 1}}
     try:
-        resp = requests.get(sample_url)
-        if resp.status_code == 429:
-            limit = resp.headers.get('X-RateLimit-Limit', None)
-            return {"requests_per_minute": int(limit) if limit else None}
+        # Streamed, so probing a CSV export does not download it
+        with requests.get(probe["url"], params=probe.get("params"), stream=True, timeout=30) as resp:
+            if resp.status_code == 429:
+                limit = resp.headers.get('X-RateLimit-Limit', None)
+                return {"requests_per_minute": int(limit) if limit else None}
     except Exception:
         pass
     return {"requests_per_minute": 60}  # Default assumption
 
-def save_metadata(dataset_id: str, metadata: Dict[str, Any]):
+def content_hash(obj: Any) -> str:
+    return hashlib.sha256(json.dumps(obj, sort_keys=True).encode()).hexdigest()
+
+def load_metadata(dataset_id: str) -> Dict[str, Any]:
+    try:
+        with open(os.path.join(SCHEMA_DIR, f"{dataset_id}.json"), "r") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def save_metadata(dataset_id: str, metadata: Dict[str, Any]) -> bool:
+    """Write the schema file unless its content is unchanged; returns True if written"""
     path = os.path.join(SCHEMA_DIR, f"{dataset_id}.json")
+    if load_metadata(dataset_id) == metadata:
+        return False
     with open(path, "w") as f:
         json.dump(metadata, f, indent=2)
+    return True
+
+def dataset_changed(dataset: Dict[str, Any]) -> bool:
+    return load_metadata(dataset.get('id', 'unknown')).get("source_hash") != content_hash(dataset)
+
+def process_dataset(dataset: Dict[str, Any], normalized: Dict[str, str]) -> str:
+    dataset_id = dataset.get('id', 'unknown')
+    fields = parse_schema(dataset, normalized)
+    metadata = {
+        "dataset_id": dataset_id,
+        "name": dataset.get('name', ''),
+        "description": dataset.get('description', ''),
+        "fields": fields,
+        "fields_of_interest": detect_fields_of_interest(fields),
+        "response_format": detect_response_format(dataset),
+        "auth_required": check_auth_required(dataset),
+        "rate_limits": detect_rate_limits(dataset_id, dataset.get('probe')),
+        "source_hash": content_hash(dataset)
+    }
+    if "config_hash" in dataset:
+        metadata["config_hash"] = dataset["config_hash"]
+    if save_metadata(dataset_id, metadata):
+        return f"Processed dataset: {dataset_id}"
+    return f"Unchanged dataset: {dataset_id}"
 
 def main():
+    # Ingestion sources are only probed again when the catalog changed
+    catalog_modified = False
     try:
-        catalog = query_api_catalog()
+        catalog, catalog_modified = query_api_catalog()
         datasets = extract_datasets(catalog)
         print(f"Found {len(datasets)} relevant datasets")
         
-        for dataset in datasets:
-            dataset_id = dataset.get('id', 'unknown')
-            fields = parse_schema(dataset)
-            fields_of_interest = detect_fields_of_interest(fields)
-            response_format = detect_response_format(dataset)
-            auth_required = check_auth_required(dataset)
-            rate_limits = detect_rate_limits(dataset_id)
-            
-            metadata = {
-                "dataset_id": dataset_id,
-                "name": dataset.get('name', ''),
-                "description": dataset.get('description', ''),
-                "fields": fields,
-                "fields_of_interest": fields_of_interest,
-                "response_format": response_format,
-                "auth_required": auth_required,
-                "rate_limits": rate_limits
-            }
-            
-            save_metadata(dataset_id, metadata)
-            print(f"Processed dataset: {dataset_id}")
+        # Datasets whose catalog entry is unchanged keep their schema file
+        changed = [dataset for dataset in datasets if dataset_changed(dataset)]
+        print(f"{len(datasets) - len(changed)} datasets unchanged since last run")
+        
+        # Normalize every column name of the changed datasets in one batch
+        normalized = normalize_fields([
+            col.get('fieldName', '') for dataset in changed for col in dataset.get('columns', [])
+        ])
+        
+        process_datasets(changed, normalized)
             
     except Exception as e:
         print(f"API discovery failed: {e}")
+    
+    discover_sources(refresh=catalog_modified)
 
-if __name__ == "__main__":
-    main()
-        rate_limit = detect_rate_limits(dataset_id)
-        metadata = {
-            "dataset_id": dataset_id,
-            "fields": fields_of_interest,
-            "auth_required": auth_required,
-            "rate_limit": rate_limit,
-            "response_format": response_format
-        }
-        save_metadata(dataset_id, metadata)
-        print(f"Saved metadata for dataset {dataset_id}")
+def process_datasets(datasets: List[Dict[str, Any]], normalized: Dict[str, str]):
+    with ThreadPoolExecutor(max_workers=DISCOVERY_WORKERS) as pool:
+        futures = {pool.submit(process_dataset, dataset, normalized): dataset for dataset in datasets}
+        for future in as_completed(futures):
+            try:
+                print(future.result())
+            except Exception as e:
+                print(f"Failed to process dataset {futures[future].get('id', 'unknown')}: {e}")
+
+def source_config_changed(config: Dict[str, Any]) -> bool:
+    schema_id = config.get("schema", config["name"])
+    return load_metadata(schema_id).get("config_hash") != content_hash(config)
+
+def discover_sources(refresh: bool = True, sources: Optional[List[Dict[str, Any]]] = None):
+    """Write schema files for the ingestion sources (Socrata, ArcGIS, CSV),
+    whose field mappings fetch --sources applies. Without ``refresh`` only
+    sources whose config changed (or that have no schema file) are described."""
+    from ..data_extraction.sources import describe_sources, load_sources
+
+    configs = load_sources() if sources is None else sources
+    if not refresh:
+        configs = [config for config in configs if source_config_changed(config)]
+    if not configs:
+        print("Ingestion sources unchanged since last run")
+        return
+    config_hashes = {config.get("schema", config["name"]): content_hash(config) for config in configs}
+    datasets = []
+    for dataset, failure in describe_sources(configs):
+        if failure:
+            print(f"Failed to describe source {failure[0]}: {failure[1]}")
+            continue
+        dataset["config_hash"] = config_hashes[dataset["id"]]
+        if dataset_changed(dataset):
+            datasets.append(dataset)
+    normalized = normalize_fields([
+        col.get('fieldName', '') for dataset in datasets for col in dataset.get('columns', [])
+    ])
+    process_datasets(datasets, normalized)
 
 if __name__ == "__main__":
     main()
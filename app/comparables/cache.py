@@ -0,0 +1,81 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional
+
+
+class ResultCache:
+    """Thread-safe LRU cache with a per-entry time to live.
+
+    ``maxsize`` bounds the number of entries (least recently used are
+    evicted first); entries older than ``ttl`` seconds are treated as misses.
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 300.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or time.monotonic() - entry[0] > self.ttl:
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key: Hashable, value: Any):
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "ttl_seconds": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_ratio": self.hits / lookups if lookups else 0.0
+            }
+
+
+def comparable_cache_key(subject: Dict[str, Any], n: int, weights: Dict[str, float],
+                         version: str, precision: int = 4, options: tuple = ()) -> tuple:
+    """Key for a comparable search: the subject with coordinates rounded to
+    ``precision`` decimal places (4 is roughly 11 m), plus n, the scoring
+    weights, the dataset version and any other scoring ``options``."""
+    def quantize(value):
+        return None if value is None else round(float(value), precision)
+
+    return (
+        quantize(subject.get("latitude")),
+        quantize(subject.get("longitude")),
+        None if subject.get("square_feet") is None else float(subject["square_feet"]),
+        None if subject.get("year_built") is None else int(subject["year_built"]),
+        subject.get("zoning"),
+        n,
+        tuple(sorted(weights.items())),
+        version,
+        options
+    )
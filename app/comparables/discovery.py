@@ -1,7 +1,11 @@
-import json
 import os
 from typing import List, Dict, Any
 
+import numpy as np
+
+from ..data_extraction.columnar import read_records
+from ..data_extraction.zoning import family_column
+
 IN_PATH = os.path.join(os.path.dirname(__file__), '../../data/cache/outlier_flags.json')
 
 SIMILARITY_FEATURES = [
@@ -13,8 +17,7 @@ SIMILARITY_FEATURES = [
 ]
 
 def load_records() -> List[Dict[str, Any]]:
-    with open(IN_PATH, "r") as f:
-        return json.load(f)
+    return read_records(IN_PATH, SIMILARITY_FEATURES + ["normalized_zoning"])
 
 def extract_features(record: Dict[str, Any]) -> Dict[str, Any]:
     return {
@@ -25,6 +28,49 @@ def extract_features(record: Dict[str, Any]) -> Dict[str, Any]:
         "zoning": record.get("zoning") or record.get("normalized_zoning")
     }
 
+def extract_columns(records: List[Dict[str, Any]]) -> Dict[str, np.ndarray]:
+    """Column arrays for score_batch; missing numeric values become NaN."""
+    def numeric(field):
+        return np.array([np.nan if rec.get(field) is None else rec[field] for rec in records], dtype=float)
+
+    return {
+        "id": np.array([rec.get("id") for rec in records], dtype=object),
+        "latitude": numeric("latitude"),
+        "longitude": numeric("longitude"),
+        "square_feet": numeric("square_feet"),
+        "year_built": numeric("year_built"),
+        "zoning": np.array([rec.get("zoning") for rec in records], dtype=object),
+        "zoning_family": family_column([rec.get("zoning") for rec in records]),
+        "outlier": np.array([bool(rec.get("size_outlier") or rec.get("age_outlier") or rec.get("location_outlier")) for rec in records], dtype=bool)
+    }
+
+def columns_from_columnar(columnar: Dict[str, Any]) -> Dict[str, np.ndarray]:
+    """extract_columns() for a load_columnar() result; numeric columns stay memory-mapped"""
+    count = columnar["__meta__"]["count"]
+
+    def numeric(field):
+        arr = columnar.get(field)
+        return np.full(count, np.nan, dtype=float) if arr is None else arr
+
+    def objects(field):
+        col = columnar.get(field)
+        return np.full(count, None, dtype=object) if col is None else col.decode()
+
+    def flag(field):
+        arr = columnar.get(field)
+        return np.zeros(count, dtype=bool) if arr is None else np.asarray(arr) == 1
+
+    return {
+        "id": objects("id"),
+        "latitude": numeric("latitude"),
+        "longitude": numeric("longitude"),
+        "square_feet": numeric("square_feet"),
+        "year_built": numeric("year_built"),
+        "zoning": objects("zoning"),
+        "zoning_family": family_column(columnar["zoning"]) if "zoning" in columnar else np.full(count, None, dtype=object),
+        "outlier": flag("size_outlier") | flag("age_outlier") | flag("location_outlier")
+    }
+
 def main():
     records = load_records()
     features = [extract_features(rec) for rec in records]
@@ -1,16 +1,23 @@
 import json
 import os
-from .score import score, location_similarity, size_similarity, age_similarity, zoning_match
+
+import numpy as np
+
+from ..data_extraction.columnar import read_records
+from ..metrics import PhaseTimer
+from .discovery import extract_columns
+from .score import MAX_DISTANCE_M, score_batch, score_matrix, weights
+
+MATRIX_CHUNK_CELLS = 4_000_000
 
 data_path = os.path.join(os.path.dirname(__file__), '../../data/cache/outlier_flags.json')
 
 def load_properties():
-    with open(data_path, 'r') as f:
-        return json.load(f)
+    return read_records(data_path)
 
 def get_minmax(records):
-    sizes = [r.get('square_feet', 0) for r in records]
-    years = [r.get('year_built', 0) for r in records]
+    sizes = [r['square_feet'] for r in records if r.get('square_feet') is not None]
+    years = [r['year_built'] for r in records if r.get('year_built') is not None]
     return {
         'min_size': min(sizes) if sizes else 0,
         'max_size': max(sizes) if sizes else 0,
@@ -26,38 +33,106 @@ def find_reference(records, ref):
             return r
     raise ValueError('Reference property not found')
 
-def comparable_search(ref, records, N=5):
-    minmax = get_minmax(records)
-    scored = []
-    for candidate in records:
-        if candidate.get('id') == ref.get('id'):
-            continue
-        s = score(ref, candidate, minmax)
-        breakdown = {
-            'location': location_similarity(
-                ref.get('latitude'), ref.get('longitude'),
-                candidate.get('latitude'), candidate.get('longitude')
-            ),
-            'size': size_similarity(
-                ref.get('square_feet', 0), candidate.get('square_feet', 0),
-                minmax['min_size'], minmax['max_size']
-            ),
-            'year_built': age_similarity(
-                ref.get('year_built', 0), candidate.get('year_built', 0),
-                minmax['min_year'], minmax['max_year']
-            ),
-            'zoning': zoning_match(
-                ref.get('zoning'), candidate.get('zoning')
-            )
-        }
-        scored.append({
-            'id': candidate.get('id'),
-            'score': s,
-            'breakdown': breakdown,
-            'property': candidate
-        })
-    scored.sort(key=lambda x: x['score'], reverse=True)
-    return scored[:N]
+def score_candidates(ref, columns, minmax, N=5, index=None, normalization=None, timer=None):
+    """Score the candidates that can reach the top N for ref.
+
+    With a spatial index only candidates within MAX_DISTANCE_M are scored.
+    Everything outside the radius has zero location similarity, so if the
+    N-th best in-radius score beats that ceiling the ranking is final;
+    otherwise every record is scored. Returns (indices, batch) where batch
+    holds score_batch arrays aligned with indices. The reference itself
+    (matched by id) is excluded. ``timer`` (a metrics.PhaseTimer) records
+    the "candidates" and "score" phases and the "candidates" count.
+    """
+    timer = timer or PhaseTimer()
+    ref_id = ref.get('id')
+    if index is not None and ref.get('latitude') is not None and ref.get('longitude') is not None:
+        with timer.phase('candidates'):
+            indices = index.query_radius(ref['latitude'], ref['longitude'], MAX_DISTANCE_M)
+            if ref_id is not None:
+                indices = indices[columns['id'][indices] != ref_id]
+        if len(indices) >= N > 0:
+            with timer.phase('score'):
+                batch = score_batch(ref, {k: v[indices] for k, v in columns.items()}, minmax, normalization)
+                outside_ceiling = sum(weights.values()) - weights['location']
+                final = np.partition(batch['score'], len(indices) - N)[len(indices) - N] > outside_ceiling
+            timer.count('candidates', len(indices))
+            if final:
+                return indices, batch
+
+    with timer.phase('score'):
+        batch = score_batch(ref, columns, minmax, normalization)
+    timer.count('candidates', len(batch['score']))
+    if ref_id is None:
+        return np.arange(len(batch['score'])), batch
+    keep = columns['id'] != ref_id
+    return np.flatnonzero(keep), {k: v[keep] for k, v in batch.items()}
+
+def select_top_n(scores, N):
+    """Positions of the N highest scores, best first.
+
+    Matches a stable descending sort sliced to N (ties keep input order)
+    but only sorts the winners: argpartition finds the N-th best score,
+    everything above it plus the earliest ties make up the selection.
+    """
+    scores = np.asarray(scores)
+    if N <= 0 or not len(scores):
+        return np.empty(0, dtype=np.int64)
+    if N < len(scores):
+        kth = np.partition(scores, len(scores) - N)[len(scores) - N]
+        above = np.flatnonzero(scores > kth)
+        ties = np.flatnonzero(scores == kth)[:N - len(above)]
+        chosen = np.sort(np.concatenate([above, ties]))
+    else:
+        chosen = np.arange(len(scores))
+    return chosen[np.argsort(-scores[chosen], kind='stable')]
+
+def build_comparable(record, batch, j):
+    return {
+        'id': record.get('id'),
+        'score': float(batch['score'][j]),
+        'breakdown': {
+            'location': float(batch['location'][j]),
+            'size': float(batch['size'][j]),
+            'year_built': float(batch['year_built'][j]),
+            'zoning': float(batch['zoning'][j])
+        },
+        'property': record
+    }
+
+def comparable_search(ref, records, N=5, columns=None, minmax=None, index=None, normalization=None, timer=None):
+    timer = timer or PhaseTimer()
+    columns = extract_columns(records) if columns is None else columns
+    minmax = get_minmax(records) if minmax is None else minmax
+    indices, batch = score_candidates(ref, columns, minmax, N, index, normalization, timer)
+    with timer.phase('sort'):
+        top = select_top_n(batch['score'], N)
+    # Payloads are only built for the winners
+    with timer.phase('build'):
+        return [build_comparable(records[indices[j]], batch, j) for j in top]
+
+def batch_comparable_search(refs, records, N=5, columns=None, minmax=None, chunk_cells=MATRIX_CHUNK_CELLS,
+                            normalization=None):
+    """Yield comparable_search() results for each ref, in order.
+
+    Refs are scored in chunks as a refs x candidates matrix so the distance
+    and similarity work is amortized across subjects; each chunk holds at
+    most ``chunk_cells`` scores. ``normalization`` applies to every ref.
+    """
+    columns = extract_columns(records) if columns is None else columns
+    minmax = get_minmax(records) if minmax is None else minmax
+    n_candidates = len(columns['id'])
+    chunk = max(1, chunk_cells // max(n_candidates, 1))
+    for start in range(0, len(refs), chunk):
+        subjects = refs[start:start + chunk]
+        batch = score_matrix(subjects, columns, minmax, normalization)
+        ref_ids = np.array([ref.get('id') for ref in subjects], dtype=object)[:, None]
+        # Exclude each reference from its own results
+        batch['score'][(columns['id'][None, :] == ref_ids) & np.not_equal(ref_ids, None)] = -np.inf
+        for row, ref in enumerate(subjects):
+            row_batch = {k: v[row] for k, v in batch.items()}
+            top = [j for j in select_top_n(row_batch['score'], N) if row_batch['score'][j] > -np.inf]
+            yield [build_comparable(records[j], row_batch, j) for j in top]
 
 def main():
     import sys
@@ -69,6 +144,8 @@ def main():
     try:
         ref = json.loads(ref_arg)
     except Exception:
+        ref = None
+    if not isinstance(ref, dict):
         ref = find_reference(records, ref_arg)
     N = int(sys.argv[2]) if len(sys.argv) > 2 else 5
     results = comparable_search(ref, records, N)
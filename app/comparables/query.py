@@ -0,0 +1,145 @@
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+PAGE_CHUNK = 4096
+RANGE_FIELDS = ("square_feet", "year_built")
+# An index drives the query only when it narrows the candidates to at most
+# 1/INDEX_SELECTIVITY of the rows; broader filters fill a page quickly by
+# scanning in row order
+INDEX_SELECTIVITY = 8
+
+
+def build_zoning_index(zonings) -> Dict[str, np.ndarray]:
+    """Map each zoning code to the ascending row numbers that carry it"""
+    rows: Dict[str, List[int]] = {}
+    for i, zoning in enumerate(zonings):
+        rows.setdefault(zoning, []).append(i)
+    return {zoning: np.array(idx, dtype=np.int64) for zoning, idx in rows.items()}
+
+
+class RangeIndex:
+    """Row numbers sorted by a numeric column, so the rows within a value
+    range are one slice found with two binary searches. NaN is not indexed."""
+
+    def __init__(self, values):
+        values = np.asarray(values, dtype=float)
+        valid = np.flatnonzero(~np.isnan(values))
+        order = np.argsort(values[valid], kind="stable")
+        self.values = values[valid][order]
+        self.rows = valid[order]
+
+    def span(self, lo: Optional[float] = None, hi: Optional[float] = None) -> Tuple[int, int]:
+        start = 0 if lo is None else int(np.searchsorted(self.values, lo, side="left"))
+        stop = len(self.values) if hi is None else int(np.searchsorted(self.values, hi, side="right"))
+        return start, max(start, stop)
+
+
+class QueryIndex:
+    """Indexes for query_rows() over one snapshot's columns: zoning code to
+    rows, the snapshot's GridIndex for bounding boxes, a RangeIndex per
+    RANGE_FIELDS column and the rows that are not outliers."""
+
+    def __init__(self, columns: Dict[str, np.ndarray], grid):
+        self.zoning = build_zoning_index(columns["zoning"])
+        self.zoning_codes = np.empty(len(columns["zoning"]), dtype=np.int64)
+        self.zoning_lookup = {}
+        for code, (zoning, rows) in enumerate(self.zoning.items()):
+            self.zoning_codes[rows] = code
+            self.zoning_lookup[zoning] = code
+        self.grid = grid
+        self.ranges = {field: RangeIndex(columns[field]) for field in RANGE_FIELDS}
+        self.inliers = np.flatnonzero(~np.asarray(columns["outlier"], dtype=bool))
+
+
+def _driving_rows(index: QueryIndex, count: int, zonings, bbox, bounds, exclude_outliers) -> Optional[np.ndarray]:
+    """Ascending candidate rows from the most selective index, or None when
+    no filter is selective enough to beat a scan"""
+    sources = []
+    if zonings is not None:
+        arrays = [index.zoning[z] for z in zonings if z in index.zoning]
+        sources.append((sum(len(a) for a in arrays),
+                        lambda: np.unique(np.concatenate(arrays)) if arrays else np.empty(0, dtype=np.int64)))
+    if bbox is not None:
+        spans = index.grid.bbox_spans(*bbox)
+        sources.append((int((spans[1] - spans[0]).sum()), lambda: index.grid.query_bbox(*bbox, spans=spans)))
+    for field, (lo, hi) in bounds.items():
+        if lo is not None or hi is not None:
+            start, stop = index.ranges[field].span(lo, hi)
+            rows = index.ranges[field].rows
+            sources.append((stop - start, lambda rows=rows, start=start, stop=stop: np.sort(rows[start:stop])))
+    if exclude_outliers:
+        sources.append((len(index.inliers), lambda: index.inliers))
+    if not sources:
+        return None
+    size, materialize = min(sources, key=lambda source: source[0])
+    return materialize() if size * INDEX_SELECTIVITY <= count else None
+
+
+def _candidate_chunks(count: int, start: int, driving: Optional[np.ndarray]) -> Iterator[np.ndarray]:
+    """Ascending row numbers >= start, in chunks, narrowed by ``driving``"""
+    if driving is None:
+        for lo in range(start, count, PAGE_CHUNK):
+            yield np.arange(lo, min(lo + PAGE_CHUNK, count))
+        return
+    candidates = driving[np.searchsorted(driving, start):]
+    for lo in range(0, len(candidates), PAGE_CHUNK):
+        yield candidates[lo:lo + PAGE_CHUNK]
+
+
+def query_rows(columns: Dict[str, np.ndarray], index: QueryIndex, start: int = 0,
+               limit: int = 100, zonings: Optional[List[str]] = None,
+               bbox: Optional[Tuple[float, float, float, float]] = None,
+               min_sqft: Optional[float] = None, max_sqft: Optional[float] = None,
+               min_year: Optional[int] = None, max_year: Optional[int] = None,
+               exclude_outliers: bool = False) -> Tuple[np.ndarray, Optional[int]]:
+    """Rows matching the filters, starting at row ``start``.
+
+    The most selective filter's index (zoning, the grid for ``bbox``, the
+    sorted size/year columns or the inlier rows) yields the candidate rows
+    and the other filters are checked on those candidates only, so a
+    selective query costs what it matches rather than the dataset. Without
+    a selective filter rows are scanned in order. Either way scanning stops
+    as soon as the page is full. ``bbox`` is (min_lon, min_lat, max_lon,
+    max_lat). Rows with a missing (NaN) size or year never match a bound on
+    that field. Returns (rows, next_start) where next_start is None on the
+    last page.
+    """
+    count = len(columns["id"])
+    if zonings is not None:
+        zonings = list(dict.fromkeys(zonings))
+    bounds = {"square_feet": (min_sqft, max_sqft), "year_built": (min_year, max_year)}
+    driving = _driving_rows(index, count, zonings, bbox, bounds, exclude_outliers)
+    wanted = None
+    if zonings is not None:
+        wanted = np.array([index.zoning_lookup[z] for z in zonings if z in index.zoning_lookup], dtype=np.int64)
+
+    found = []
+    needed = limit + 1
+    for rows in _candidate_chunks(count, start, driving):
+        mask = np.ones(len(rows), dtype=bool)
+        if wanted is not None:
+            mask &= np.isin(index.zoning_codes[rows], wanted)
+        if bbox is not None:
+            lat, lon = columns["latitude"][rows], columns["longitude"][rows]
+            mask &= (lon >= bbox[0]) & (lat >= bbox[1]) & (lon <= bbox[2]) & (lat <= bbox[3])
+        if min_sqft is not None:
+            mask &= columns["square_feet"][rows] >= min_sqft
+        if max_sqft is not None:
+            mask &= columns["square_feet"][rows] <= max_sqft
+        if min_year is not None:
+            mask &= columns["year_built"][rows] >= min_year
+        if max_year is not None:
+            mask &= columns["year_built"][rows] <= max_year
+        if exclude_outliers:
+            mask &= ~columns["outlier"][rows]
+        matched = rows[mask]
+        found.append(matched[:needed])
+        needed -= len(found[-1])
+        if needed <= 0:
+            break
+
+    rows = np.concatenate(found) if found else np.empty(0, dtype=np.int64)
+    if len(rows) > limit:
+        return rows[:limit], int(rows[limit])
+    return rows, None
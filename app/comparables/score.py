@@ -1,6 +1,9 @@
 import numpy as np
 from geopy.distance import geodesic
 
+from ..data_extraction.stats import cell_key
+from ..data_extraction.zoning import family_column, zoning_family
+
 def min_max_normalize(val, min_val, max_val):
     if max_val == min_val:
         return 0.0
@@ -19,17 +22,27 @@ def location_similarity(lat1, lon1, lat2, lon2):
     return max(0.0, 1.0 - min(dist, 10000) / 10000)
 
 def size_similarity(size1, size2, min_size, max_size):
+    if None in [size1, size2]:
+        return 0.0
     n1 = min_max_normalize(size1, min_size, max_size)
     n2 = min_max_normalize(size2, min_size, max_size)
     return 1.0 - abs(n1 - n2)
 
 def age_similarity(year1, year2, min_year, max_year):
+    if None in [year1, year2]:
+        return 0.0
     n1 = min_max_normalize(year1, min_year, max_year)
     n2 = min_max_normalize(year2, min_year, max_year)
     return 1.0 - abs(n1 - n2)
 
+# Similarity of two different zoning codes in the same family (M1 and I-1)
+ZONING_FAMILY_MATCH = 0.5
+
 def zoning_match(z1, z2):
-    return 1.0 if z1 == z2 else 0.0
+    if z1 == z2:
+        return 1.0
+    family = zoning_family(z1)
+    return ZONING_FAMILY_MATCH if family is not None and family == zoning_family(z2) else 0.0
 
 weights = {
     "location": 0.4,
@@ -44,11 +57,11 @@ def score(subject, candidate, minmax):
         candidate.get("latitude"), candidate.get("longitude")
     )
     size_sim = size_similarity(
-        subject.get("square_feet", 0), candidate.get("square_feet", 0),
+        subject.get("square_feet"), candidate.get("square_feet"),
         minmax["min_size"], minmax["max_size"]
     )
     age_sim = age_similarity(
-        subject.get("year_built", 0), candidate.get("year_built", 0),
+        subject.get("year_built"), candidate.get("year_built"),
         minmax["min_year"], minmax["max_year"]
     )
     zone_sim = zoning_match(
@@ -65,3 +78,160 @@ def score(subject, candidate, minmax):
 # Example usage:
 # minmax = {"min_size": 1000, "max_size": 10000, "min_year": 1900, "max_year": 2025}
 # score(subject, candidate, minmax)
+
+# Haversine is within 0.5% of geodesic (50 m in the 10 km window), so batch
+# scores stay within SCORE_TOLERANCE of score()
+EARTH_RADIUS_M = 6371008.8
+MAX_DISTANCE_M = 10000
+SCORE_TOLERANCE = 0.002
+
+def haversine_meters(lat1, lon1, lat2, lon2):
+    lat1, lon1, lat2, lon2 = (np.radians(np.asarray(v, dtype=float)) for v in (lat1, lon1, lat2, lon2))
+    a = (
+        np.sin((lat2 - lat1) / 2) ** 2 +
+        np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    )
+    return 2 * EARTH_RADIUS_M * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+def _minmax_normalize_batch(values, min_val, max_val):
+    if max_val == min_val:
+        return np.zeros_like(values, dtype=float)
+    return (values - min_val) / (max_val - min_val)
+
+# minmax: as score(); robust: min-max over p05-p95, clipped; zscore: 0 at ZSCORE_SPAN std apart
+NORMALIZATION_STRATEGIES = ["minmax", "robust", "zscore"]
+NORMALIZATION_SCOPES = ["global", "zoning", "cell"]
+ZSCORE_SPAN = 3.0
+MIN_GROUP_COUNT = 5
+
+def minmax_normalization(minmax):
+    return {
+        "strategy": "minmax",
+        "square_feet": {"min": minmax["min_size"], "max": minmax["max_size"]},
+        "year_built": {"min": minmax["min_year"], "max": minmax["max_year"]}
+    }
+
+def normalization_for(stats, strategy, scope="global", subject=None):
+    """Per-field stats for the subject's scope; small groups fall back to global"""
+    group = None
+    if scope == "zoning" and subject is not None:
+        group = stats["zoning"].get(zoning_family(subject.get("zoning")))
+    elif scope == "cell" and subject is not None:
+        group = stats["cells"].get(cell_key(subject.get("latitude"), subject.get("longitude")))
+    normalization = {"strategy": strategy}
+    for field in ("square_feet", "year_built"):
+        field_stats = (group or {}).get(field)
+        if not field_stats or field_stats["count"] < MIN_GROUP_COUNT:
+            field_stats = stats["global"][field] or {
+                "min": 0, "max": 0, "mean": 0, "std": 0, "p05": 0, "p95": 0, "count": 0
+            }
+        normalization[field] = field_stats
+    return normalization
+
+def normalized_similarity(subject_value, values, field_stats, strategy):
+    """1 - normalized distance between subject_value and each of values; 0 where either is missing"""
+    subject_value = np.asarray(subject_value, dtype=float)
+    values = np.asarray(values, dtype=float)
+    if strategy == "zscore":
+        distance = np.abs(
+            zscore_normalize(subject_value, field_stats["mean"], field_stats["std"]) -
+            zscore_normalize(values, field_stats["mean"], field_stats["std"])
+        )
+        similarity = 1.0 - np.minimum(distance / ZSCORE_SPAN, 1.0)
+    elif strategy == "robust":
+        lo, hi = field_stats["p05"], field_stats["p95"]
+        n_subject = np.clip(_minmax_normalize_batch(subject_value, lo, hi), 0.0, 1.0)
+        similarity = 1.0 - np.abs(n_subject - np.clip(_minmax_normalize_batch(values, lo, hi), 0.0, 1.0))
+    else:
+        lo, hi = field_stats["min"], field_stats["max"]
+        similarity = 1.0 - np.abs(_minmax_normalize_batch(subject_value, lo, hi) -
+                                  _minmax_normalize_batch(values, lo, hi))
+    return np.where(np.isnan(subject_value) | np.isnan(values), 0.0, similarity)
+
+def zoning_similarity(subject_zonings, zonings, subject_families, families):
+    """Vectorized zoning_match(); arguments broadcast against each other"""
+    same_family = (families == subject_families) & np.not_equal(subject_families, None)
+    return np.where(zonings == subject_zonings, 1.0, np.where(same_family, ZONING_FAMILY_MATCH, 0.0))
+
+def candidate_families(columns):
+    families = columns.get("zoning_family")
+    return family_column(columns["zoning"]) if families is None else np.asarray(families, dtype=object)
+
+def score_batch(subject, columns, minmax, normalization=None):
+    """Vectorized score() of subject against every candidate in columns"""
+    normalization = normalization or minmax_normalization(minmax)
+    lat = np.asarray(columns["latitude"], dtype=float)
+    lon = np.asarray(columns["longitude"], dtype=float)
+    sizes = np.asarray(columns["square_feet"], dtype=float)
+    years = np.asarray(columns["year_built"], dtype=float)
+    zonings = np.asarray(columns["zoning"], dtype=object)
+
+    s_lat, s_lon = subject.get("latitude"), subject.get("longitude")
+    if s_lat is None or s_lon is None:
+        loc_sim = np.zeros(len(lat))
+    else:
+        with np.errstate(invalid="ignore"):
+            dist = haversine_meters(s_lat, s_lon, lat, lon)
+        loc_sim = 1.0 - np.minimum(dist, MAX_DISTANCE_M) / MAX_DISTANCE_M
+        loc_sim[np.isnan(loc_sim)] = 0.0
+
+    strategy = normalization["strategy"]
+    size_sim = normalized_similarity(subject.get("square_feet"), sizes, normalization["square_feet"], strategy)
+    age_sim = normalized_similarity(subject.get("year_built"), years, normalization["year_built"], strategy)
+
+    zone_sim = zoning_similarity(subject.get("zoning"), zonings, zoning_family(subject.get("zoning")),
+                                 candidate_families(columns))
+
+    final_score = (
+        weights["location"] * loc_sim +
+        weights["size"] * size_sim +
+        weights["year_built"] * age_sim +
+        weights["zoning"] * zone_sim
+    )
+    return {
+        "score": final_score,
+        "location": loc_sim,
+        "size": size_sim,
+        "year_built": age_sim,
+        "zoning": zone_sim
+    }
+
+def score_matrix(subjects, columns, minmax, normalization=None):
+    """score_batch() for many subjects as (subjects, candidates) arrays"""
+    normalization = normalization or minmax_normalization(minmax)
+    strategy = normalization["strategy"]
+    def subject_column(field, default):
+        values = [s.get(field) for s in subjects]
+        return np.array([default if v is None else v for v in values], dtype=float)[:, None]
+
+    lat = np.asarray(columns["latitude"], dtype=float)[None, :]
+    lon = np.asarray(columns["longitude"], dtype=float)[None, :]
+    with np.errstate(invalid="ignore"):
+        dist = haversine_meters(subject_column("latitude", np.nan), subject_column("longitude", np.nan), lat, lon)
+    loc_sim = 1.0 - np.minimum(dist, MAX_DISTANCE_M) / MAX_DISTANCE_M
+    loc_sim[np.isnan(loc_sim)] = 0.0
+
+    sizes = np.asarray(columns["square_feet"], dtype=float)[None, :]
+    size_sim = normalized_similarity(subject_column("square_feet", np.nan), sizes, normalization["square_feet"], strategy)
+
+    years = np.asarray(columns["year_built"], dtype=float)[None, :]
+    age_sim = normalized_similarity(subject_column("year_built", np.nan), years, normalization["year_built"], strategy)
+
+    zonings = np.asarray(columns["zoning"], dtype=object)[None, :]
+    subject_zonings = np.array([s.get("zoning") for s in subjects], dtype=object)[:, None]
+    subject_families = np.array([zoning_family(s.get("zoning")) for s in subjects], dtype=object)[:, None]
+    zone_sim = zoning_similarity(subject_zonings, zonings, subject_families, candidate_families(columns)[None, :])
+
+    final_score = (
+        weights["location"] * loc_sim +
+        weights["size"] * size_sim +
+        weights["year_built"] * age_sim +
+        weights["zoning"] * zone_sim
+    )
+    return {
+        "score": final_score,
+        "location": loc_sim,
+        "size": size_sim,
+        "year_built": age_sim,
+        "zoning": zone_sim
+    }
\ No newline at end of file
@@ -0,0 +1,94 @@
+import math
+
+import numpy as np
+
+from .score import EARTH_RADIUS_M, haversine_meters
+
+# One degree of latitude on the sphere haversine_meters uses, so cell spans
+# computed from a radius always cover that radius
+METERS_PER_DEGREE = math.radians(1) * EARTH_RADIUS_M
+DEFAULT_CELL_METERS = 10000
+
+
+class GridIndex:
+    """Uniform lat/lon grid over point coordinates.
+
+    Points are bucketed into square cells of ``cell_meters`` (measured along
+    a meridian) and sorted by cell key, so each grid row of a query is one
+    contiguous slice found with two binary searches. A radius query costs
+    O(rows * log N + k) for k points in the covered cells. Points with
+    missing coordinates are not indexed.
+    """
+
+    def __init__(self, latitudes, longitudes, cell_meters=DEFAULT_CELL_METERS):
+        lat = np.asarray(latitudes, dtype=float)
+        lon = np.asarray(longitudes, dtype=float)
+        self.cell_deg = cell_meters / METERS_PER_DEGREE
+        self.lat = lat
+        self.lon = lon
+
+        valid = np.flatnonzero(~(np.isnan(lat) | np.isnan(lon)))
+        keys = self._keys(lat[valid], lon[valid])
+        order = np.argsort(keys, kind="stable")
+        self.keys = keys[order]
+        self.positions = valid[order]
+
+    def __len__(self):
+        return len(self.positions)
+
+    def _row(self, lat):
+        return np.floor((np.asarray(lat) + 90.0) / self.cell_deg).astype(np.int64)
+
+    def _col(self, lon):
+        return np.floor((np.asarray(lon) + 180.0) / self.cell_deg).astype(np.int64)
+
+    def _keys(self, lat, lon):
+        return (self._row(lat) << 32) | self._col(lon)
+
+    def query_radius(self, lat, lon, radius_m):
+        """Indices of all points within ``radius_m`` of (lat, lon), ascending."""
+        if not len(self.positions):
+            return np.empty(0, dtype=np.int64)
+        lat_span = radius_m / METERS_PER_DEGREE
+        cos_lat = max(math.cos(math.radians(min(abs(lat) + lat_span, 90.0))), 1e-6)
+        lon_span = min(lat_span / cos_lat, 180.0)
+
+        row_lo, row_hi = int(self._row(lat - lat_span)), int(self._row(lat + lat_span))
+        col_lo, col_hi = int(self._col(lon - lon_span)), int(self._col(lon + lon_span))
+        slices = []
+        for row in range(row_lo, row_hi + 1):
+            lo = np.searchsorted(self.keys, (row << 32) | col_lo, side="left")
+            hi = np.searchsorted(self.keys, (row << 32) | col_hi, side="right")
+            if hi > lo:
+                slices.append(self.positions[lo:hi])
+        if not slices:
+            return np.empty(0, dtype=np.int64)
+
+        candidates = np.concatenate(slices)
+        dist = haversine_meters(lat, lon, self.lat[candidates], self.lon[candidates])
+        return np.sort(candidates[dist <= radius_m])
+
+    def bbox_spans(self, min_lon, min_lat, max_lon, max_lat):
+        """(lo, hi) bounds into the sorted points for each grid row the box
+        covers; hi - lo summed bounds the number of points in the box."""
+        if not len(self.positions) or min_lat > max_lat or min_lon > max_lon:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+        # Only grid rows that hold points can contribute
+        row_lo = max(int(self._row(min_lat)), int(self.keys[0] >> 32))
+        row_hi = min(int(self._row(max_lat)), int(self.keys[-1] >> 32))
+        rows = np.arange(row_lo, row_hi + 1, dtype=np.int64)
+        lo = np.searchsorted(self.keys, (rows << 32) | int(self._col(min_lon)), side="left")
+        hi = np.searchsorted(self.keys, (rows << 32) | int(self._col(max_lon)), side="right")
+        return lo, hi
+
+    def query_bbox(self, min_lon, min_lat, max_lon, max_lat, spans=None):
+        """Indices of all points inside the box (edges included), ascending.
+        ``spans`` reuses a bbox_spans() result for the same box."""
+        lo, hi = spans if spans is not None else self.bbox_spans(min_lon, min_lat, max_lon, max_lat)
+        slices = [self.positions[a:b] for a, b in zip(lo.tolist(), hi.tolist()) if b > a]
+        if not slices:
+            return np.empty(0, dtype=np.int64)
+        candidates = np.concatenate(slices)
+        lat, lon = self.lat[candidates], self.lon[candidates]
+        inside = (lon >= min_lon) & (lat >= min_lat) & (lon <= max_lon) & (lat <= max_lat)
+        return np.sort(candidates[inside])
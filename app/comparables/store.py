@@ -0,0 +1,121 @@
+import hashlib
+import json
+import os
+import threading
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+
+from ..data_extraction.columnar import RecordView, columnar_path, has_fresh_columnar, load_columnar
+from ..data_extraction.stats import STATS_FILE, column_stats, load_stats
+from .discovery import columns_from_columnar, extract_columns
+from .query import QueryIndex
+from .spatial import GridIndex
+
+
+def get_column_minmax(columns: Dict[str, np.ndarray]) -> Dict[str, float]:
+    """Range of the known sizes and years; missing (NaN) values are ignored"""
+    sizes = columns["square_feet"]
+    years = columns["year_built"]
+    has_sizes = not np.isnan(sizes).all()
+    has_years = not np.isnan(years).all()
+    return {
+        "min_size": float(np.nanmin(sizes)) if has_sizes else 0,
+        "max_size": float(np.nanmax(sizes)) if has_sizes else 0,
+        "min_year": float(np.nanmin(years)) if has_years else 1900,
+        "max_year": float(np.nanmax(years)) if has_years else 2025
+    }
+
+
+class PropertySnapshot:
+    """An immutable view of the property cache as of one load."""
+
+    def __init__(self, records, path: Optional[str], mtime: Optional[float],
+                 columns: Optional[Dict[str, np.ndarray]] = None):
+        self.records = records
+        self.path = path
+        self.mtime = mtime
+        self.columns = extract_columns(records) if columns is None else columns
+        self.minmax = get_column_minmax(self.columns)
+        self.index = GridIndex(self.columns["latitude"], self.columns["longitude"])
+        self.query_index = QueryIndex(self.columns, self.index)
+        self.version = hashlib.sha1(f"{path}:{mtime}:{len(records)}".encode()).hexdigest()[:16]
+        self._stats = None
+        self._stats_lock = threading.Lock()
+
+    def normalization_stats(self) -> Dict[str, Any]:
+        """Per-zoning-family and per-cell normalization statistics for these records.
+
+        Read from the stats file the pipeline writes next to the data when it
+        is at least as new as the data, else computed once on first use.
+        """
+        if self._stats is None:
+            with self._stats_lock:
+                if self._stats is None:
+                    stats_path = os.path.join(os.path.dirname(self.path), STATS_FILE) if self.path else None
+                    if stats_path and os.path.exists(stats_path) and os.stat(stats_path).st_mtime >= self.mtime:
+                        self._stats = load_stats(stats_path)
+                    else:
+                        self._stats = column_stats(self.columns)
+        return self._stats
+
+    def __len__(self):
+        return len(self.records)
+
+
+class PropertyStore:
+    """Keeps the property cache resident in memory.
+
+    The first existing path in ``paths`` is loaded once and reused until its
+    mtime changes, at which point the next ``snapshot()`` call reloads it.
+    A fresh columnar copy of the file is preferred over parsing the JSON.
+    ``fallback`` supplies records when none of the paths exist.
+    """
+
+    def __init__(self, paths: List[str], fallback: Optional[Callable[[], List[Dict[str, Any]]]] = None):
+        self.paths = paths
+        self.fallback = fallback or (lambda: [])
+        self._snapshot: Optional[PropertySnapshot] = None
+        self._lock = threading.Lock()
+        self._listeners: List[Callable[[PropertySnapshot], None]] = []
+
+    def add_listener(self, callback: Callable[[PropertySnapshot], None]):
+        """Call ``callback(snapshot)`` after every (re)load"""
+        self._listeners.append(callback)
+
+    def _current_source(self):
+        for path in self.paths:
+            try:
+                return path, os.stat(path).st_mtime
+            except FileNotFoundError:
+                continue
+        return None, None
+
+    def _is_stale(self, path, mtime) -> bool:
+        snap = self._snapshot
+        return snap is None or snap.path != path or snap.mtime != mtime
+
+    def load(self) -> PropertySnapshot:
+        path, mtime = self._current_source()
+        if path is None:
+            self._snapshot = PropertySnapshot(self.fallback(), path, mtime)
+        elif has_fresh_columnar(path):
+            # Columns are memory-mapped; records are materialized on access
+            columnar = load_columnar(columnar_path(path))
+            self._snapshot = PropertySnapshot(RecordView(columnar), path, mtime, columns_from_columnar(columnar))
+        else:
+            with open(path, "r") as f:
+                records = json.load(f)
+            self._snapshot = PropertySnapshot(records, path, mtime)
+        for callback in self._listeners:
+            callback(self._snapshot)
+        return self._snapshot
+
+    def snapshot(self) -> PropertySnapshot:
+        path, mtime = self._current_source()
+        if not self._is_stale(path, mtime):
+            return self._snapshot
+        with self._lock:
+            if self._is_stale(path, mtime):
+                self.load()
+            return self._snapshot
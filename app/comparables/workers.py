@@ -0,0 +1,54 @@
+from typing import Any, Callable, Dict, List, Optional
+
+from ..metrics import PhaseTimer
+from .find import comparable_search
+from .score import normalization_for
+from .store import PropertyStore
+
+# Property store owned by a scoring worker process. Each process keeps its
+# own snapshot (and hot-reloads it independently); with the columnar cache
+# the column arrays are memory-mapped, so workers share the same physical
+# pages through the OS page cache instead of holding private copies.
+_worker_store: Optional[PropertyStore] = None
+
+
+def search_comparables(store: PropertyStore, subject: Dict[str, Any], n: int,
+                       strategy: str = "minmax", scope: str = "global", timer: Optional[PhaseTimer] = None):
+    """Run comparable_search against the store's current snapshot.
+
+    ``strategy``/``scope`` select the size and age normalization (see
+    score.normalization_for); the default keeps the snapshot's min-max.
+    ``timer`` records the "load" and "normalization" phases along with
+    comparable_search's. Returns (comparables, total_records).
+    """
+    timer = timer or PhaseTimer()
+    with timer.phase("load"):
+        snapshot = store.snapshot()
+    if not snapshot.records:
+        return [], 0
+    normalization = None
+    if (strategy, scope) != ("minmax", "global"):
+        with timer.phase("normalization"):
+            normalization = normalization_for(snapshot.normalization_stats(), strategy, scope, subject)
+    comparables = comparable_search(
+        subject, snapshot.records, n,
+        columns=snapshot.columns, minmax=snapshot.minmax, index=snapshot.index,
+        normalization=normalization, timer=timer
+    )
+    return comparables, len(snapshot)
+
+
+def init_worker(paths: List[str], fallback: Optional[Callable[[], List[Dict[str, Any]]]] = None):
+    """ProcessPoolExecutor initializer: load the property store once per process"""
+    global _worker_store
+    _worker_store = PropertyStore(paths, fallback)
+    _worker_store.load()
+
+
+def worker_search_comparables(subject: Dict[str, Any], n: int, strategy: str = "minmax", scope: str = "global"):
+    """search_comparables in a worker process. The timer cannot cross the
+    process boundary, so its phases and counts are returned alongside:
+    (comparables, total_records, phases, counts)."""
+    timer = PhaseTimer()
+    comparables, total = search_comparables(_worker_store, subject, n, strategy, scope, timer)
+    return comparables, total, timer.phases, timer.counts
@@ -0,0 +1,291 @@
+import json
+import os
+import shutil
+from typing import Any, Dict, Iterable, List, Optional
+
+import numpy as np
+
+# Columnar cache layout: for data/cache/<name>.json the columns live in
+# data/cache/<name>.cols/, one .npy file per field plus meta.json. Numbers
+# are float64 with NaN for missing values, booleans int8 with -1 for
+# missing, and strings (or any other JSON value) are dictionary-encoded as
+# int32 codes into a JSON list, with -1 for missing. Missing covers both an
+# absent key and an explicit null; columns holding nulls get a boolean
+# null mask so records read back with the same keys. Arrays are opened
+# with mmap so readers only touch the columns they ask for.
+
+META_FILE = "meta.json"
+
+
+def columnar_path(json_path: str) -> str:
+    root, _ = os.path.splitext(json_path)
+    return root + ".cols"
+
+
+class DictionaryColumn:
+    """Dictionary-encoded column: int32 codes into a list of values."""
+
+    def __init__(self, codes: np.ndarray, values: List[Any]):
+        self.codes = codes
+        self.values = values
+
+    def __len__(self):
+        return len(self.codes)
+
+    def __getitem__(self, i):
+        code = self.codes[i]
+        return None if code < 0 else self.values[code]
+
+    def decode(self) -> np.ndarray:
+        lookup = np.empty(len(self.values) + 1, dtype=object)
+        lookup[:-1] = self.values
+        lookup[-1] = None
+        return lookup[self.codes]
+
+
+def _column_kind(values: List[Any]) -> str:
+    present = [v for v in values if v is not None]
+    if present and all(isinstance(v, bool) for v in present):
+        return "bool"
+    if present and all(isinstance(v, (int, float)) and not isinstance(v, bool) for v in present):
+        return "number"
+    if all(isinstance(v, str) for v in present):
+        return "string"
+    return "json"
+
+
+def save_columnar(path: str, records: Iterable[Dict[str, Any]]):
+    """Write records as a columnar directory, replacing any existing one"""
+    records = list(records)
+    fields = []
+    for rec in records:
+        for key in rec:
+            if key not in fields:
+                fields.append(key)
+
+    tmp_path = path + ".tmp"
+    shutil.rmtree(tmp_path, ignore_errors=True)
+    os.makedirs(tmp_path)
+    meta = {"count": len(records), "fields": fields, "columns": {}}
+    for i, field in enumerate(fields):
+        values = [rec.get(field) for rec in records]
+        kind = _column_kind(values)
+        entry = {"kind": kind, "file": f"c{i}.npy"}
+        null = [v is None and field in rec for v, rec in zip(values, records)]
+        if any(null):
+            entry["null_mask"] = f"c{i}.null.npy"
+            np.save(os.path.join(tmp_path, entry["null_mask"]), np.array(null, dtype=bool))
+        if kind == "number":
+            arr = np.array([np.nan if v is None else v for v in values], dtype=np.float64)
+            is_int = [isinstance(v, int) for v in values]
+            entry["integer"] = all(is_int[j] for j, v in enumerate(values) if v is not None)
+            if not entry["integer"] and any(is_int):
+                # Mixed int/float columns keep each value's original type
+                entry["int_mask"] = f"c{i}.int.npy"
+                np.save(os.path.join(tmp_path, entry["int_mask"]), np.array(is_int, dtype=bool))
+        elif kind == "bool":
+            arr = np.array([-1 if v is None else int(v) for v in values], dtype=np.int8)
+        else:
+            encode = (lambda v: v) if kind == "string" else json.dumps
+            lookup = {}
+            codes = np.empty(len(values), dtype=np.int32)
+            for j, v in enumerate(values):
+                codes[j] = -1 if v is None else lookup.setdefault(encode(v), len(lookup))
+            arr = codes
+            entry["dictionary"] = list(lookup)
+        np.save(os.path.join(tmp_path, entry["file"]), arr)
+        meta["columns"][field] = entry
+    with open(os.path.join(tmp_path, META_FILE), "w") as f:
+        json.dump(meta, f)
+
+    shutil.rmtree(path, ignore_errors=True)
+    os.replace(tmp_path, path)
+
+
+def load_columnar(path: str, fields: Optional[List[str]] = None, mmap: bool = True) -> Dict[str, Any]:
+    """Open selected columns; numeric/bool columns are (memory-mapped) arrays,
+    string/json columns are DictionaryColumn. Missing fields are skipped."""
+    with open(os.path.join(path, META_FILE), "r") as f:
+        meta = json.load(f)
+    columns = {}
+    for field in fields or meta["fields"]:
+        entry = meta["columns"].get(field)
+        if entry is None:
+            continue
+        mode = "r" if mmap else None
+        arr = np.load(os.path.join(path, entry["file"]), mmap_mode=mode)
+        if entry.get("int_mask"):
+            entry["int_mask_array"] = np.load(os.path.join(path, entry["int_mask"]), mmap_mode=mode)
+        if entry.get("null_mask"):
+            entry["null_mask_array"] = np.load(os.path.join(path, entry["null_mask"]), mmap_mode=mode)
+        if entry["kind"] in ("string", "json"):
+            values = entry["dictionary"]
+            if entry["kind"] == "json":
+                values = [json.loads(v) for v in values]
+            columns[field] = DictionaryColumn(arr, values)
+        else:
+            columns[field] = arr
+    columns["__meta__"] = meta
+    return columns
+
+
+def slice_columnar(columnar: Dict[str, Any], start: int, stop: int) -> Dict[str, Any]:
+    """Rows [start, stop) of a load_columnar() result, as views (no copies)"""
+    meta = columnar["__meta__"]
+    entries = {}
+    sliced = {}
+    for field, entry in meta["columns"].items():
+        entry = dict(entry)
+        for mask in ("int_mask_array", "null_mask_array"):
+            if mask in entry:
+                entry[mask] = entry[mask][start:stop]
+        entries[field] = entry
+        if field in columnar:
+            column = columnar[field]
+            sliced[field] = (DictionaryColumn(column.codes[start:stop], column.values)
+                             if isinstance(column, DictionaryColumn) else column[start:stop])
+    sliced["__meta__"] = {**meta, "count": stop - start, "columns": entries}
+    return sliced
+
+
+def save_columnar_rows(path: str, columnar: Dict[str, Any], rows: np.ndarray,
+                       extra: Optional[Dict[str, List[Any]]] = None):
+    """Write rows ``rows`` of a load_columnar() result as a columnar directory,
+    without materializing records. ``extra`` maps field names to string
+    values (None for missing), one per selected row, added or replacing
+    columns. Dictionaries are compacted to the values the rows use, in
+    first-use order, as save_columnar would write them."""
+    meta = columnar["__meta__"]
+    extra = extra or {}
+    fields = [f for f in meta["fields"] if f in columnar or f in extra] + [f for f in extra if f not in meta["fields"]]
+
+    tmp_path = path + ".tmp"
+    shutil.rmtree(tmp_path, ignore_errors=True)
+    os.makedirs(tmp_path)
+    out = {"count": len(rows), "fields": fields, "columns": {}}
+    for i, field in enumerate(fields):
+        if field in extra:
+            entry = {"kind": "string"}
+            values = extra[field]
+            lookup = {}
+            arr = np.array([-1 if v is None else lookup.setdefault(v, len(lookup)) for v in values], dtype=np.int32)
+            entry["dictionary"] = list(lookup)
+        else:
+            source = meta["columns"][field]
+            entry = {"kind": source["kind"]}
+            column = columnar[field]
+            if source["kind"] in ("string", "json"):
+                codes = np.asarray(column.codes)[rows]
+                used, first = np.unique(codes[codes >= 0], return_index=True)
+                used = used[np.argsort(first)]
+                remap = np.full(len(source["dictionary"]) + 1, -1, dtype=np.int32)
+                remap[used] = np.arange(len(used), dtype=np.int32)
+                arr = remap[codes]  # code -1 picks the trailing -1
+                entry["dictionary"] = [source["dictionary"][c] for c in used.tolist()]
+            elif source["kind"] == "number":
+                arr = np.asarray(column)[rows]
+                present = ~np.isnan(arr)
+                if source["integer"]:
+                    is_int = present
+                elif "int_mask_array" in source:
+                    is_int = np.asarray(source["int_mask_array"])[rows]
+                else:
+                    is_int = np.zeros(len(rows), dtype=bool)
+                entry["integer"] = bool(is_int[present].all())
+                if not entry["integer"] and is_int.any():
+                    entry["int_mask"] = f"c{i}.int.npy"
+                    np.save(os.path.join(tmp_path, entry["int_mask"]), is_int)
+            else:
+                arr = np.asarray(column)[rows]
+            if "null_mask_array" in source:
+                null = np.asarray(source["null_mask_array"])[rows]
+                if null.any():
+                    entry["null_mask"] = f"c{i}.null.npy"
+                    np.save(os.path.join(tmp_path, entry["null_mask"]), null)
+        entry["file"] = f"c{i}.npy"
+        np.save(os.path.join(tmp_path, entry["file"]), arr)
+        out["columns"][field] = entry
+    with open(os.path.join(tmp_path, META_FILE), "w") as f:
+        json.dump(out, f)
+
+    shutil.rmtree(path, ignore_errors=True)
+    os.replace(tmp_path, path)
+
+
+def cell_value(field_meta, column, i):
+    """Row ``i`` of a loaded column as the JSON value it was saved from"""
+    kind = field_meta["kind"]
+    if kind in ("string", "json"):
+        return column[i]
+    v = column[i]
+    if kind == "bool":
+        return None if v < 0 else bool(v)
+    if np.isnan(v):
+        return None
+    if field_meta["integer"] or ("int_mask_array" in field_meta and field_meta["int_mask_array"][i]):
+        return int(v)
+    return float(v)
+
+
+class RecordView:
+    """Read-only sequence of record dicts materialized from columns on access.
+
+    Absent keys are omitted from the rebuilt dict; keys stored as null
+    come back with a None value.
+    """
+
+    def __init__(self, columns: Dict[str, Any]):
+        meta = columns["__meta__"]
+        self._fields = [(field, meta["columns"][field], columns[field])
+                        for field in meta["fields"] if field in columns]
+        self._count = meta["count"]
+
+    def __len__(self):
+        return self._count
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(self._count))]
+        if i < 0:
+            i += self._count
+        if not 0 <= i < self._count:
+            raise IndexError(i)
+        record = {}
+        for field, field_meta, column in self._fields:
+            v = cell_value(field_meta, column, i)
+            if v is not None or ("null_mask_array" in field_meta and field_meta["null_mask_array"][i]):
+                record[field] = v
+        return record
+
+    def __iter__(self):
+        for i in range(self._count):
+            yield self[i]
+
+
+def has_fresh_columnar(json_path: str) -> bool:
+    """True if the columnar copy exists and is not older than the JSON file"""
+    meta_path = os.path.join(columnar_path(json_path), META_FILE)
+    if not os.path.exists(meta_path):
+        return False
+    if not os.path.exists(json_path):
+        return True
+    return os.stat(meta_path).st_mtime >= os.stat(json_path).st_mtime
+
+
+def read_records(json_path: str, fields: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+    """Load records from the columnar copy when fresh, else from JSON"""
+    if has_fresh_columnar(json_path):
+        return list(RecordView(load_columnar(columnar_path(json_path), fields)))
+    with open(json_path, "r") as f:
+        records = json.load(f)
+    if fields is not None:
+        records = [{k: rec[k] for k in fields if k in rec} for rec in records]
+    return records
+
+
+def write_records(json_path: str, records: List[Dict[str, Any]]):
+    """Write the JSON cache file and its columnar copy"""
+    os.makedirs(os.path.dirname(json_path), exist_ok=True)
+    with open(json_path, "w") as f:
+        json.dump(records, f, indent=2)
+    save_columnar(columnar_path(json_path), records)
@@ -1,13 +1,32 @@
 import requests
+import argparse
+import csv
+import io
 import json
 import os
+import re
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from contextlib import nullcontext
+from requests.adapters import HTTPAdapter
 from tenacity import retry, stop_after_attempt, wait_exponential
 
+from .columnar import read_records, write_records
+
 CACHE_PATH = os.path.join(os.path.dirname(__file__), '../../data/cache/raw_records.json')
+SCHEMA_DIR = os.path.join(os.path.dirname(__file__), '../../data/schemas')
+CHECKPOINT_DIR = os.path.join(os.path.dirname(__file__), '../../data/cache/checkpoints')
 DATASET_ID = "abcd-1234"  # Replace with actual dataset id
 API_URL = f"https://datacatalog.cookcountyil.gov/resource/{DATASET_ID}.json"
 BATCH_SIZE = 1000
 MAX_RECORDS = 10000  # Set a reasonable limit for demo
+MAX_IN_FLIGHT = 4
+MAX_ATTEMPTS = 5
+DEFAULT_RATE_LIMIT = int(os.getenv("DEFAULT_RATE_LIMIT", 60))  # requests per minute
+EXPORT_DIR = os.path.join(os.path.dirname(__file__), '../../data/cache/exports')
+EXPORT_CHUNK_SIZE = 1 << 20
 
 @retry(stop=stop_after_attempt(5), wait=wait_exponential(multiplier=1, min=2, max=10))
 def fetch_batch(offset: int, limit: int) -> list:
@@ -33,10 +52,512 @@ def fetch_all():
             break
     return all_records
 
-def save_records(records):
-    os.makedirs(os.path.dirname(CACHE_PATH), exist_ok=True)
-    with open(CACHE_PATH, "w") as f:
-        json.dump(records, f, indent=2)
+def load_rate_limit(dataset_id: str) -> int:
+    """Requests per minute recorded by api_discovery for the dataset, if any"""
+    path = os.path.join(SCHEMA_DIR, f"{dataset_id}.json")
+    try:
+        with open(path, "r") as f:
+            metadata = json.load(f)
+    except (OSError, ValueError):
+        return DEFAULT_RATE_LIMIT
+    limits = metadata.get("rate_limits") or {}
+    return limits.get("requests_per_minute") or DEFAULT_RATE_LIMIT
+
+
+class AdaptiveRateLimiter:
+    """Spaces requests shared by all workers and adapts to 429 responses.
+
+    Each 429 doubles the interval between requests (and honours Retry-After);
+    each success shrinks it by 10% back towards the configured rate.
+    """
+
+    def __init__(self, requests_per_minute: float, max_interval: float = 60.0):
+        self.min_interval = 60.0 / requests_per_minute
+        self.max_interval = max(max_interval, self.min_interval)
+        self.interval = self.min_interval
+        self._next = 0.0
+        self._lock = threading.Lock()
+
+    def wait(self):
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next)
+            self._next = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+    def backoff(self, retry_after=None):
+        with self._lock:
+            self.interval = min(self.interval * 2, self.max_interval)
+            try:
+                pause = float(retry_after)
+            except (TypeError, ValueError):
+                pause = self.interval
+            self._next = max(self._next, time.monotonic() + pause)
+
+    def success(self):
+        with self._lock:
+            self.interval = max(self.min_interval, self.interval * 0.9)
+
+
+def make_session(pool_size: int) -> requests.Session:
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def get_with_retries(session, limiter, url, params=None, stream=False):
+    """GET through the rate limiter, retrying connection errors, 429 and 5xx"""
+    for attempt in range(MAX_ATTEMPTS):
+        limiter.wait()
+        try:
+            response = session.get(url, params=params, timeout=60, stream=stream)
+        except requests.ConnectionError:
+            time.sleep(min(2 ** attempt, 10))
+            continue
+        if response.status_code == 429:
+            limiter.backoff(response.headers.get("Retry-After"))
+            continue
+        if response.status_code >= 500:
+            time.sleep(min(2 ** attempt, 10))
+            continue
+        response.raise_for_status()
+        limiter.success()
+        return response
+    raise RuntimeError(f"Giving up on {url} after {MAX_ATTEMPTS} attempts")
+
+
+def fetch_page(session, limiter, api_url, offset, limit, params=None):
+    """One Socrata page of ``limit`` rows from ``offset``"""
+    params = {**(params or {}), "$limit": limit, "$offset": offset}
+    return get_with_retries(session, limiter, api_url, params).json()
+
+
+def fetch_arcgis_page(session, limiter, layer_url, offset, limit, params=None):
+    """One ArcGIS FeatureServer query page, flattened to attribute dicts with
+    latitude/longitude taken from point geometry (requested as WGS84)"""
+    params = {
+        "where": "1=1", "outFields": "*", "outSR": 4326, "f": "json",
+        **(params or {}), "resultOffset": offset, "resultRecordCount": limit
+    }
+    body = get_with_retries(session, limiter, layer_url.rstrip("/") + "/query", params).json()
+    if "error" in body:
+        raise RuntimeError(f"ArcGIS error: {body['error'].get('message')}")
+    records = []
+    for feature in body.get("features", []):
+        rec = dict(feature.get("attributes") or {})
+        geometry = feature.get("geometry") or {}
+        if "x" in geometry and "y" in geometry:
+            rec["latitude"], rec["longitude"] = geometry["y"], geometry["x"]
+        records.append(rec)
+    return records
+
+
+def iter_csv_records(session, limiter, url, params=None):
+    """Stream a CSV download row by row; empty cells become None"""
+    response = get_with_retries(session, limiter, url, params, stream=True)
+    with response:
+        # csv needs the raw text: splitting lines first would break quoted
+        # cells that contain newlines
+        response.raw.decode_content = True
+        # urllib3 would close the stream at EOF, before TextIOWrapper is done
+        response.raw.auto_close = False
+        text = io.TextIOWrapper(response.raw, encoding=response.encoding or "utf-8", newline="")
+        for row in csv.DictReader(text):
+            yield {key: (value if value != "" else None) for key, value in row.items()}
+
+
+# Normalized schema names that differ from the record fields the pipeline uses
+STANDARD_TO_RECORD = {"property_id": "id", "construction_year": "year_built"}
+NUMERIC_FIELDS = ["square_feet", "year_built", "latitude", "longitude"]
+
+
+def load_field_mapping(schema_id):
+    """{source column: record field} from the schema's fields of interest"""
+    try:
+        with open(os.path.join(SCHEMA_DIR, f"{schema_id}.json"), "r") as f:
+            metadata = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return {field["original"]: STANDARD_TO_RECORD.get(field["normalized"], field["normalized"])
+            for field in metadata.get("fields_of_interest", [])}
+
+
+def coerce_number(value):
+    """Numeric strings (as CSV and Socrata deliver them) to int or float"""
+    if not isinstance(value, str):
+        return value
+    try:
+        number = float(value.replace(",", ""))
+    except ValueError:
+        return value
+    return int(number) if number.is_integer() and "." not in value else number
+
+
+def map_record(rec, mapping, source=None):
+    """Rename mapped columns and coerce numeric fields. With ``source`` the
+    record is tagged with it and its id namespaced by it."""
+    out = {}
+    for key, value in rec.items():
+        field = mapping.get(key, key)
+        if out.get(field) is None:
+            out[field] = value
+    for field in NUMERIC_FIELDS:
+        if field in out:
+            out[field] = coerce_number(out[field])
+    if source is not None:
+        if out.get("id") is not None:
+            out["id"] = f"{source}:{out['id']}"
+        out["source"] = source
+    return out
+
+
+def download_export(session, limiter, url, path, params=None, chunk_size=EXPORT_CHUNK_SIZE):
+    """Stream a bulk export to ``path`` in chunks; returns the bytes written.
+
+    The file is written under a temporary name and renamed when complete.
+    """
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = path + ".tmp"
+    written = 0
+    with get_with_retries(session, limiter, url, params, stream=True) as response, open(tmp_path, "wb") as f:
+        for chunk in response.iter_content(chunk_size=chunk_size):
+            f.write(chunk)
+            written += len(chunk)
+    os.replace(tmp_path, path)
+    return written
+
+
+def iter_csv_file(path):
+    """CSV rows as dicts, read incrementally; empty cells become None"""
+    with open(path, "r", newline="", encoding="utf-8-sig") as f:
+        for row in csv.DictReader(f):
+            yield {key: (value if value != "" else None) for key, value in row.items()}
+
+
+def _representative_point(geometry):
+    """(lat, lon) of a Point, or the vertex mean of a (multi)polygon's first ring"""
+    coords = (geometry or {}).get("coordinates")
+    kind = (geometry or {}).get("type")
+    if not coords:
+        return None
+    if kind == "Point":
+        return coords[1], coords[0]
+    if kind == "Polygon":
+        ring = coords[0]
+    elif kind == "MultiPolygon":
+        ring = coords[0][0]
+    else:
+        return None
+    return sum(p[1] for p in ring) / len(ring), sum(p[0] for p in ring) / len(ring)
+
+
+def iter_geojson_features(path, chunk_size=EXPORT_CHUNK_SIZE):
+    """Yield the features of a GeoJSON FeatureCollection one at a time.
+
+    The file is read in chunks and each feature is decoded as soon as it is
+    complete, so memory holds one chunk plus one feature.
+    """
+    decoder = json.JSONDecoder()
+    start = re.compile(r'"features"\s*:\s*\[')
+    separator = re.compile(r'[\s,]*')
+    with open(path, "r", encoding="utf-8") as f:
+        buffer = ""
+        match = None
+        while match is None:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                return
+            buffer += chunk
+            match = start.search(buffer)
+            if match is None:
+                # Keep enough of the tail for a key split across chunks
+                buffer = buffer[-64:]
+        pos = match.end()
+        eof = False
+        while True:
+            pos = separator.match(buffer, pos).end()
+            if buffer.startswith("]", pos):
+                return
+            try:
+                feature, pos = decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                # Incomplete feature: drop what was consumed and read on
+                if eof:
+                    raise
+                chunk = f.read(chunk_size)
+                eof = not chunk
+                buffer = buffer[pos:] + chunk
+                pos = 0
+                continue
+            yield feature
+
+
+def iter_geojson_file(path):
+    """GeoJSON features as flat records: properties plus latitude/longitude"""
+    for feature in iter_geojson_features(path):
+        rec = dict(feature.get("properties") or {})
+        point = _representative_point(feature.get("geometry"))
+        if point is not None:
+            rec["latitude"], rec["longitude"] = point
+        yield rec
+
+
+EXPORT_READERS = {"csv": iter_csv_file, "geojson": iter_geojson_file}
+
+
+def export_path(dataset_id, fmt):
+    return os.path.join(EXPORT_DIR, f"{dataset_id}.{fmt}")
+
+
+def socrata_export_url(api_url, fmt):
+    """The resource endpoint in the export format (…/resource/<id>.csv)"""
+    return os.path.splitext(api_url)[0] + f".{fmt}"
+
+
+def fetch_bulk(export_url, dataset_id=DATASET_ID, fmt="csv", params=None, requests_per_minute=None,
+               session=None, limiter=None):
+    """Download a bulk export to disk and yield its records mapped through
+    the dataset's normalized schema. Records are parsed as they are read,
+    so memory stays flat regardless of the export size."""
+    limiter = limiter or AdaptiveRateLimiter(requests_per_minute or load_rate_limit(dataset_id))
+    path = export_path(dataset_id, fmt)
+    with (make_session(1) if session is None else nullcontext(session)) as session:
+        download_export(session, limiter, export_url, path, params)
+    mapping = load_field_mapping(dataset_id)
+    for rec in EXPORT_READERS[fmt](path):
+        yield map_record(rec, mapping)
+
+
+class PageFetchError(Exception):
+    def __init__(self, offset, cause):
+        super().__init__(f"Error fetching batch at offset {offset}: {cause}")
+        self.offset = offset
+
+
+def iter_pages_concurrent(api_url, limiter, workers=MAX_IN_FLIGHT, batch_size=BATCH_SIZE,
+                          max_records=MAX_RECORDS, start_offset=0, params=None,
+                          session=None, fetch=fetch_page):
+    """Yield (offset, records) pages as they complete, keeping ``workers`` in flight.
+
+    Pages arrive in completion order, not offset order. Scheduling stops at
+    the first short page or failed page; once in-flight pages have drained,
+    a failure is raised as PageFetchError. ``fetch`` has fetch_page's
+    signature; a given ``session`` is used as is and left open.
+    """
+    end_offset = max_records
+    failed = None
+    next_offset = start_offset
+    session_context = make_session(workers) if session is None else nullcontext(session)
+    with session_context as session, ThreadPoolExecutor(max_workers=workers) as pool:
+        in_flight = {}
+        while True:
+            while len(in_flight) < workers and next_offset < end_offset and failed is None:
+                limit = min(batch_size, max_records - next_offset)
+                future = pool.submit(fetch, session, limiter, api_url, next_offset, limit, params)
+                in_flight[future] = (next_offset, limit)
+                next_offset += limit
+            if not in_flight:
+                break
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                offset, limit = in_flight.pop(future)
+                try:
+                    batch = future.result()
+                except Exception as e:
+                    if failed is None or offset < failed.offset:
+                        failed = PageFetchError(offset, e)
+                    continue
+                if len(batch) < limit:
+                    end_offset = min(end_offset, offset + len(batch))
+                yield offset, batch
+    if failed is not None:
+        raise failed
+
+
+def contiguous_records(pages, start_offset=0, batch_size=BATCH_SIZE):
+    """Concatenate pages from start_offset up to the first gap or short page"""
+    records = []
+    offset = start_offset
+    while offset in pages:
+        records.extend(pages[offset])
+        if len(pages[offset]) < batch_size:
+            break
+        offset += batch_size
+    return records
+
+
+def fetch_all_concurrent(api_url=API_URL, dataset_id=DATASET_ID, workers=MAX_IN_FLIGHT,
+                         batch_size=BATCH_SIZE, max_records=MAX_RECORDS, requests_per_minute=None):
+    """Fetch pages with up to ``workers`` offsets in flight on one pooled session.
+
+    If a page fails, only the contiguous pages before it are returned, like
+    fetch_all.
+    """
+    limiter = AdaptiveRateLimiter(requests_per_minute or load_rate_limit(dataset_id))
+    pages = {}
+    try:
+        for offset, batch in iter_pages_concurrent(api_url, limiter, workers, batch_size, max_records):
+            pages[offset] = batch
+    except PageFetchError as e:
+        print(e)
+    return contiguous_records(pages, 0, batch_size)
+
+
+def iter_fetched_records(api_url=API_URL, dataset_id=DATASET_ID, workers=MAX_IN_FLIGHT,
+                         batch_size=BATCH_SIZE, max_records=MAX_RECORDS, requests_per_minute=None):
+    """Yield fetched records in offset order, holding only pages not yet emitted"""
+    limiter = AdaptiveRateLimiter(requests_per_minute or load_rate_limit(dataset_id))
+    yield from ordered_records(iter_pages_concurrent(api_url, limiter, workers, batch_size, max_records), batch_size)
+
+
+def ordered_records(pages, batch_size=BATCH_SIZE):
+    """Records of (offset, batch) pages in offset order, holding only pages
+    not yet emitted"""
+    pending = {}
+    next_offset = 0
+    for offset, batch in pages:
+        pending[offset] = batch
+        while next_offset in pending:
+            batch = pending.pop(next_offset)
+            yield from batch
+            if len(batch) < batch_size:
+                return
+            next_offset += batch_size
+
+
+def checkpoint_dir(dataset_id):
+    return os.path.join(CHECKPOINT_DIR, dataset_id)
+
+
+def load_checkpoint(dataset_id):
+    try:
+        with open(os.path.join(checkpoint_dir(dataset_id), "cursor.json"), "r") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_checkpoint(dataset_id, checkpoint):
+    path = os.path.join(checkpoint_dir(dataset_id), "cursor.json")
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(checkpoint, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+def page_path(dataset_id, offset):
+    return os.path.join(checkpoint_dir(dataset_id), f"page_{offset:010d}.json")
+
+
+def spill_page(dataset_id, offset, records):
+    path = page_path(dataset_id, offset)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(records, f)
+    os.replace(tmp_path, path)
+
+
+def clear_pages(dataset_id):
+    directory = checkpoint_dir(dataset_id)
+    if not os.path.isdir(directory):
+        return
+    for name in os.listdir(directory):
+        if name.startswith("page_"):
+            os.remove(os.path.join(directory, name))
+
+
+def read_pages(dataset_id, end_offset, batch_size=BATCH_SIZE):
+    records = []
+    for offset in range(0, end_offset, batch_size):
+        path = page_path(dataset_id, offset)
+        if not os.path.exists(path):
+            break
+        with open(path, "r") as f:
+            records.extend(json.load(f))
+    return records
+
+
+def fetch_resumable(api_url=API_URL, dataset_id=DATASET_ID, incremental=False, workers=MAX_IN_FLIGHT,
+                    batch_size=BATCH_SIZE, max_records=MAX_RECORDS, requests_per_minute=None):
+    """Fetch a dataset with per-page spill files and a resumable cursor.
+
+    Each completed page is written to data/cache/checkpoints/<dataset_id>/
+    and the cursor records the contiguous offset reached, so a failed run
+    resumes from there instead of offset 0. With ``incremental`` only rows
+    updated at or after the last completed run's watermark are requested.
+    Rows are ordered by :updated_at, so a run cut off at ``max_records``
+    leaves only rows at or above the new watermark unfetched; rows fetched
+    twice are deduped by id. Raises PageFetchError (after checkpointing) if
+    a page fails.
+    """
+    checkpoint = load_checkpoint(dataset_id)
+    params = {"$select": ":*, *", "$order": ":updated_at, :id"}
+    watermark = checkpoint.get("watermark")
+    if incremental and watermark:
+        params["$where"] = f":updated_at >= '{watermark}'"
+
+    if checkpoint.get("complete", True) or checkpoint.get("where") != params.get("$where"):
+        clear_pages(dataset_id)
+        start_offset = 0
+    else:
+        start_offset = checkpoint.get("offset", 0)
+        print(f"Resuming {dataset_id} from offset {start_offset}")
+    checkpoint = {"offset": start_offset, "where": params.get("$where"), "complete": False, "watermark": watermark}
+    save_checkpoint(dataset_id, checkpoint)
+
+    limiter = AdaptiveRateLimiter(requests_per_minute or load_rate_limit(dataset_id))
+    completed = {}
+    end_offset = None
+    pages = iter_pages_concurrent(api_url, limiter, workers, batch_size, max_records, start_offset, params)
+    for offset, batch in pages:
+        spill_page(dataset_id, offset, batch)
+        completed[offset] = len(batch)
+        # Advance the cursor only over the contiguous prefix of spilled pages
+        while checkpoint["offset"] in completed and end_offset is None:
+            count = completed.pop(checkpoint["offset"])
+            if count < batch_size:
+                end_offset = checkpoint["offset"] + count
+            checkpoint["offset"] += count
+        save_checkpoint(dataset_id, checkpoint)
+
+    # A row updated mid-run moves to the end of the order and can be seen twice
+    records = merge_records([], read_pages(dataset_id, checkpoint["offset"], batch_size))
+    updated = [rec[":updated_at"] for rec in records if rec.get(":updated_at")]
+    if updated:
+        checkpoint["watermark"] = max(updated + ([watermark] if watermark else []))
+    checkpoint["complete"] = True
+    save_checkpoint(dataset_id, checkpoint)
+    clear_pages(dataset_id)
+    return records
+
+
+def record_key(rec):
+    return rec.get("id") if rec.get("id") is not None else rec.get(":id")
+
+
+def merge_records(existing, updates):
+    """Apply updated rows on top of existing ones, matching on id. Rows
+    without an id are kept as they are."""
+    merged = {}
+    for rec in list(existing) + list(updates):
+        key = record_key(rec)
+        merged[object() if key is None else key] = rec
+    return list(merged.values())
+
+
+def load_cached_records():
+    try:
+        return read_records(CACHE_PATH)
+    except (OSError, ValueError):
+        return []
+
+
+def save_records(records, path=CACHE_PATH):
+    write_records(path, records)
 
 def create_sample_data():
     """Create sample industrial property data for demo purposes"""
@@ -94,17 +615,85 @@ def create_sample_data():
     ]
     return sample_data
 
-def main():
+def fetch_or_sample(workers=MAX_IN_FLIGHT):
+    """Fetch real data, falling back to sample data if none arrives"""
     try:
-        # Try to fetch real data first
-        records = fetch_all()
+        if workers > 1:
+            records = fetch_all_concurrent(workers=workers)
+        else:
+            records = fetch_all()
         if not records:
             print("No data fetched from API, using sample data")
             records = create_sample_data()
     except Exception as e:
         print(f"Failed to fetch from API: {e}, using sample data")
         records = create_sample_data()
-    
+    return records
+
+def main():
+    parser = argparse.ArgumentParser(description="Fetch raw property records")
+    parser.add_argument("--workers", type=int, default=MAX_IN_FLIGHT,
+                        help="Pages kept in flight (1 fetches sequentially)")
+    parser.add_argument("--resume", action="store_true",
+                        help="Checkpoint pages to disk and resume an interrupted run")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Fetch only rows updated since the last completed run (implies --resume)")
+    parser.add_argument("--bulk", choices=sorted(EXPORT_READERS),
+                        help="Download the dataset's bulk export in this format instead of paging")
+    parser.add_argument("--sources", nargs="?", const="all", metavar="NAMES",
+                        help="Refresh the configured county sources concurrently (comma-separated names, default all)")
+    args = parser.parse_args()
+
+    if args.bulk:
+        from .stream import JSONArrayWriter
+        # Records go straight from the parsed export to the output file
+        tmp_path = CACHE_PATH + ".tmp"
+        try:
+            with JSONArrayWriter(tmp_path) as out:
+                for rec in fetch_bulk(socrata_export_url(API_URL, args.bulk), DATASET_ID, args.bulk,
+                                      {"$limit": MAX_RECORDS}):
+                    out.write(rec)
+        except Exception as e:
+            print(f"Bulk download failed: {e}")
+            sys.exit(1)
+        os.replace(tmp_path, CACHE_PATH)
+        print(f"Saved {out.count} records to {CACHE_PATH}")
+        return
+
+    if args.sources:
+        from .sources import ingest, load_sources
+        configs = load_sources()
+        if args.sources != "all":
+            names = args.sources.split(",")
+            configs = [config for config in configs if config["name"] in names]
+        records = []
+        for name, result in ingest(configs).items():
+            if result["error"]:
+                print(f"Source {name} failed: {result['error']}")
+            else:
+                print(f"Fetched {len(result['records'])} records from {name} in {result['seconds']:.1f}s")
+            records.extend(result["records"])
+        if not records:
+            print("No data fetched from any source, using sample data")
+            records = create_sample_data()
+        save_records(records)
+        print(f"Saved {len(records)} records to {CACHE_PATH}")
+        return
+
+    if args.resume or args.incremental:
+        try:
+            records = fetch_resumable(incremental=args.incremental, workers=args.workers)
+        except PageFetchError as e:
+            print(f"{e}; progress checkpointed, rerun with the same options to resume")
+            sys.exit(1)
+        if args.incremental:
+            print(f"Fetched {len(records)} changed records")
+            records = merge_records(load_cached_records(), records)
+        save_records(records)
+        print(f"Saved {len(records)} records to {CACHE_PATH}")
+        return
+
+    records = fetch_or_sample(args.workers)
     save_records(records)
     print(f"Saved {len(records)} records to {CACHE_PATH}")
 
@@ -1,47 +1,52 @@
-import json
+import argparse
 import os
-import re
+
+from .columnar import has_fresh_columnar, read_records, write_records
+from .zoning import zoning_family
 
 RAW_PATH = os.path.join(os.path.dirname(__file__), '../../data/cache/raw_records.json')
 OUT_PATH = os.path.join(os.path.dirname(__file__), '../../data/cache/industrial_properties.json')
-INDUSTRIAL_CODES = [r"^M1$", r"^M2$", r"^I-1$", r"^I-2$"]
 
 
 def load_records():
-    with open(RAW_PATH, "r") as f:
-        return json.load(f)
+    return read_records(RAW_PATH)
 
 
 def is_industrial(zoning):
-    if not zoning:
-        return False
-    zoning = str(zoning).strip().upper()
-    for code in INDUSTRIAL_CODES:
-        if re.match(code, zoning):
-            return True
-    return False
+    return zoning_family(zoning) is not None
 
 
-def filter_industrial(records):
-    filtered = []
+def iter_industrial(records):
+    """Yield industrial records, annotated with their zoning_family"""
     for rec in records:
-        zoning = rec.get("zoning") or rec.get("normalized_zoning")
-        if is_industrial(zoning):
-            filtered.append(rec)
-    return filtered
+        family = zoning_family(rec.get("zoning") or rec.get("normalized_zoning"))
+        if family is not None:
+            rec["zoning_family"] = family
+            yield rec
+
+
+def filter_industrial(records):
+    return list(iter_industrial(records))
 
 
-def save_records(records):
-    os.makedirs(os.path.dirname(OUT_PATH), exist_ok=True)
-    with open(OUT_PATH, "w") as f:
-        json.dump(records, f, indent=2)
+def save_records(records, path=OUT_PATH):
+    write_records(path, records)
 
 
 def main():
-    records = load_records()
-    industrial = filter_industrial(records)
-    save_records(industrial)
-    print(f"Saved {len(industrial)} industrial properties to {OUT_PATH}")
+    parser = argparse.ArgumentParser(description="Keep the industrial-zoned records")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Filter shards of the columnar raw records on this many processes")
+    args = parser.parse_args()
+
+    if args.workers > 1 and has_fresh_columnar(RAW_PATH):
+        from .parallel import parallel_filter_industrial
+        count = parallel_filter_industrial(RAW_PATH, OUT_PATH, args.workers)
+    else:
+        industrial = filter_industrial(load_records())
+        save_records(industrial)
+        count = len(industrial)
+    print(f"Saved {count} industrial properties to {OUT_PATH}")
 
 
 if __name__ == "__main__":
@@ -1,55 +1,417 @@
-import json
 import os
+import tempfile
+
 import numpy as np
 
+from .columnar import read_records, write_records
+
 IN_PATH = os.path.join(os.path.dirname(__file__), '../../data/cache/industrial_properties.json')
 OUT_PATH = os.path.join(os.path.dirname(__file__), '../../data/cache/outlier_flags.json')
 
 
 def load_records():
-    with open(IN_PATH, "r") as f:
-        return json.load(f)
+    return read_records(IN_PATH)
+
+
+# Each rule flags one numeric field (or, for "spatial", the coordinates).
+# Methods: "zscore" (|x - mean| / std > threshold), "iqr" (outside
+# [q1 - k*iqr, q3 + k*iqr]), "mad" (robust z 0.6745 * |x - median| / MAD
+# > threshold) and "spatial" (fewer than min_neighbors other points within
+# radius_m). "by" computes the statistics per group of another field;
+# groups smaller than MIN_GROUP_SIZE use the global statistics instead.
+# Properties with no other property within 10 km; opt in with FLAG_LOCATION_OUTLIERS=1
+LOCATION_RULE = {"flag": "location_outlier", "method": "spatial", "radius_m": 10000, "min_neighbors": 1}
+OUTLIER_RULES = [
+    {"flag": "size_outlier", "field": "square_feet", "method": "zscore", "threshold": 3},
+    {"flag": "age_outlier", "field": "year_built", "method": "iqr", "k": 1.5},
+] + ([LOCATION_RULE] if os.getenv("FLAG_LOCATION_OUTLIERS") == "1" else [])
+MIN_GROUP_SIZE = 5
+MAD_SCALE = 0.6745
+# Coordinates buffered per write when the streaming pass spills them
+SPILL_CHUNK = 65536
+
+
+def numeric_column(records, field):
+    """float64 column of ``field`` with NaN for missing or non-numeric values"""
+    return np.array([
+        v if isinstance(v, (int, float)) and not isinstance(v, bool) else np.nan
+        for v in (rec.get(field) for rec in records)
+    ], dtype=float)
+
+
+def group_codes(groups):
+    """(codes, n_groups) for a sequence of group labels; None is its own group"""
+    if hasattr(groups, "codes"):  # columnar DictionaryColumn
+        return np.asarray(groups.codes) + 1, len(groups.values) + 1
+    lookup = {}
+    codes = np.fromiter((lookup.setdefault(g, len(lookup)) for g in groups), dtype=np.int64, count=len(groups))
+    return codes, len(lookup)
+
+
+def _group_sorted(values, codes, n_groups):
+    valid = ~np.isnan(values)
+    v, c = values[valid], codes[valid]
+    order = np.lexsort((v, c))
+    counts = np.bincount(c, minlength=n_groups)
+    starts = np.cumsum(counts) - counts
+    return v[order], counts, starts
+
+
+def group_percentiles(values, codes, n_groups, qs):
+    """Per-group percentiles for each q in qs (np.percentile's linear method),
+    NaN ignored; the values are sorted once for all of them"""
+    v, counts, starts = _group_sorted(values, codes, n_groups)
+    ok = counts > 0
+    results = []
+    for q in qs:
+        result = np.full(n_groups, np.nan)
+        h = (counts[ok] - 1) * q / 100.0
+        lo = np.floor(h).astype(np.int64)
+        hi = np.minimum(lo + 1, counts[ok] - 1)
+        lower, upper = v[starts[ok] + lo], v[starts[ok] + hi]
+        result[ok] = lower + (h - lo) * (upper - lower)
+        results.append(result)
+    return results
+
+
+def group_percentile(values, codes, n_groups, q):
+    """Per-group q-th percentile (np.percentile's linear method), NaN ignored"""
+    return group_percentiles(values, codes, n_groups, [q])[0]
+
+
+def group_moments(values, codes, n_groups):
+    """Per-group (count, mean, population std), NaN ignored"""
+    valid = ~np.isnan(values)
+    v, c = values[valid], codes[valid]
+    counts = np.bincount(c, minlength=n_groups)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean = np.bincount(c, weights=v, minlength=n_groups) / counts
+        std = np.sqrt(np.bincount(c, weights=(v - mean[c]) ** 2, minlength=n_groups) / counts)
+    return counts, mean, std
+
+
+def _with_global_fallback(per_group, counts, global_value, min_size):
+    return np.where(counts >= min_size, per_group, global_value)
 
 
-def zscore_outliers(values, threshold=3):
-    arr = np.array(values, dtype=float)
-    mean = np.mean(arr)
-    std = np.std(arr)
-    return [abs((v - mean) / std) > threshold if std > 0 else False for v in arr]
+def _grouped_stats(values, codes, n_groups, stat, min_size):
+    """stat(values, codes, n_groups) per group, with small groups replaced by
+    the global result, broadcast back to one entry per value"""
+    global_result = stat(values, np.zeros(len(values), dtype=np.int64), 1)
+    if codes is None:
+        return tuple(r[0] for r in global_result)
+    counts = np.bincount(codes[~np.isnan(values)], minlength=n_groups)
+    group_result = stat(values, codes, n_groups)
+    return tuple(_with_global_fallback(r, counts, g[0], min_size)[codes]
+                 for r, g in zip(group_result, global_result))
 
 
-def iqr_outliers(values):
-    arr = np.array(values, dtype=float)
-    q1 = np.percentile(arr, 25)
-    q3 = np.percentile(arr, 75)
+def zscore_outliers(values, threshold=3, groups=None, min_group_size=MIN_GROUP_SIZE):
+    arr = np.asarray(values, dtype=float)
+    codes, n_groups = group_codes(groups) if groups is not None else (None, 1)
+    _, mean, std = _grouped_stats(arr, codes, n_groups, group_moments, min_group_size)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return (std > 0) & (np.abs(arr - mean) / std > threshold)
+
+
+def iqr_outliers(values, k=1.5, groups=None, min_group_size=MIN_GROUP_SIZE):
+    arr = np.asarray(values, dtype=float)
+    codes, n_groups = group_codes(groups) if groups is not None else (None, 1)
+
+    def quartiles(v, c, n):
+        return group_percentile(v, c, n, 25), group_percentile(v, c, n, 75)
+
+    q1, q3 = _grouped_stats(arr, codes, n_groups, quartiles, min_group_size)
     iqr = q3 - q1
-    lower = q1 - 1.5 * iqr
-    upper = q3 + 1.5 * iqr
-    return [(v < lower or v > upper) for v in arr]
+    return (arr < q1 - k * iqr) | (arr > q3 + k * iqr)
 
 
-def flag_outliers(records):
-    sizes = [rec.get("square_feet", 0) for rec in records]
-    ages = [rec.get("year_built", 0) for rec in records]
-    size_flags = zscore_outliers(sizes)
-    age_flags = iqr_outliers(ages)
-    for i, rec in enumerate(records):
-        rec["size_outlier"] = bool(size_flags[i])
-        rec["age_outlier"] = bool(age_flags[i])
+def mad_outliers(values, threshold=3.5, groups=None, min_group_size=MIN_GROUP_SIZE):
+    """Robust z-score: MAD_SCALE * |x - median| / MAD > threshold"""
+    arr = np.asarray(values, dtype=float)
+    codes, n_groups = group_codes(groups) if groups is not None else (None, 1)
+
+    def median_mad(v, c, n):
+        median = group_percentile(v, c, n, 50)
+        return median, group_percentile(np.abs(v - median[c]), c, n, 50)
+
+    median, mad = _grouped_stats(arr, codes, n_groups, median_mad, min_group_size)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return (mad > 0) & (MAD_SCALE * np.abs(arr - median) / mad > threshold)
+
+
+def spatial_outliers(latitudes, longitudes, radius_m=10000, min_neighbors=1):
+    """Points with fewer than ``min_neighbors`` other points within ``radius_m``.
+
+    Points are bucketed into grid cells a quarter of the radius high. Points
+    in the 3x3 cells around a point are always within the radius (a lower
+    bound on its neighbors) and the cells four rows around it cover the
+    whole radius (an upper bound). Both counts are binary searches over all
+    points at once and settle most points; only the rest get an exact radius
+    query. Missing coordinates are not flagged.
+    """
+    from ..comparables.spatial import METERS_PER_DEGREE, GridIndex
+
+    lat = np.asarray(latitudes, dtype=float)
+    lon = np.asarray(longitudes, dtype=float)
+    flags = np.zeros(len(lat), dtype=bool)
+    index = GridIndex(lat, lon, cell_meters=radius_m / 4)
+    if not len(index):
+        return flags
+
+    # Queries run in the index's key order, which keeps the binary searches
+    # cache-friendly; results map back through index.positions
+    valid = index.positions
+    rows, cols = index.keys >> 32, index.keys & 0xFFFFFFFF
+    # Longitude cells narrow towards the poles, so the radius spans more columns
+    max_lat = min(np.max(np.abs(lat[valid])) + radius_m / METERS_PER_DEGREE, 89.0)
+    col_span = 4 * int(np.ceil(1 / np.cos(np.radians(max_lat))))
+
+    def count(row_offset, col_lo, col_hi):
+        base = (rows + row_offset) << 32
+        return (np.searchsorted(index.keys, base + cols + col_hi, side="right") -
+                np.searchsorted(index.keys, base + cols + col_lo, side="left"))
+
+    lower = sum(count(dr, -1, 1) for dr in range(-1, 2)) - 1
+    upper = sum(count(dr, -col_span, col_span) for dr in range(-4, 5)) - 1
+    flags[valid[upper < min_neighbors]] = True
+    for i in valid[(lower < min_neighbors) & (upper >= min_neighbors)]:
+        if len(index.query_radius(lat[i], lon[i], radius_m)) - 1 < min_neighbors:
+            flags[i] = True
+    return flags
+
+
+OUTLIER_METHODS = {"zscore": zscore_outliers, "iqr": iqr_outliers, "mad": mad_outliers}
+
+
+def detect_outliers(columns, rules=OUTLIER_RULES):
+    """Apply outlier ``rules`` to columns (field -> array, NaN for missing).
+
+    Returns {flag name: bool array}.
+    """
+    flags = {}
+    for rule in rules:
+        options = {k: v for k, v in rule.items() if k not in ("flag", "field", "method", "by")}
+        if rule["method"] == "spatial":
+            flags[rule["flag"]] = spatial_outliers(columns["latitude"], columns["longitude"], **options)
+            continue
+        if rule.get("by"):
+            options["groups"] = columns[rule["by"]]
+        flags[rule["flag"]] = OUTLIER_METHODS[rule["method"]](columns[rule["field"]], **options)
+    return flags
+
+
+def rule_columns(records, rules=OUTLIER_RULES):
+    """The columns detect_outliers needs for ``rules``, built from records"""
+    columns = {}
+    for rule in rules:
+        fields = ["latitude", "longitude"] if rule["method"] == "spatial" else [rule["field"]]
+        for field in fields:
+            if field not in columns:
+                columns[field] = numeric_column(records, field)
+        if rule.get("by") and rule["by"] not in columns:
+            columns[rule["by"]] = [rec.get(rule["by"]) for rec in records]
+    return columns
+
+
+def flag_outliers(records, rules=OUTLIER_RULES):
+    flags = detect_outliers(rule_columns(records, rules), rules)
+    for name, values in flags.items():
+        for rec, flag in zip(records, values.tolist()):
+            rec[name] = flag
     return records
 
 
-def save_records(records):
-    os.makedirs(os.path.dirname(OUT_PATH), exist_ok=True)
-    with open(OUT_PATH, "w") as f:
-        json.dump(records, f, indent=2)
+class RunningMoments:
+    """Single-pass mean and population std (Welford)."""
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self._m2 = 0.0
+
+    def update(self, value):
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self._m2 += delta * (value - self.mean)
+
+    @property
+    def std(self):
+        return (self._m2 / self.count) ** 0.5 if self.count else 0.0
+
+
+class ValueHistogram:
+    """Counts of distinct values for streaming percentiles.
+
+    Exact (matching np.percentile's linear interpolation) while there are at
+    most ``max_bins`` distinct values, which always holds for years. Beyond
+    that values are rounded to progressively wider bins, bounding memory at
+    the cost of precision.
+    """
+
+    def __init__(self, max_bins=10000):
+        self.max_bins = max_bins
+        self.width = 0.0
+        self.counts = {}
+        self.count = 0
+
+    def _bin(self, value):
+        return round(value / self.width) * self.width if self.width else value
+
+    def update(self, value, n=1):
+        key = self._bin(value)
+        self.counts[key] = self.counts.get(key, 0) + n
+        self.count += n
+        if len(self.counts) > self.max_bins:
+            spread = max(self.counts) - min(self.counts)
+            self.width = max(self.width * 2, spread / self.max_bins * 2)
+            coarse = {}
+            for key, n in self.counts.items():
+                coarse[self._bin(key)] = coarse.get(self._bin(key), 0) + n
+            self.counts = coarse
+
+    def _kth(self, keys, cumulative, k):
+        return keys[int(np.searchsorted(cumulative, k, side="right"))]
+
+    def percentile(self, q):
+        if not self.count:
+            return float("nan")
+        keys = sorted(self.counts)
+        cumulative = np.cumsum([self.counts[k] for k in keys])
+        h = (self.count - 1) * q / 100.0
+        lo = int(np.floor(h))
+        lower = self._kth(keys, cumulative, lo)
+        upper = self._kth(keys, cumulative, min(lo + 1, self.count - 1))
+        return lower + (h - lo) * (upper - lower)
+
+
+def as_number(value):
+    """value as a float, or None when it is missing or not numeric"""
+    return float(value) if isinstance(value, (int, float)) and not isinstance(value, bool) else None
+
+
+def _accumulator(method):
+    return RunningMoments() if method == "zscore" else ValueHistogram()
+
+
+def _rule_params(rule, acc):
+    """The bounds one rule's streaming check needs, from its accumulator"""
+    if rule["method"] == "zscore":
+        return acc.mean, acc.std
+    if rule["method"] == "iqr":
+        q1, q3 = acc.percentile(25), acc.percentile(75)
+        k = rule.get("k", 1.5)
+        return q1 - k * (q3 - q1), q3 + k * (q3 - q1)
+    # mad: the deviations' histogram follows from the values' histogram
+    median = acc.percentile(50)
+    deviations = ValueHistogram(acc.max_bins)
+    for value, n in acc.counts.items():
+        deviations.update(abs(value - median), n)
+    return median, deviations.percentile(50)
+
+
+def _is_outlier(rule, params, value):
+    if value is None:
+        return False
+    if rule["method"] == "zscore":
+        mean, std = params
+        return std > 0 and abs(value - mean) / std > rule.get("threshold", 3)
+    if rule["method"] == "iqr":
+        lower, upper = params
+        return value < lower or value > upper
+    median, mad = params
+    return mad > 0 and MAD_SCALE * abs(value - median) / mad > rule.get("threshold", 3.5)
+
+
+def outlier_bounds(records, rules=OUTLIER_RULES, spill_dir=None, min_group_size=MIN_GROUP_SIZE):
+    """First streaming pass: the statistics detect_outliers derives in memory
+    for ``rules``, per group for rules with "by" (groups smaller than
+    min_group_size use the global statistics). Missing values are skipped.
+
+    Memory follows the number of groups and distinct values, not records,
+    except for spatial rules: coordinates are spilled to a float64 file in
+    ``spill_dir`` and memory-mapped for the neighbor search, whose grid
+    index still holds a sort key per located record.
+    """
+    numeric = [rule for rule in rules if rule["method"] != "spatial"]
+    spatial = [rule for rule in rules if rule["method"] == "spatial"]
+    totals = {rule["flag"]: _accumulator(rule["method"]) for rule in numeric}
+    groups = {rule["flag"]: {} for rule in numeric if rule.get("by")}
+    spill = tempfile.NamedTemporaryFile(dir=spill_dir, prefix="coordinates-", suffix=".f64", delete=False) \
+        if spatial else None
+    try:
+        buffer = []
+        count = 0
+        for rec in records:
+            count += 1
+            for rule in numeric:
+                value = as_number(rec.get(rule["field"]))
+                if value is None:
+                    continue
+                totals[rule["flag"]].update(value)
+                if rule.get("by"):
+                    by_group = groups[rule["flag"]]
+                    label = rec.get(rule["by"])
+                    if label not in by_group:
+                        by_group[label] = _accumulator(rule["method"])
+                    by_group[label].update(value)
+            if spill:
+                lat, lon = as_number(rec.get("latitude")), as_number(rec.get("longitude"))
+                buffer.append((np.nan if lat is None else lat, np.nan if lon is None else lon))
+                if len(buffer) >= SPILL_CHUNK:
+                    np.array(buffer, dtype=np.float64).tofile(spill)
+                    buffer = []
+
+        bounds = {}
+        for rule in numeric:
+            default = _rule_params(rule, totals[rule["flag"]])
+            by_group = {label: _rule_params(rule, acc) for label, acc in groups.get(rule["flag"], {}).items()
+                        if acc.count >= min_group_size}
+            bounds[rule["flag"]] = {"by": rule.get("by"), "groups": by_group, "default": default}
+        if spill:
+            np.array(buffer, dtype=np.float64).reshape(-1, 2).tofile(spill)
+            spill.close()
+            coords = np.memmap(spill.name, dtype=np.float64, mode="r", shape=(count, 2)) if count \
+                else np.empty((0, 2))
+            for rule in spatial:
+                options = {k: v for k, v in rule.items() if k not in ("flag", "method")}
+                flags = spatial_outliers(coords[:, 0], coords[:, 1], **options)
+                bounds[rule["flag"]] = {"rows": set(np.flatnonzero(flags).tolist())}
+            del coords
+        return bounds
+    finally:
+        if spill:
+            spill.close()
+            os.remove(spill.name)
+
+
+def iter_flagged(records, bounds, rules=OUTLIER_RULES):
+    """Second streaming pass: annotate records (in the same order as the
+    first pass) using outlier_bounds() for the same rules"""
+    for i, rec in enumerate(records):
+        for rule in rules:
+            rule_bounds = bounds[rule["flag"]]
+            if rule["method"] == "spatial":
+                rec[rule["flag"]] = i in rule_bounds["rows"]
+                continue
+            params = rule_bounds["default"]
+            if rule_bounds["by"]:
+                params = rule_bounds["groups"].get(rec.get(rule_bounds["by"]), params)
+            rec[rule["flag"]] = bool(_is_outlier(rule, params, as_number(rec.get(rule["field"]))))
+        yield rec
+
+
+def save_records(records, path=OUT_PATH):
+    write_records(path, records)
 
 
 def main():
     records = load_records()
     flagged = flag_outliers(records)
     save_records(flagged)
-    print(f"Flagged outliers and saved {len(flagged)} records to {OUT_PATH}")
+    counts = ", ".join(f"{rule['flag']}={sum(rec[rule['flag']] for rec in flagged)}" for rule in OUTLIER_RULES)
+    print(f"Flagged outliers ({counts}) and saved {len(flagged)} records to {OUT_PATH}")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,160 @@
+import json
+import math
+import os
+import shutil
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from .columnar import RecordView, columnar_path, has_fresh_columnar, load_columnar, save_columnar_rows, slice_columnar
+from .validate import MAX_REPORTED_ERRORS, VALIDATION_RULES, build_report, columnar_columns, validate_columns
+from .zoning import family_column
+
+# Rows per shard; inputs are cut into at least one shard per worker
+SHARD_ROWS = 100_000
+
+# Columnar input opened once per worker process (inherited from the parent
+# where processes fork). Columns are memory-mapped, so every worker reads
+# the same pages from the OS page cache and shards cross the process
+# boundary as row ranges rather than pickled records.
+_columnar = None
+_columnar_dir = None
+
+
+def _open_columnar(path):
+    global _columnar, _columnar_dir
+    if _columnar_dir != path:
+        _columnar = load_columnar(path)
+        _columnar_dir = path
+    return _columnar
+
+
+def shard_ranges(count, workers, shard_rows=SHARD_ROWS):
+    """[start, stop) row ranges covering ``count`` rows in order"""
+    shards = min(count, max(workers, math.ceil(count / shard_rows))) if count else 0
+    bounds = np.linspace(0, count, shards + 1).astype(int).tolist() if shards else [0]
+    return list(zip(bounds[:-1], bounds[1:]))
+
+
+def industrial_families(columnar):
+    """Zoning family per row (None when not industrial), classifying each
+    distinct zoning string once. Like filter_industrial, rows with a
+    missing or empty zoning fall back to normalized_zoning."""
+    count = columnar["__meta__"]["count"]
+    families = np.full(count, None, dtype=object)
+    fallback = np.ones(count, dtype=bool)
+    zoning = columnar.get("zoning")
+    if zoning is not None:
+        families = family_column(zoning)
+        fallback = np.array([not v for v in zoning.values] + [True], dtype=bool)[np.asarray(zoning.codes)]
+    normalized = columnar.get("normalized_zoning")
+    if normalized is not None and fallback.any():
+        families = np.where(fallback, family_column(normalized), families)
+    return families
+
+
+def write_fragment(path, records):
+    """Write records as the inside of an indent=2 JSON array, so fragments
+    joined with ",\\n" and wrapped in "[\\n ... \\n]" equal json.dump(indent=2)"""
+    with open(path, "w") as f:
+        if records:
+            f.write(json.dumps(records, indent=2)[2:-2])
+
+
+def _filter_shard(in_dir, start, stop, fragment):
+    shard = slice_columnar(_open_columnar(in_dir), start, stop)
+    families = industrial_families(shard)
+    keep = families != None  # noqa: E711 (element-wise)
+    view = RecordView(shard)
+    records = []
+    for i, family in zip(np.flatnonzero(keep).tolist(), families[keep].tolist()):
+        rec = view[i]
+        rec["zoning_family"] = family
+        records.append(rec)
+    write_fragment(fragment, records)
+    return keep
+
+
+def _validate_shard(in_dir, start, stop, fragment, rules, max_reported):
+    shard = slice_columnar(_open_columnar(in_dir), start, stop)
+    valid, report = validate_columns(columnar_columns(shard), stop - start, rules, max_reported)
+    view = RecordView(shard)
+    write_fragment(fragment, [view[i] for i in np.flatnonzero(valid).tolist()])
+    for err in report["errors"]:
+        err["row"] += start
+    return valid, report
+
+
+def merge_reports(reports, rules=VALIDATION_RULES, max_reported=MAX_REPORTED_ERRORS):
+    """Combine per-shard validate_columns() reports (in shard order) into the
+    report validate_columns() gives for the whole input"""
+    rule_counts = {rule["rule"]: sum(r["rule_counts"][rule["rule"]] for r in reports) for rule in rules}
+    errors = []
+    for rule in rules:
+        rows = [err for r in reports for err in r["errors"] if err["rule"] == rule["rule"]]
+        errors.extend(rows[:max_reported])
+    errors.sort(key=lambda err: err["row"])
+    return build_report(sum(r["total"] for r in reports), sum(r["invalid"] for r in reports), rule_counts, errors)
+
+
+def run_sharded(in_path, out_path, task, workers, *args):
+    """Run ``task(in_dir, start, stop, fragment, *args)`` over shards of
+    ``in_path``'s columnar copy on a process pool, then join the JSON
+    fragments in shard order into ``out_path``. Returns (results, columnar)
+    with results in shard order."""
+    in_dir = columnar_path(in_path)
+    columnar = _open_columnar(in_dir)
+    ranges = shard_ranges(columnar["__meta__"]["count"], workers)
+    shard_dir = out_path + ".shards"
+    shutil.rmtree(shard_dir, ignore_errors=True)
+    os.makedirs(shard_dir)
+    fragments = [os.path.join(shard_dir, f"{i:05d}.json") for i in range(len(ranges))]
+    try:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_open_columnar, initargs=(in_dir,)) as pool:
+            futures = [pool.submit(task, in_dir, start, stop, fragment, *args)
+                       for (start, stop), fragment in zip(ranges, fragments)]
+            results = [future.result() for future in futures]
+
+        tmp_path = out_path + ".tmp"
+        with open(tmp_path, "w") as out:
+            written = 0
+            for fragment in fragments:
+                if os.path.getsize(fragment):
+                    out.write("[\n" if written == 0 else ",\n")
+                    with open(fragment, "r") as f:
+                        shutil.copyfileobj(f, out)
+                    written += 1
+            out.write("\n]" if written else "[]")
+        os.replace(tmp_path, out_path)
+    finally:
+        shutil.rmtree(shard_dir, ignore_errors=True)
+    return results, columnar
+
+
+def require_columnar(in_path):
+    if not has_fresh_columnar(in_path):
+        raise FileNotFoundError(f"No fresh columnar copy of {in_path}; parallel stages read the columnar cache")
+
+
+def parallel_filter_industrial(in_path, out_path, workers):
+    """filter_industrial over shards of the columnar input on ``workers``
+    processes. Writes the same JSON as the sequential stage and its
+    columnar copy; returns the number of industrial records."""
+    require_columnar(in_path)
+    masks, columnar = run_sharded(in_path, out_path, _filter_shard, workers)
+    keep = np.concatenate(masks) if masks else np.zeros(0, dtype=bool)
+    rows = np.flatnonzero(keep)
+    families = industrial_families(columnar)[rows].tolist()
+    save_columnar_rows(columnar_path(out_path), columnar, rows, {"zoning_family": families})
+    return len(rows)
+
+
+def parallel_validate(in_path, valid_path, workers, rules=VALIDATION_RULES, max_reported=MAX_REPORTED_ERRORS):
+    """validate_columns over shards of the columnar input on ``workers``
+    processes. Writes the valid records (JSON and columnar) and returns the
+    merged report."""
+    require_columnar(in_path)
+    results, columnar = run_sharded(in_path, valid_path, _validate_shard, workers, rules, max_reported)
+    valid = np.concatenate([mask for mask, _ in results]) if results else np.zeros(0, dtype=bool)
+    save_columnar_rows(columnar_path(valid_path), columnar, np.flatnonzero(valid))
+    return merge_reports([report for _, report in results], rules, max_reported)
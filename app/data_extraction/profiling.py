@@ -0,0 +1,190 @@
+import argparse
+import cProfile
+import importlib
+import json
+import os
+import pstats
+import sys
+import time
+import tracemalloc
+import traceback
+
+from .columnar import META_FILE, columnar_path, has_fresh_columnar
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# JSON files larger than this are not parsed just to count their records
+COUNT_MAX_BYTES = 512 * 1024 * 1024
+TOP_FUNCTIONS = 15
+
+# Module globals naming each stage's input and output files
+STAGE_FILES = {
+    "app.data_extraction.fetch": ([], ["CACHE_PATH"]),
+    "app.data_extraction.filter_industrial": (["RAW_PATH"], ["OUT_PATH"]),
+    "app.data_extraction.validate": (["IN_PATH"], ["VALID_PATH", "REPORT_PATH", "LOG_PATH"]),
+    "app.data_extraction.flag_outliers": (["IN_PATH"], ["OUT_PATH"]),
+    "app.data_extraction.stats": (["IN_PATH"], ["OUT_PATH"]),
+}
+
+
+def record_count(path):
+    """Records in a JSON array cache file: from its columnar copy when fresh,
+    else by parsing it. None for missing files, non-arrays and very large files."""
+    if not path.endswith(".json") or not os.path.exists(path):
+        return None
+    if has_fresh_columnar(path):
+        with open(os.path.join(columnar_path(path), META_FILE), "r") as f:
+            return json.load(f)["count"]
+    if os.path.getsize(path) > COUNT_MAX_BYTES:
+        return None
+    try:
+        with open(path, "r") as f:
+            data = json.load(f)
+    except ValueError:
+        return None
+    return len(data) if isinstance(data, list) else None
+
+
+def file_bytes(path):
+    return os.path.getsize(path) if os.path.exists(path) else 0
+
+
+def reset_peak_rss():
+    """Restart the peak RSS measurement from the current RSS (Linux only)"""
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+        return True
+    except OSError:
+        return False
+
+
+def peak_rss_bytes(since_reset=False):
+    """Peak RSS since reset_peak_rss() when ``since_reset``, else since the
+    process started"""
+    if since_reset:
+        try:
+            with open("/proc/self/status", "r") as f:
+                for line in f:
+                    if line.startswith("VmHWM:"):
+                        return int(line.split()[1]) * 1024
+        except (OSError, ValueError):
+            pass
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def process_io():
+    """Bytes this process read and wrote through system calls (Linux only)"""
+    try:
+        with open("/proc/self/io", "r") as f:
+            fields = dict(line.split(": ") for line in f.read().splitlines())
+        return int(fields["rchar"]), int(fields["wchar"])
+    except (OSError, KeyError, ValueError):
+        return None, None
+
+
+def top_functions(profiler, limit=TOP_FUNCTIONS):
+    """The ``limit`` functions with the most cumulative time"""
+    stats = pstats.Stats(profiler)
+    rows = []
+    for (filename, line, name), (_, calls, own, cumulative, _) in stats.stats.items():
+        rows.append({"function": f"{os.path.relpath(filename) if os.path.isabs(filename) else filename}:{line}({name})",
+                     "calls": calls, "own_s": own, "cumulative_s": cumulative})
+    rows.sort(key=lambda row: row["cumulative_s"], reverse=True)
+    return rows[:limit]
+
+
+def profile_stage(module_name, argv=(), cprofile_path=None, trace_memory=False):
+    """Run a stage's main() in this process and measure it.
+
+    Time, I/O and peak RSS cover main() only; records are counted after
+    the measurement. Returns the stage's report entry; "status" is "failed"
+    (with "error") if main() raised or exited non-zero, and "exit_code"
+    holds its exit status.
+    """
+    module = importlib.import_module(module_name)
+    inputs, outputs = STAGE_FILES.get(module_name, ([], []))
+    input_paths = [os.path.normpath(getattr(module, name)) for name in inputs]
+    output_paths = [os.path.normpath(getattr(module, name)) for name in outputs]
+    report = {
+        "stage": module_name.rsplit(".", 1)[-1],
+        "module": module_name,
+        "inputs": [{"path": os.path.relpath(p), "bytes": file_bytes(p)} for p in input_paths],
+    }
+
+    profiler = cProfile.Profile() if cprofile_path else None
+    if trace_memory:
+        tracemalloc.start()
+    exit_code = 0
+    error = None
+    sys.argv = [module_name] + list(argv)
+    rss_reset = reset_peak_rss()
+    read_start, written_start = process_io()
+    wall_start = time.perf_counter()
+    cpu_start = time.process_time()
+    try:
+        if profiler:
+            profiler.enable()
+        module.main()
+    except SystemExit as e:
+        exit_code = e.code if isinstance(e.code, int) else (0 if e.code is None else 1)
+    except Exception as e:
+        traceback.print_exc()
+        exit_code = 1
+        error = f"{type(e).__name__}: {e}"
+    finally:
+        if profiler:
+            profiler.disable()
+        report["run_s"] = time.perf_counter() - wall_start
+        report["cpu_s"] = time.process_time() - cpu_start
+        read_end, written_end = process_io()
+        report["peak_rss_bytes"] = peak_rss_bytes(rss_reset)
+    if trace_memory:
+        report["python_heap_peak_bytes"] = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    report["bytes_read"] = read_end - read_start if read_start is not None and read_end is not None else None
+    report["bytes_written"] = written_end - written_start if written_start is not None and written_end is not None else None
+
+    report["outputs"] = [{"path": os.path.relpath(p), "bytes": file_bytes(p)} for p in output_paths]
+    report["records_in"] = record_count(input_paths[0]) if input_paths else None
+    report["records_out"] = record_count(output_paths[0]) if output_paths else None
+    report["records_per_s"] = (report["records_in"] or report["records_out"] or 0) / report["run_s"] \
+        if report["run_s"] else None
+    if profiler:
+        os.makedirs(os.path.dirname(cprofile_path) or ".", exist_ok=True)
+        profiler.dump_stats(cprofile_path)
+        report["cprofile"] = os.path.relpath(cprofile_path)
+        report["top_functions"] = top_functions(profiler)
+    report["exit_code"] = exit_code
+    report["status"] = "ok" if exit_code == 0 else "failed"
+    if error:
+        report["error"] = error
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run one pipeline stage and write its resource report")
+    parser.add_argument("--report", required=True, help="Where to write the stage's JSON report")
+    parser.add_argument("--cprofile", help="Dump cProfile stats for the stage to this path")
+    parser.add_argument("--tracemalloc", action="store_true", help="Track the peak Python heap (slower)")
+    parser.add_argument("module", help="Stage module, such as app.data_extraction.validate")
+    parser.add_argument("args", nargs=argparse.REMAINDER, help="Arguments passed to the stage")
+    args = parser.parse_args()
+
+    report = profile_stage(args.module, args.args, args.cprofile, args.tracemalloc)
+    with open(args.report, "w") as f:
+        json.dump(report, f, indent=2)
+    if report.get("error"):
+        print(f"Stage {report['stage']} failed: {report['error']}")
+    sys.exit(report["exit_code"])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,233 @@
+import json
+import os
+import threading
+import time
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from itertools import islice
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from .fetch import (API_URL, BATCH_SIZE, DATASET_ID, EXPORT_READERS, MAX_IN_FLIGHT, MAX_RECORDS,
+                    AdaptiveRateLimiter, download_export, export_path, fetch_arcgis_page, get_with_retries,
+                    iter_csv_records, iter_pages_concurrent, load_field_mapping, load_rate_limit, map_record,
+                    ordered_records, socrata_export_url)
+
+# Sources refreshed by `fetch --sources`. "schema" names the
+# data/schemas/<schema>.json file written by api_discovery whose field
+# mappings are applied to the source's records. "bulk" ("csv" or
+# "geojson") downloads a Socrata export, or an ArcGIS "export_url", instead
+# of paging. A JSON list with the same shape named by SOURCES_PATH
+# replaces these.
+SOURCES = [
+    {"name": "cook", "type": "socrata", "url": API_URL, "schema": DATASET_ID},
+    {"name": "dallas", "type": "csv", "schema": "dallas-industrial",
+     # Replace with the actual export URL
+     "url": os.getenv("DALLAS_CSV_URL", "https://www.dallascad.org/DataProducts/industrial_properties.csv")},
+    {"name": "la", "type": "arcgis", "schema": "la-industrial",
+     # Replace with the actual FeatureServer layer
+     "url": os.getenv("LA_FEATURE_LAYER_URL",
+                      "https://services.arcgis.com/lacounty/arcgis/rest/services/Industrial_Parcels/FeatureServer/0")},
+]
+SOURCES_PATH = os.getenv("SOURCES_PATH")
+HOST_MAX_CONCURRENCY = int(os.getenv("HOST_MAX_CONCURRENCY", 4))
+
+def load_sources(path=SOURCES_PATH):
+    if not path:
+        return SOURCES
+    with open(path, "r") as f:
+        return json.load(f)
+
+
+class SourceAdapter(ABC):
+    """Fetches one source's raw rows and describes its columns.
+
+    ``iter_raw`` yields rows as the source delivers them; ``iter_records``
+    applies the schema's field mapping. ``describe`` returns the source's
+    columns in the Socrata catalog shape api_discovery normalizes, plus the
+    ``probe`` request it uses to detect the endpoint's rate limits.
+    """
+
+    def __init__(self, config):
+        self.name = config["name"]
+        self.url = config["url"]
+        self.schema_id = config.get("schema", config["name"])
+        self.workers = config.get("workers", MAX_IN_FLIGHT)
+        self.batch_size = config.get("batch_size", BATCH_SIZE)
+        self.max_records = config.get("max_records", MAX_RECORDS)
+        self.bulk = config.get("bulk")
+        self.export_url = config.get("export_url")
+
+    @property
+    def host(self):
+        return urlparse(self.url).netloc
+
+    @abstractmethod
+    def iter_raw(self, session, limiter):
+        """Rows as the source delivers them"""
+
+    @abstractmethod
+    def describe(self, session, limiter):
+        """The source's dataset description for api_discovery"""
+
+    def probe(self):
+        """(url, params) of a cheap request against the source's endpoint"""
+        return self.url, None
+
+    def iter_records(self, session, limiter):
+        mapping = load_field_mapping(self.schema_id)
+        for rec in self.iter_raw(session, limiter):
+            yield map_record(rec, mapping, self.name)
+
+    def iter_export(self, session, limiter, url, fmt, params=None):
+        """Rows of a bulk export, downloaded to disk and parsed incrementally"""
+        path = export_path(self.schema_id, fmt)
+        download_export(session, limiter, url, path, params)
+        return islice(EXPORT_READERS[fmt](path), self.max_records)
+
+    def _dataset(self, name, description, columns):
+        url, params = self.probe()
+        return {"id": self.schema_id, "name": name, "description": description, "columns": columns,
+                "probe": {"url": url, "params": params}}
+
+
+class SocrataAdapter(SourceAdapter):
+    def probe(self):
+        return self.url, {"$limit": 1}
+
+    def iter_raw(self, session, limiter):
+        if self.bulk:
+            url = self.export_url or socrata_export_url(self.url, self.bulk)
+            return self.iter_export(session, limiter, url, self.bulk, {"$limit": self.max_records})
+        pages = iter_pages_concurrent(self.url, limiter, self.workers, self.batch_size, self.max_records,
+                                      session=session)
+        return ordered_records(pages, self.batch_size)
+
+    def describe(self, session, limiter):
+        parsed = urlparse(self.url)
+        dataset_id = os.path.splitext(os.path.basename(parsed.path))[0]
+        view = get_with_retries(session, limiter, f"{parsed.scheme}://{parsed.netloc}/api/views/{dataset_id}.json").json()
+        return self._dataset(view.get("name", self.name), view.get("description", ""), view.get("columns", []))
+
+
+class ArcGISAdapter(SourceAdapter):
+    """FeatureServer layer. ``batch_size`` should not exceed the layer's
+    maxRecordCount, or a full page reads as the last one. Bulk mode needs
+    an ``export_url`` (such as a Hub download link)."""
+
+    def probe(self):
+        return self.url.rstrip("/") + "/query", {"where": "1=1", "resultRecordCount": 1, "f": "json"}
+
+    def iter_raw(self, session, limiter):
+        if self.bulk and self.export_url:
+            return self.iter_export(session, limiter, self.export_url, self.bulk)
+        pages = iter_pages_concurrent(self.url, limiter, self.workers, self.batch_size, self.max_records,
+                                      session=session, fetch=fetch_arcgis_page)
+        return ordered_records(pages, self.batch_size)
+
+    def describe(self, session, limiter):
+        layer = get_with_retries(session, limiter, self.url, {"f": "json"}).json()
+        columns = [{"fieldName": field["name"], "dataTypeName": field.get("type", "")}
+                   for field in layer.get("fields", [])]
+        # fetch_arcgis_page adds these from the point geometry
+        columns += [{"fieldName": "latitude", "dataTypeName": "number"},
+                    {"fieldName": "longitude", "dataTypeName": "number"}]
+        return self._dataset(layer.get("name", self.name), layer.get("description", ""), columns)
+
+
+class CSVAdapter(SourceAdapter):
+    def iter_raw(self, session, limiter):
+        return self.iter_export(session, limiter, self.url, "csv")
+
+    def describe(self, session, limiter):
+        first = next(iter_csv_records(session, limiter, self.url), {})
+        columns = [{"fieldName": name, "dataTypeName": "text"} for name in first]
+        return self._dataset(self.name, f"CSV export {self.url}", columns)
+
+
+ADAPTERS = {"socrata": SocrataAdapter, "arcgis": ArcGISAdapter, "csv": CSVAdapter}
+
+
+def make_adapter(config):
+    return ADAPTERS[config["type"]](config)
+
+
+class HostGate:
+    """Per-host cap on concurrent requests plus a rate limiter shared by
+    every source on the host"""
+
+    def __init__(self, max_concurrency, requests_per_minute):
+        self.semaphore = threading.BoundedSemaphore(max_concurrency)
+        self.limiter = AdaptiveRateLimiter(requests_per_minute)
+
+
+class ThrottledSession(requests.Session):
+    """Session that holds the host's HostGate slot while each request is
+    sent (for streamed downloads, until the headers arrive)"""
+
+    def __init__(self, gates, pool_size):
+        super().__init__()
+        self.gates = gates
+        adapter = HTTPAdapter(pool_connections=max(len(gates), 1), pool_maxsize=pool_size)
+        self.mount("http://", adapter)
+        self.mount("https://", adapter)
+
+    def request(self, method, url, *args, **kwargs):
+        gate = self.gates.get(urlparse(url).netloc)
+        if gate is None:
+            return super().request(method, url, *args, **kwargs)
+        with gate.semaphore:
+            return super().request(method, url, *args, **kwargs)
+
+
+def make_gates(adapters, max_concurrency=HOST_MAX_CONCURRENCY):
+    """One HostGate per host, at the slowest rate recorded for its sources"""
+    rates = {}
+    for adapter in adapters:
+        rate = load_rate_limit(adapter.schema_id)
+        rates[adapter.host] = min(rates.get(adapter.host, rate), rate)
+    return {host: HostGate(max_concurrency, rate) for host, rate in rates.items()}
+
+
+def ingest(sources=None, max_concurrency=HOST_MAX_CONCURRENCY):
+    """Fetch all sources concurrently, so a run takes as long as the slowest.
+
+    Returns {name: {"records", "error", "seconds"}}; a failed source has
+    its exception message in "error" and keeps no records.
+    """
+    adapters = [make_adapter(config) for config in (load_sources() if sources is None else sources)]
+    gates = make_gates(adapters, max_concurrency)
+    results = {}
+
+    def run(adapter):
+        start = time.monotonic()
+        records = list(adapter.iter_records(session, gates[adapter.host].limiter))
+        return records, time.monotonic() - start
+
+    pool_size = sum(adapter.workers for adapter in adapters) or 1
+    with ThrottledSession(gates, pool_size) as session, \
+            ThreadPoolExecutor(max_workers=max(len(adapters), 1)) as pool:
+        futures = {pool.submit(run, adapter): adapter for adapter in adapters}
+        for future in as_completed(futures):
+            adapter = futures[future]
+            try:
+                records, seconds = future.result()
+                results[adapter.name] = {"records": records, "error": None, "seconds": seconds}
+            except Exception as e:
+                results[adapter.name] = {"records": [], "error": str(e), "seconds": None}
+    return results
+
+
+def describe_sources(sources=None):
+    """Yield (dataset, None) with each source's description for
+    api_discovery, or (None, (name, exception)) when it cannot be described"""
+    adapters = [make_adapter(config) for config in (load_sources() if sources is None else sources)]
+    gates = make_gates(adapters)
+    with ThrottledSession(gates, len(adapters) or 1) as session:
+        for adapter in adapters:
+            try:
+                yield adapter.describe(session, gates[adapter.host].limiter), None
+            except Exception as e:
+                yield None, (adapter.name, e)
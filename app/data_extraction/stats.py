@@ -0,0 +1,109 @@
+import json
+import math
+import os
+
+import numpy as np
+
+from .columnar import read_records
+from .flag_outliers import as_number, group_moments, group_percentiles
+from .zoning import zoning_family
+
+IN_PATH = os.path.join(os.path.dirname(__file__), '../../data/cache/outlier_flags.json')
+STATS_FILE = 'normalization_stats.json'
+OUT_PATH = os.path.join(os.path.dirname(__file__), '../../data/cache', STATS_FILE)
+STATS_FIELDS = ["square_feet", "year_built"]
+CELL_DEGREES = 0.1  # roughly 11 km of latitude per geographic cell
+QUANTILES = [5, 25, 50, 75, 95]
+
+
+def cell_key(lat, lon):
+    if lat is None or lon is None:
+        return None
+    return f"{math.floor(lat / CELL_DEGREES)}:{math.floor(lon / CELL_DEGREES)}"
+
+
+def stat_columns(records):
+    """The columns column_stats() reads, in one pass over any iterable of
+    records; missing values become NaN (numbers) or None (families)."""
+    columns = {field: [] for field in ["latitude", "longitude", "zoning_family"] + STATS_FIELDS}
+    for rec in records:
+        columns["zoning_family"].append(
+            rec.get("zoning_family") or zoning_family(rec.get("zoning") or rec.get("normalized_zoning")))
+        for field in ["latitude", "longitude"] + STATS_FIELDS:
+            columns[field].append(as_number(rec.get(field)))
+    return {field: np.array(values, dtype=object if field == "zoning_family" else float)
+            for field, values in columns.items()}
+
+
+def _summaries(values, codes, n_groups):
+    """Per-group summary of one field (None for groups without values)"""
+    counts, mean, std = group_moments(values, codes, n_groups)
+    # Percentiles 0 and 100 are the group minimum and maximum
+    quantiles = [q.tolist() for q in group_percentiles(values, codes, n_groups, [0] + QUANTILES + [100])]
+    counts, mean, std = counts.tolist(), mean.tolist(), std.tolist()
+    summaries = []
+    for g in range(n_groups):
+        if not counts[g]:
+            summaries.append(None)
+            continue
+        summary = {"count": counts[g], "min": quantiles[0][g], "max": quantiles[-1][g], "mean": mean[g], "std": std[g]}
+        for q, percentile in zip(QUANTILES, quantiles[1:-1]):
+            summary[f"p{q:02d}"] = percentile[g]
+        summaries.append(summary)
+    return summaries
+
+
+def column_stats(columns):
+    """Per-field statistics globally, per zoning family and per geographic
+    cell from latitude, longitude, zoning_family and STATS_FIELDS columns
+    (e.g. a snapshot's columns). NaN values are skipped."""
+    lat = np.asarray(columns["latitude"], dtype=float)
+    lon = np.asarray(columns["longitude"], dtype=float)
+    families = np.asarray(columns["zoning_family"], dtype=object)
+    values = {field: np.asarray(columns[field], dtype=float) for field in STATS_FIELDS}
+
+    def grouped(rows, codes, labels):
+        per_field = {field: _summaries(values[field][rows], codes, len(labels)) for field in STATS_FIELDS}
+        return {label: {field: per_field[field][g] for field in STATS_FIELDS} for g, label in enumerate(labels)}
+
+    has_family = np.not_equal(families, None)
+    family_labels, family_codes = np.unique(families[has_family].astype(str), return_inverse=True)
+
+    located = ~(np.isnan(lat) | np.isnan(lon))
+    cells = np.stack([np.floor(lat[located] / CELL_DEGREES), np.floor(lon[located] / CELL_DEGREES)], axis=1)
+    cells, cell_codes = np.unique(cells.astype(np.int64), axis=0, return_inverse=True)
+
+    return {
+        "cell_degrees": CELL_DEGREES,
+        "global": grouped(slice(None), np.zeros(len(lat), dtype=np.int64), ["all"])["all"],
+        "zoning": grouped(has_family, family_codes.reshape(-1), family_labels.tolist()),
+        "cells": grouped(located, cell_codes.reshape(-1), [f"{x}:{y}" for x, y in cells.tolist()])
+    }
+
+
+def compute_stats(records):
+    """Per-field statistics of records (any iterable, read once) globally,
+    per zoning family and per geographic cell. Missing values are skipped."""
+    return column_stats(stat_columns(records))
+
+
+def save_stats(stats, path=OUT_PATH):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(stats, f, indent=2)
+
+
+def load_stats(path=OUT_PATH):
+    with open(path, "r") as f:
+        return json.load(f)
+
+
+def main():
+    stats = compute_stats(read_records(IN_PATH, ["zoning", "normalized_zoning", "zoning_family", "latitude", "longitude"] + STATS_FIELDS))
+    save_stats(stats)
+    print(f"Saved normalization statistics for {len(stats['zoning'])} zoning families "
+          f"and {len(stats['cells'])} cells to {OUT_PATH}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+import json
+import os
+
+from .fetch import iter_fetched_records, create_sample_data, PageFetchError
+from .filter_industrial import iter_industrial
+from .validate import ReportBuilder, VALID_PATH, check_error_rate, failed_rules, save_errors
+from .flag_outliers import outlier_bounds, iter_flagged
+from .stats import compute_stats, save_stats
+
+CACHE_DIR = os.path.join(os.path.dirname(__file__), '../../data/cache')
+LOG_DIR = os.path.join(os.path.dirname(__file__), '../../data/logs')
+RAW_PATH = os.path.join(CACHE_DIR, 'raw_records.json')
+RAW_NDJSON = os.path.join(CACHE_DIR, 'raw_records.ndjson')
+INDUSTRIAL_NDJSON = os.path.join(CACHE_DIR, 'industrial_properties.ndjson')
+INDUSTRIAL_PATH = os.path.join(CACHE_DIR, 'industrial_properties.json')
+OUTLIER_PATH = os.path.join(CACHE_DIR, 'outlier_flags.json')
+LOG_PATH = os.path.join(LOG_DIR, 'validation_errors.log')
+
+
+def read_ndjson(path):
+    with open(path, "r") as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+class NDJSONWriter:
+    def __init__(self, path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.path = path
+        self.count = 0
+        self._f = open(path, "w")
+
+    def write(self, record):
+        self._f.write(json.dumps(record) + "\n")
+        self.count += 1
+
+    def close(self):
+        self._f.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class JSONArrayWriter(NDJSONWriter):
+    """Writes a JSON array one element at a time, readable by json.load."""
+
+    def write(self, record):
+        self._f.write(("[\n" if self.count == 0 else ",\n") + json.dumps(record))
+        self.count += 1
+
+    def close(self):
+        self._f.write("[]\n" if self.count == 0 else "\n]\n")
+        self._f.close()
+
+
+def tee(records, *writers):
+    for rec in records:
+        for writer in writers:
+            writer.write(rec)
+        yield rec
+
+
+def fetched_or_sample(**fetch_options):
+    """Stream fetched records, falling back to sample data if none arrive"""
+    count = 0
+    try:
+        for rec in iter_fetched_records(**fetch_options):
+            count += 1
+            yield rec
+    except PageFetchError as e:
+        print(e)
+    except Exception as e:
+        print(f"Failed to fetch from API: {e}")
+    if count == 0:
+        print("No data fetched from API, using sample data")
+        yield from create_sample_data()
+
+
+def run_streaming_pipeline(source=None, **fetch_options):
+    """Run fetch -> filter -> validate -> flag as chained generators.
+
+    Raises validate.ValidationGateError before flagging when the share of
+    invalid records exceeds VALIDATION_MAX_ERROR_RATE.
+
+    Records flow one at a time, so peak memory is bounded by the fetch
+    batch size rather than the dataset. Outlier flagging needs global
+    statistics, so it makes two passes over the industrial NDJSON spill:
+    one to accumulate bounds and one to annotate; the annotating pass also
+    accumulates the normalization statistics. Final outputs are still
+    written as JSON arrays for the API and the per-stage scripts.
+    """
+    source = fetched_or_sample(**fetch_options) if source is None else source
+    os.makedirs(LOG_DIR, exist_ok=True)
+
+    report = ReportBuilder()
+    with NDJSONWriter(RAW_NDJSON) as raw, JSONArrayWriter(RAW_PATH) as raw_json, \
+            NDJSONWriter(INDUSTRIAL_NDJSON) as industrial, JSONArrayWriter(INDUSTRIAL_PATH) as industrial_json, \
+            JSONArrayWriter(VALID_PATH) as valid:
+        for i, rec in enumerate(iter_industrial(tee(source, raw, raw_json))):
+            failed = failed_rules(rec)
+            report.add(i, rec, failed)
+            if not failed:
+                valid.write(rec)
+            industrial.write(rec)
+            industrial_json.write(rec)
+    report = report.report()
+    # The same capped log and report the validate stage writes
+    save_errors(report, LOG_PATH)
+    check_error_rate(report)
+
+    bounds = outlier_bounds(read_ndjson(INDUSTRIAL_NDJSON), spill_dir=CACHE_DIR)
+    with JSONArrayWriter(OUTLIER_PATH) as flagged:
+        stats = compute_stats(tee(iter_flagged(read_ndjson(INDUSTRIAL_NDJSON), bounds), flagged))
+    # Written after the flagged file so the API sees the stats as current
+    save_stats(stats)
+
+    return {
+        "raw": raw.count,
+        "industrial": industrial.count,
+        "valid": report["valid"],
+        "validation_errors": sum(report["rule_counts"].values()),
+        "flagged": flagged.count
+    }
@@ -0,0 +1,148 @@
+import argparse
+import os
+from datetime import datetime
+
+import numpy as np
+
+from .columnar import write_records
+from .zoning import zoning_family
+
+OUT_PATH = os.path.join(os.path.dirname(__file__), '../../data/cache/raw_records.json')
+CURRENT_YEAR = datetime.now().year
+
+# Named row counts accepted wherever a scale is asked for
+SCALES = {"10k": 10_000, "100k": 100_000, "1m": 1_000_000, "5m": 5_000_000}
+
+# Chicago-area industrial corridors: (name, latitude, longitude, spread in
+# degrees, weight). Parcels are drawn around these centres; BACKGROUND_SHARE
+# of them are scattered uniformly over REGION instead.
+CLUSTERS = [
+    ("Chicago", 41.846, -87.664, 0.020, 0.16),        # Central Manufacturing District / Pilsen
+    ("Chicago", 41.893, -87.661, 0.010, 0.06),        # Goose Island / Kinzie corridor
+    ("Bedford Park", 41.776, -87.782, 0.025, 0.14),   # Clearing
+    ("Elk Grove Village", 42.004, -87.972, 0.020, 0.14),
+    ("Franklin Park", 41.935, -87.877, 0.018, 0.10),
+    ("Chicago", 41.676, -87.580, 0.025, 0.10),        # Lake Calumet
+    ("Chicago Heights", 41.510, -87.640, 0.020, 0.06),
+    ("Joliet", 41.525, -88.080, 0.040, 0.12),         # I-55 / I-80 logistics
+    ("Wheeling", 42.130, -87.925, 0.015, 0.06),
+    ("Melrose Park", 41.900, -87.857, 0.012, 0.06),
+]
+REGION = (41.45, -88.25, 42.15, -87.52)  # min_lat, min_lon, max_lat, max_lon
+BACKGROUND_SHARE = 0.04
+
+# Zoning mix: industrial codes across the county tables plus the
+# non-industrial codes that filter_industrial drops
+ZONING_MIX = [
+    ("M1-1", 0.12), ("M1-2", 0.08), ("M2-2", 0.09), ("M2-3", 0.04), ("M3-3", 0.04),
+    ("PMD 4", 0.04), ("PMD-11", 0.02), ("I-1", 0.05), ("I-2", 0.03), ("I-3", 0.01),
+    ("B3-2", 0.10), ("C1-1", 0.08), ("RS-3", 0.14), ("RT-4", 0.08), ("DX-5", 0.04),
+    ("PD 1102", 0.04),
+]
+
+# Log-normal building sizes (median about 30k sq ft) and construction eras:
+# (share, mean year, standard deviation)
+SIZE_MEDIAN = 30000
+SIZE_SIGMA = 0.9
+YEAR_ERAS = [(0.45, 1956, 12), (0.35, 1985, 8), (0.20, 2008, 7)]
+
+# Share of rows with each kind of defect, so validation and outlier
+# flagging have realistic work to do
+DEFECT_RATES = {"missing_address": 0.01, "missing_year": 0.005, "missing_location": 0.002, "tiny_size": 0.01}
+
+STREETS = ["Archer", "Pershing", "Kedzie", "Pulaski", "Cicero", "Kostner", "Elston", "Kinzie", "Halsted",
+           "Ashland", "Western", "Damen", "Devon", "Higgins", "Touhy", "Busse", "Mannheim", "Wolf",
+           "Laramie", "Torrence", "Stony Island", "Doty", "Ewing", "Lincoln Highway", "Brandon"]
+SUFFIXES = ["Ave", "Rd", "St", "Blvd", "Dr", "Pkwy"]
+
+
+def parse_scale(scale):
+    """Row count for a SCALES name or a plain integer"""
+    scale = str(scale).lower()
+    return SCALES[scale] if scale in SCALES else int(scale)
+
+
+def generate_columns(count, seed=0):
+    """Synthetic parcels as NumPy columns. The same seed and count always
+    give the same data."""
+    rng = np.random.default_rng(seed)
+
+    weights = np.array([c[4] for c in CLUSTERS])
+    cluster = rng.choice(len(CLUSTERS), size=count, p=weights / weights.sum())
+    centres = np.array([(c[1], c[2], c[3]) for c in CLUSTERS])[cluster]
+    lat = rng.normal(centres[:, 0], centres[:, 2])
+    # Longitude degrees are shorter than latitude degrees at this latitude
+    lon = rng.normal(centres[:, 1], centres[:, 2] / np.cos(np.radians(centres[:, 0])))
+    background = rng.random(count) < BACKGROUND_SHARE
+    lat[background] = rng.uniform(REGION[0], REGION[2], background.sum())
+    lon[background] = rng.uniform(REGION[1], REGION[3], background.sum())
+
+    square_feet = np.rint(rng.lognormal(np.log(SIZE_MEDIAN), SIZE_SIGMA, count)).astype(np.int64)
+    shares = np.array([era[0] for era in YEAR_ERAS])
+    era = rng.choice(len(YEAR_ERAS), size=count, p=shares / shares.sum())
+    era_years = np.array([(mean, std) for _, mean, std in YEAR_ERAS])[era]
+    year_built = np.clip(np.rint(rng.normal(era_years[:, 0], era_years[:, 1])), 1885, CURRENT_YEAR).astype(np.int64)
+
+    zoning_weights = np.array([z[1] for z in ZONING_MIX])
+    zoning = rng.choice(len(ZONING_MIX), size=count, p=zoning_weights / zoning_weights.sum())
+
+    defects = {name: rng.random(count) < rate for name, rate in DEFECT_RATES.items()}
+    square_feet[defects["tiny_size"]] = rng.integers(100, 1000, defects["tiny_size"].sum())
+    lat[defects["missing_location"]] = np.nan
+    lon[defects["missing_location"]] = np.nan
+
+    return {
+        "latitude": np.round(lat, 6),
+        "longitude": np.round(lon, 6),
+        "square_feet": square_feet,
+        "year_built": year_built,
+        "missing_year": defects["missing_year"],
+        "zoning": zoning,
+        "cluster": cluster,
+        "street_number": rng.integers(100, 13000, count),
+        "street": rng.integers(0, len(STREETS), count),
+        "suffix": rng.integers(0, len(SUFFIXES), count),
+        "missing_address": defects["missing_address"],
+    }
+
+
+def iter_parcels(count, seed=0):
+    """Yield synthetic raw records in the shape fetch writes"""
+    columns = generate_columns(count, seed)
+    values = {k: v.tolist() for k, v in columns.items()}
+    for i in range(count):
+        zoning = ZONING_MIX[values["zoning"][i]][0]
+        lat = values["latitude"][i]
+        address = "" if values["missing_address"][i] else (
+            f"{values['street_number'][i]} {STREETS[values['street'][i]]} {SUFFIXES[values['suffix'][i]]}, "
+            f"{CLUSTERS[values['cluster'][i]][0]}, IL"
+        )
+        yield {
+            "id": f"SYN{i:08d}",
+            "address": address,
+            "latitude": None if lat != lat else lat,
+            "longitude": None if lat != lat else values["longitude"][i],
+            "square_feet": values["square_feet"][i],
+            "year_built": None if values["missing_year"][i] else values["year_built"][i],
+            "zoning": zoning,
+            "property_type": "Industrial" if zoning_family(zoning) else "Other"
+        }
+
+
+def generate_parcels(count, seed=0):
+    return list(iter_parcels(count, seed))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Write a synthetic Chicago-area parcel dataset")
+    parser.add_argument("--rows", default="10k", help=f"Row count or one of {', '.join(SCALES)}")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", default=OUT_PATH)
+    args = parser.parse_args()
+    records = generate_parcels(parse_scale(args.rows), args.seed)
+    write_records(args.out, records)
+    print(f"Saved {len(records)} synthetic parcels (seed {args.seed}) to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,62 +1,286 @@
+import argparse
 import json
 import os
+import sys
 from datetime import datetime
 
+import numpy as np
+
+from .columnar import RecordView, cell_value, columnar_path, has_fresh_columnar, load_columnar, write_records
+
 IN_PATH = os.path.join(os.path.dirname(__file__), '../../data/cache/industrial_properties.json')
+VALID_PATH = os.path.join(os.path.dirname(__file__), '../../data/cache/valid_properties.json')
 LOG_PATH = os.path.join(os.path.dirname(__file__), '../../data/logs/validation_errors.log')
+REPORT_PATH = os.path.join(os.path.dirname(__file__), '../../data/logs/validation_report.json')
 CURRENT_YEAR = datetime.now().year
 
+# One rule per field. "type" is number, integer or text (a non-blank value);
+# "min"/"max" are inclusive bounds and "gt" an exclusive lower bound.
+# Missing values fail their rule.
+VALIDATION_RULES = [
+    {"rule": "square_feet_range", "field": "square_feet", "type": "number", "gt": 1000,
+     "message": "Invalid square_feet"},
+    {"rule": "year_built_range", "field": "year_built", "type": "integer", "min": 1900, "max": CURRENT_YEAR,
+     "message": "Invalid year_built"},
+    {"rule": "address_present", "field": "address", "type": "text",
+     "message": "Empty address"},
+    {"rule": "latitude_range", "field": "latitude", "type": "number", "min": -90, "max": 90,
+     "message": "Invalid latitude"},
+    {"rule": "longitude_range", "field": "longitude", "type": "number", "min": -180, "max": 180,
+     "message": "Invalid longitude"},
+]
+VALIDATED_FIELDS = [rule["field"] for rule in VALIDATION_RULES]
+# Failing rows listed per rule in the report; counts always cover every row
+MAX_REPORTED_ERRORS = 1000
+# Fraction of invalid records above which the validate stage fails
+MAX_ERROR_RATE = float(os.getenv("VALIDATION_MAX_ERROR_RATE", 1.0))
+GATE_EXIT_CODE = 2
+
+
+class ValidationGateError(Exception):
+    pass
+
+
+def _is_number(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
 
-def load_records():
-    with open(IN_PATH, "r") as f:
-        return json.load(f)
+
+def check_value(rule, value):
+    """Scalar form of a rule: True if ``value`` passes"""
+    if rule["type"] == "text":
+        return bool(value) and bool(str(value).strip())
+    if not _is_number(value) or (rule["type"] == "integer" and not isinstance(value, int)):
+        return False
+    return (("gt" not in rule or value > rule["gt"]) and
+            ("min" not in rule or value >= rule["min"]) and
+            ("max" not in rule or value <= rule["max"]))
+
+
+def failed_rules(rec, rules=VALIDATION_RULES):
+    return [rule for rule in rules if not check_value(rule, rec.get(rule["field"]))]
+
+
+def error_message(rule, value):
+    return f"{rule['message']}: {value}"
 
 
 def validate_record(rec):
+    return [error_message(rule, rec.get(rule["field"])) for rule in failed_rules(rec)]
+
+
+def iter_validated(records):
+    """Yield (index, record, errors) for each record without holding them"""
+    for i, rec in enumerate(records):
+        yield i, rec, validate_record(rec)
+
+
+class ValidationColumn:
+    """A field prepared for column-wise rules: ``number`` (float64, NaN when
+    missing or not numeric), ``integer`` (value is an int) and ``text``
+    (value is non-blank) arrays, plus ``value(i)`` for error reports."""
+
+    def __init__(self, number, integer, text, value):
+        self.number = number
+        self.integer = integer
+        self.text = text
+        self.value = value
+
+
+def record_columns(records, fields=VALIDATED_FIELDS):
+    columns = {}
+    for field in fields:
+        raw = [rec.get(field) for rec in records]
+        columns[field] = ValidationColumn(
+            np.array([v if _is_number(v) else np.nan for v in raw], dtype=float),
+            np.array([isinstance(v, int) and not isinstance(v, bool) for v in raw], dtype=bool),
+            np.array([bool(v) and bool(str(v).strip()) for v in raw], dtype=bool),
+            raw.__getitem__
+        )
+    return columns
+
+
+def columnar_columns(columnar, fields=VALIDATED_FIELDS):
+    """ValidationColumns straight from load_columnar() output. Text checks run
+    once per dictionary entry, never per row."""
+    meta = columnar["__meta__"]
+    count = meta["count"]
+    columns = {}
+    for field in fields:
+        entry = meta["columns"].get(field)
+        if entry is None or field not in columnar:
+            columns[field] = ValidationColumn(np.full(count, np.nan), np.zeros(count, dtype=bool),
+                                              np.zeros(count, dtype=bool), lambda i: None)
+            continue
+        column = columnar[field]
+        if entry["kind"] == "number":
+            number = np.asarray(column, dtype=float)
+            present = ~np.isnan(number)
+            if entry["integer"]:
+                integer = present
+            elif "int_mask_array" in entry:
+                integer = present & np.asarray(entry["int_mask_array"])
+            else:
+                integer = np.zeros(count, dtype=bool)
+            text = present & (number != 0)
+        elif entry["kind"] in ("string", "json"):
+            # Code -1 (missing) picks the trailing entry of each lookup
+            values = list(column.values)
+            codes = np.asarray(column.codes)
+            number = np.array([v if _is_number(v) else np.nan for v in values] + [np.nan], dtype=float)[codes]
+            integer = np.array([isinstance(v, int) and not isinstance(v, bool) for v in values] + [False])[codes]
+            text = np.array([bool(v) and bool(str(v).strip()) for v in values] + [False], dtype=bool)[codes]
+        else:  # bool
+            number = np.full(count, np.nan)
+            integer = np.zeros(count, dtype=bool)
+            text = np.asarray(column) == 1
+        columns[field] = ValidationColumn(number, integer, text,
+                                          lambda i, entry=entry, column=column: cell_value(entry, column, i))
+    return columns
+
+
+def failing_rows(rule, column):
+    """Boolean mask of the rows that fail ``rule``"""
+    if rule["type"] == "text":
+        return ~column.text
+    values = column.number
+    passed = ~np.isnan(values)
+    if rule["type"] == "integer":
+        passed &= column.integer
+    if "gt" in rule:
+        passed &= values > rule["gt"]
+    if "min" in rule:
+        passed &= values >= rule["min"]
+    if "max" in rule:
+        passed &= values <= rule["max"]
+    return ~passed
+
+
+def validate_columns(columns, count, rules=VALIDATION_RULES, max_reported=MAX_REPORTED_ERRORS):
+    """Evaluate rules column-wise. Returns (valid_mask, report)."""
+    invalid = np.zeros(count, dtype=bool)
+    rule_counts = {}
     errors = []
-    sf = rec.get("square_feet")
-    year = rec.get("year_built")
-    address = rec.get("address")
-    lat = rec.get("latitude")
-    lon = rec.get("longitude")
-    
-    if sf is None or not isinstance(sf, (int, float)) or sf <= 1000:
-        errors.append(f"Invalid square_feet: {sf}")
-    if year is None or not isinstance(year, int) or year < 1900 or year > CURRENT_YEAR:
-        errors.append(f"Invalid year_built: {year}")
-    if not address or not str(address).strip():
-        errors.append(f"Empty address: {address}")
-    if lat is None or not isinstance(lat, (int, float)) or not (-90 <= lat <= 90):
-        errors.append(f"Invalid latitude: {lat}")
-    if lon is None or not isinstance(lon, (int, float)) or not (-180 <= lon <= 180):
-        errors.append(f"Invalid longitude: {lon}")
-    
-    return errors
-
-
-def log_errors(errors):
-    os.makedirs(os.path.dirname(LOG_PATH), exist_ok=True)
-    with open(LOG_PATH, "w") as f:
+    for rule in rules:
+        column = columns[rule["field"]]
+        failed = failing_rows(rule, column)
+        invalid |= failed
+        rows = np.flatnonzero(failed)
+        rule_counts[rule["rule"]] = len(rows)
+        for i in rows[:max_reported].tolist():
+            errors.append({"rule": rule["rule"], "field": rule["field"], "row": i, "value": column.value(i)})
+    errors.sort(key=lambda err: err["row"])
+    return ~invalid, build_report(count, int(invalid.sum()), rule_counts, errors)
+
+
+def build_report(total, invalid, rule_counts, errors):
+    return {
+        "total": total,
+        "valid": total - invalid,
+        "invalid": invalid,
+        "error_rate": invalid / total if total else 0.0,
+        "rule_counts": rule_counts,
+        "errors": errors
+    }
+
+
+class ReportBuilder:
+    """Accumulates the validate_columns() report one record at a time"""
+
+    def __init__(self, rules=VALIDATION_RULES, max_reported=MAX_REPORTED_ERRORS):
+        self.max_reported = max_reported
+        self.total = 0
+        self.invalid = 0
+        self.rule_counts = {rule["rule"]: 0 for rule in rules}
+        self.errors = []
+
+    def add(self, i, rec, failed):
+        self.total += 1
+        self.invalid += bool(failed)
+        for rule in failed:
+            self.rule_counts[rule["rule"]] += 1
+            if self.rule_counts[rule["rule"]] <= self.max_reported:
+                self.errors.append({"rule": rule["rule"], "field": rule["field"], "row": i,
+                                    "value": rec.get(rule["field"])})
+
+    def report(self):
+        return build_report(self.total, self.invalid, self.rule_counts, self.errors)
+
+
+def load_columns(path=IN_PATH):
+    """(columns, count, records) for the input, through the columnar copy
+    when fresh. ``records`` is a sequence of the full records."""
+    if has_fresh_columnar(path):
+        columnar = load_columnar(columnar_path(path))
+        return columnar_columns(columnar), columnar["__meta__"]["count"], RecordView(columnar)
+    with open(path, "r") as f:
+        records = json.load(f)
+    return record_columns(records), len(records), records
+
+
+def log_errors(errors, path=LOG_PATH):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as f:
         for err in errors:
             f.write(err + "\n")
 
 
+def save_report(report, path=REPORT_PATH):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(report, f, indent=2)
+
+
+def check_error_rate(report, max_error_rate=MAX_ERROR_RATE):
+    if report["error_rate"] > max_error_rate:
+        raise ValidationGateError(
+            f"{report['invalid']} of {report['total']} records invalid "
+            f"({report['error_rate']:.1%} > {max_error_rate:.1%})"
+        )
+
+
+def save_errors(report, log_path=LOG_PATH, report_path=REPORT_PATH):
+    """Write the error log and the report. The log lists the reported
+    errors and how many more of each rule were left out."""
+    rules = {rule["rule"]: rule for rule in VALIDATION_RULES}
+    lines = [f"Record {err['row']}: {error_message(rules[err['rule']], err['value'])}" for err in report["errors"]]
+    listed = {}
+    for err in report["errors"]:
+        listed[err["rule"]] = listed.get(err["rule"], 0) + 1
+    for rule, count in report["rule_counts"].items():
+        if count > listed.get(rule, 0):
+            lines.append(f"{rule}: {count - listed.get(rule, 0)} more errors not listed")
+    log_errors(lines, log_path)
+    save_report(report, report_path)
+    print(f"Logged {sum(report['rule_counts'].values())} validation errors to {report_path}")
+
+
+def save_validation(report, records, valid, valid_path=VALID_PATH, log_path=LOG_PATH, report_path=REPORT_PATH):
+    """Write the error log, the report and the valid records"""
+    save_errors(report, log_path, report_path)
+    write_records(valid_path, [records[i] for i in np.flatnonzero(valid).tolist()])
+    print(f"Saved {report['valid']} valid records out of {report['total']} total to {valid_path}")
+
+
 def main():
-    records = load_records()
-    all_errors = []
-    valid_records = []
-    
-    for i, rec in enumerate(records):
-        errs = validate_record(rec)
-        if errs:
-            for err in errs:
-                all_errors.append(f"Record {i}: {err}")
-        else:
-            valid_records.append(rec)
-    
-    log_errors(all_errors)
-    print(f"Logged {len(all_errors)} validation errors to {LOG_PATH}")
-    print(f"Found {len(valid_records)} valid records out of {len(records)} total")
+    parser = argparse.ArgumentParser(description="Validate the industrial records")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Validate shards of the columnar input on this many processes")
+    args = parser.parse_args()
+
+    if args.workers > 1 and has_fresh_columnar(IN_PATH):
+        from .parallel import parallel_validate
+        report = parallel_validate(IN_PATH, VALID_PATH, args.workers)
+        save_errors(report)
+        print(f"Saved {report['valid']} valid records out of {report['total']} total to {VALID_PATH}")
+    else:
+        columns, count, records = load_columns()
+        valid, report = validate_columns(columns, count)
+        save_validation(report, records, valid)
+    try:
+        check_error_rate(report)
+    except ValidationGateError as e:
+        print(f"Validation error rate too high: {e}")
+        sys.exit(GATE_EXIT_CODE)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,97 @@
+import json
+import os
+import re
+
+import numpy as np
+
+# Industrial zoning codes per county, by family. Patterns are matched
+# against the whole normalized code (upper case, single spaces, leading
+# [Q]/(T) qualifiers removed). A JSON file with the same shape named by
+# ZONING_CODES_PATH replaces these tables.
+ZONING_TABLES = {
+    "cook": {
+        # Chicago M districts carry a bulk suffix (M1-2); county I districts
+        "light_industrial": [r"M1(?:-\d+(?:\.\d+)?)?", r"I-1"],
+        "general_industrial": [r"M2(?:-\d+(?:\.\d+)?)?", r"I-2"],
+        "heavy_industrial": [r"M3(?:-\d+(?:\.\d+)?)?", r"I-3"],
+        "planned_industrial": [r"PMD ?-?\d+[A-Z]?"],
+    },
+    "dallas": {
+        "light_industrial": [r"LI"],
+        "general_industrial": [r"IM"],
+        "planned_industrial": [r"IR"],
+    },
+    "la": {
+        # City codes carry a height district (M2-1VL); county codes are M-n
+        "light_industrial": [r"M1-[0-9A-Z.]+", r"MR[12](?:-[0-9A-Z.]+)?", r"M-1", r"MR"],
+        "general_industrial": [r"M2-[0-9A-Z.]+", r"M-1\.5"],
+        "heavy_industrial": [r"M3-[0-9A-Z.]+", r"M-2(?:\.5)?", r"M-[34]"],
+        "commercial_manufacturing": [r"CM(?:-[0-9A-Z.]+)?"],
+    },
+}
+ZONING_CODES_PATH = os.getenv("ZONING_CODES_PATH")
+
+_QUALIFIERS = re.compile(r"^(?:\[[A-Z]+\]|\([A-Z]+\))+")
+_SPACES = re.compile(r"\s+")
+
+
+def normalize_code(zoning):
+    code = _SPACES.sub(" ", str(zoning).strip().upper())
+    return _QUALIFIERS.sub("", code)
+
+
+class ZoningClassifier:
+    """Maps zoning codes to families with one compiled alternation.
+
+    Zoning strings have very low cardinality, so each distinct string is
+    matched once and every later lookup is a dict hit.
+    """
+
+    def __init__(self, tables):
+        self.families = []
+        alternatives = []
+        for county in tables.values():
+            for family, patterns in county.items():
+                for pattern in patterns:
+                    alternatives.append(f"(?P<g{len(self.families)}>{pattern})")
+                    self.families.append(family)
+        self._pattern = re.compile("|".join(alternatives))
+        self._cache = {}
+
+    def family(self, zoning):
+        """Industrial zoning family for ``zoning``, or None"""
+        try:
+            return self._cache[zoning]
+        except KeyError:
+            pass
+        family = None
+        if zoning:
+            match = self._pattern.fullmatch(normalize_code(zoning))
+            if match:
+                group = next(name for name, value in match.groupdict().items() if value is not None)
+                family = self.families[int(group[1:])]
+        self._cache[zoning] = family
+        return family
+
+
+def load_tables(path=ZONING_CODES_PATH):
+    if not path:
+        return ZONING_TABLES
+    with open(path, "r") as f:
+        return json.load(f)
+
+
+classifier = ZoningClassifier(load_tables())
+
+
+def zoning_family(zoning):
+    return classifier.family(zoning)
+
+
+def family_column(zonings):
+    """Families for a sequence of zoning codes (or a DictionaryColumn),
+    classifying each distinct code once"""
+    if hasattr(zonings, "codes"):  # code -1 (missing) picks the trailing None
+        lookup = [zoning_family(z) for z in zonings.values] + [None]
+        return np.array(lookup, dtype=object)[zonings.codes]
+    return np.array([zoning_family(z) for z in zonings], dtype=object)
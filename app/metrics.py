@@ -0,0 +1,237 @@
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+# Prometheus text exposition format, version 0.0.4
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _escape(value: Any) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels: Dict[str, Any]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in labels.items()) + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Metric:
+    """One metric family; a value per distinct combination of label values"""
+
+    kind = "untyped"
+
+    def __init__(self, name: str, help: str, labels: Iterable[str] = ()):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self._values: Dict[Tuple, Any] = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, Any]) -> Tuple:
+        return tuple(str(labels[name]) for name in self.labels)
+
+    def clear(self):
+        """Drop every series, such as label values that no longer apply"""
+        with self._lock:
+            self._values.clear()
+
+    def samples(self) -> List[Tuple[str, Dict[str, Any], float]]:
+        """(name, labels, value) for every sample, in label order"""
+        with self._lock:
+            return [(self.name, dict(zip(self.labels, key)), value) for key, value in sorted(self._values.items())]
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+
+class Gauge(Metric):
+    kind = "gauge"
+
+    def set(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+
+class Histogram(Metric):
+    """Cumulative-bucket histogram; ``buckets`` are the upper bounds"""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labels: Iterable[str] = (), buckets: Iterable[float] = LATENCY_BUCKETS):
+        super().__init__(name, help, labels)
+        self.buckets = tuple(sorted(buckets)) + (float("inf"),)
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                entry = self._values[key] = [[0] * len(self.buckets), 0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    entry[0][i] += 1
+                    break
+            entry[1] += value
+            entry[2] += 1
+
+    def samples(self):
+        with self._lock:
+            entries = [(key, (list(counts), total, count)) for key, (counts, total, count) in sorted(self._values.items())]
+        samples = []
+        for key, (counts, total, count) in entries:
+            labels = dict(zip(self.labels, key))
+            cumulative = 0
+            for bound, n in zip(self.buckets, counts):
+                cumulative += n
+                samples.append((self.name + "_bucket", {**labels, "le": _format_value(bound)}, cumulative))
+            samples.append((self.name + "_sum", labels, total))
+            samples.append((self.name + "_count", labels, count))
+        return samples
+
+
+class MetricsRegistry:
+    """Metric families rendered together in the Prometheus text format.
+
+    ``collectors`` run on every render and refresh values that are read
+    from elsewhere (cache statistics, the loaded dataset) rather than
+    updated as events happen.
+    """
+
+    def __init__(self):
+        self.metrics: List[Metric] = []
+        self.collectors: List[Callable[[], None]] = []
+
+    def register(self, metric: Metric) -> Metric:
+        self.metrics.append(metric)
+        return metric
+
+    def counter(self, name: str, help: str, labels: Iterable[str] = ()) -> Counter:
+        return self.register(Counter(name, help, labels))
+
+    def gauge(self, name: str, help: str, labels: Iterable[str] = ()) -> Gauge:
+        return self.register(Gauge(name, help, labels))
+
+    def histogram(self, name: str, help: str, labels: Iterable[str] = (),
+                  buckets: Iterable[float] = LATENCY_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, help, labels, buckets))
+
+    def add_collector(self, collect: Callable[[], None]):
+        self.collectors.append(collect)
+
+    def render(self) -> str:
+        for collect in self.collectors:
+            collect()
+        lines = []
+        for metric in self.metrics:
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            for name, labels, value in metric.samples():
+                lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+class PhaseTimer:
+    """Wall time per named phase of one request, plus named counts.
+
+    Phases entered more than once accumulate; ``phases`` keeps the order
+    in which each phase first ran.
+    """
+
+    def __init__(self):
+        self.phases: Dict[str, float] = {}
+        self.counts: Dict[str, int] = {}
+
+    @contextmanager
+    def phase(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, time.perf_counter() - start)
+
+    def add(self, name: str, seconds: float):
+        self.phases[name] = self.phases.get(name, 0.0) + seconds
+
+    def count(self, name: str, n: int):
+        self.counts[name] = self.counts.get(name, 0) + n
+
+    def merge(self, phases: Dict[str, float], counts: Optional[Dict[str, int]] = None):
+        for name, seconds in phases.items():
+            self.add(name, seconds)
+        for name, n in (counts or {}).items():
+            self.count(name, n)
+
+    def milliseconds(self) -> Dict[str, float]:
+        return {name: round(seconds * 1000, 3) for name, seconds in self.phases.items()}
+
+
+def server_timing(phases: Dict[str, float]) -> str:
+    """Server-Timing header value for phase durations given in seconds"""
+    return ", ".join(f"{name};dur={seconds * 1000:.3f}" for name, seconds in phases.items())
+
+
+class MetricsMiddleware:
+    """ASGI middleware that observes each HTTP request in ``latency``.
+
+    Requests are labelled with the matched route's path template (never
+    the raw URL, which would make one series per property id or query),
+    method and status. With ``server_timing`` a ``total`` entry is appended
+    to the response's Server-Timing header.
+    """
+
+    def __init__(self, app, latency: Histogram, routes: List[Any], server_timing: bool = False):
+        self.app = app
+        self.latency = latency
+        self.routes = routes
+        self.server_timing = server_timing
+
+    def route_path(self, scope) -> str:
+        endpoint = scope.get("endpoint")
+        for route in self.routes:
+            if getattr(route, "endpoint", None) is endpoint and endpoint is not None:
+                return route.path
+        return "unmatched"
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        start = time.perf_counter()
+        status = {"code": 500}
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+                if self.server_timing:
+                    total = f"total;dur={(time.perf_counter() - start) * 1000:.3f}"
+                    headers = list(message.get("headers", []))
+                    for i, (name, value) in enumerate(headers):
+                        if name.lower() == b"server-timing":
+                            headers[i] = (name, value + b", " + total.encode())
+                            break
+                    else:
+                        headers.append((b"server-timing", total.encode()))
+                    message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            self.latency.observe(time.perf_counter() - start, method=scope["method"],
+                                 route=self.route_path(scope), status=status["code"])
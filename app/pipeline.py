@@ -0,0 +1,292 @@
+import hashlib
+import inspect
+import json
+import os
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, List, Optional
+
+from .comparables import score, spatial
+from .data_extraction import columnar, fetch, filter_industrial, flag_outliers, stats, validate, zoning
+from .data_extraction.columnar import read_records
+
+STATE_PATH = os.path.join(os.path.dirname(__file__), '../data/cache/pipeline_state.json')
+HASH_CHUNK_SIZE = 1 << 20
+
+
+class Stage:
+    """One node of the pipeline DAG.
+
+    ``run(context)`` computes the stage from its dependencies' results
+    (``context.result(name)``), writes ``outputs`` and returns its own
+    result for downstream stages; ``load()`` rebuilds that result from the
+    output files when the stage is skipped (stages nothing depends on need
+    none). The stage is skipped when its key - a hash of the ``code``
+    modules' source, ``params`` and the content of ``inputs`` - matches the
+    last successful run and its outputs are unchanged. ``cache=False``
+    stages always run.
+    """
+
+    def __init__(self, name: str, run: Callable[["PipelineContext"], Any], load: Optional[Callable[[], Any]] = None,
+                 deps: List[str] = (), inputs: List[str] = (), outputs: List[str] = (),
+                 code: List[Any] = (), params: Optional[Callable[[], Any]] = None, cache: bool = True):
+        self.name = name
+        self.run = run
+        self.load = load or (lambda: None)
+        self.deps = list(deps)
+        self.inputs = list(inputs)
+        self.outputs = list(outputs)
+        self.code = list(code)
+        self.params = params
+        self.cache = cache
+
+
+class FileDigests:
+    """SHA-256 of files, rehashed only when their size or mtime changes"""
+
+    def __init__(self, entries: Optional[Dict[str, Dict[str, Any]]] = None):
+        self.entries = entries or {}
+        self._lock = threading.Lock()
+
+    def digest(self, path: str) -> Optional[str]:
+        path = os.path.normpath(path)
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
+            return None
+        with self._lock:
+            entry = self.entries.get(path)
+        if entry and entry["size"] == st.st_size and entry["mtime_ns"] == st.st_mtime_ns:
+            return entry["sha256"]
+        sha = hashlib.sha256()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+                sha.update(chunk)
+        with self._lock:
+            self.entries[path] = {"size": st.st_size, "mtime_ns": st.st_mtime_ns, "sha256": sha.hexdigest()}
+        return sha.hexdigest()
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            return dict(self.entries)
+
+
+def code_digest(modules) -> str:
+    sha = hashlib.sha256()
+    for module in modules:
+        with open(inspect.getsourcefile(module), "rb") as f:
+            sha.update(f.read())
+    return sha.hexdigest()
+
+
+class PipelineContext:
+    """Results shared between stages of one run, loaded from disk on
+    first use when the producing stage was skipped"""
+
+    def __init__(self, stages: Dict[str, Stage]):
+        self.stages = stages
+        self._results: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+
+    def set_result(self, name: str, value: Any):
+        with self._lock:
+            self._results[name] = value
+
+    def result(self, name: str) -> Any:
+        with self._lock:
+            if name not in self._results:
+                self._results[name] = self.stages[name].load()
+            return self._results[name]
+
+
+class Pipeline:
+    """Runs stages in dependency order, independent branches concurrently.
+
+    A failing stage cancels every stage that has not started yet; stages
+    already running finish. State (stage keys and file digests) persists
+    in ``state_path`` after each successful stage.
+    """
+
+    def __init__(self, stages: List[Stage], state_path: str = STATE_PATH, max_workers: Optional[int] = None):
+        self.stages = {stage.name: stage for stage in stages}
+        self.state_path = state_path
+        self.max_workers = max_workers or len(stages)
+        self._state_lock = threading.Lock()
+
+    def load_state(self) -> Dict[str, Any]:
+        try:
+            with open(self.state_path, "r") as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return {"stages": {}, "files": {}}
+
+    def save_state(self, state: Dict[str, Any], digests: FileDigests):
+        with self._state_lock:
+            state["files"] = digests.snapshot()
+            os.makedirs(os.path.dirname(self.state_path), exist_ok=True)
+            tmp_path = self.state_path + ".tmp"
+            with open(tmp_path, "w") as f:
+                json.dump(state, f, indent=2)
+            os.replace(tmp_path, self.state_path)
+
+    def stage_key(self, stage: Stage, digests: FileDigests) -> str:
+        key = {
+            "code": code_digest(stage.code),
+            "params": stage.params() if stage.params else None,
+            "inputs": {os.path.normpath(path): digests.digest(path) for path in stage.inputs}
+        }
+        return hashlib.sha256(json.dumps(key, sort_keys=True, default=str).encode()).hexdigest()
+
+    def is_current(self, stage: Stage, key: str, state: Dict[str, Any], digests: FileDigests) -> bool:
+        previous = state["stages"].get(stage.name)
+        if not stage.cache or not previous or previous["key"] != key:
+            return False
+        return all(digests.digest(path) == previous["outputs"].get(os.path.normpath(path))
+                   for path in stage.outputs)
+
+    def run(self, force: bool = False, skip: List[str] = ()) -> Dict[str, Dict[str, Any]]:
+        """Run the pipeline; returns {stage: {"status", "seconds"[, "error"]}}
+        with status "ran", "skipped", "failed" or "cancelled". Stages in
+        ``skip`` are treated as up to date; ``force`` reruns everything."""
+        state = self.load_state()
+        digests = FileDigests(state.get("files"))
+        context = PipelineContext(self.stages)
+        results: Dict[str, Dict[str, Any]] = {}
+
+        def execute(stage: Stage):
+            start = time.perf_counter()
+            if stage.name in skip:
+                return {"status": "skipped", "seconds": time.perf_counter() - start}
+            key = self.stage_key(stage, digests)
+            if not force and self.is_current(stage, key, state, digests):
+                return {"status": "skipped", "seconds": time.perf_counter() - start}
+            context.set_result(stage.name, stage.run(context))
+            with self._state_lock:
+                state["stages"][stage.name] = {
+                    "key": key,
+                    "outputs": {os.path.normpath(path): digests.digest(path) for path in stage.outputs}
+                }
+            self.save_state(state, digests)
+            return {"status": "ran", "seconds": time.perf_counter() - start}
+
+        pending = dict(self.stages)
+        running = {}
+        failed = False
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            while pending or running:
+                if not failed:
+                    for name, stage in list(pending.items()):
+                        if all(results.get(dep, {}).get("status") in ("ran", "skipped") for dep in stage.deps):
+                            running[pool.submit(execute, stage)] = name
+                            del pending[name]
+                if not running:
+                    break
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    try:
+                        results[name] = future.result()
+                    except Exception as e:
+                        results[name] = {"status": "failed", "error": e}
+                        failed = True
+        for name in pending:
+            results[name] = {"status": "cancelled"}
+        return {name: results[name] for name in self.stages if name in results}
+
+
+# Every file the stages read or write; pipeline_paths() moves them
+PATHS = {
+    "raw": fetch.CACHE_PATH,
+    "industrial": filter_industrial.OUT_PATH,
+    "valid": validate.VALID_PATH,
+    "validation_log": validate.LOG_PATH,
+    "validation_report": validate.REPORT_PATH,
+    "flagged": flag_outliers.OUT_PATH,
+    "stats": stats.OUT_PATH,
+}
+LOG_FILES = ("validation_log", "validation_report")
+# Files that decide what a fetch returns: the dataset's schema (field
+# mapping, rate limits) and the incremental checkpoint with its watermark
+FETCH_INPUTS = [
+    os.path.join(fetch.SCHEMA_DIR, f"{fetch.DATASET_ID}.json"),
+    os.path.join(fetch.checkpoint_dir(fetch.DATASET_ID), "cursor.json"),
+]
+# With unchanged inputs the API is still polled once per window
+FETCH_TTL = float(os.getenv("PIPELINE_FETCH_TTL", 24 * 3600))
+
+
+def pipeline_paths(cache_dir: str, log_dir: str) -> Dict[str, str]:
+    """PATHS with the same file names under other directories"""
+    return {name: os.path.join(log_dir if name in LOG_FILES else cache_dir, os.path.basename(path))
+            for name, path in PATHS.items()}
+
+
+def build_stages(paths: Dict[str, str] = PATHS) -> List[Stage]:
+    """The pipeline's stages, reading and writing ``paths``"""
+
+    def _fetch(context):
+        records = fetch.fetch_or_sample()
+        # An unchanged fetch leaves the file (and everything downstream) alone
+        text = json.dumps(records, indent=2)
+        if hashlib.sha256(text.encode()).hexdigest() != FileDigests().digest(paths["raw"]):
+            fetch.save_records(records, paths["raw"])
+        print(f"Fetched {len(records)} records")
+        return records
+
+    def _filter_industrial(context):
+        industrial = filter_industrial.filter_industrial(context.result("fetch"))
+        filter_industrial.save_records(industrial, paths["industrial"])
+        print(f"Saved {len(industrial)} industrial properties to {paths['industrial']}")
+        return industrial
+
+    def _validate(context):
+        industrial = context.result("filter_industrial")
+        valid, report = validate.validate_columns(validate.record_columns(industrial), len(industrial))
+        validate.save_validation(report, industrial, valid, paths["valid"],
+                                 paths["validation_log"], paths["validation_report"])
+        validate.check_error_rate(report)
+        return report
+
+    def _flag_outliers(context):
+        # Copies: validate reads the same industrial records concurrently
+        flagged = flag_outliers.flag_outliers([dict(rec) for rec in context.result("filter_industrial")])
+        flag_outliers.save_records(flagged, paths["flagged"])
+        print(f"Flagged outliers on {len(flagged)} records")
+        return flagged
+
+    def _stats(context):
+        result = stats.compute_stats(context.result("flag_outliers"))
+        stats.save_stats(result, paths["stats"])
+        print(f"Saved normalization statistics to {paths['stats']}")
+        return result
+
+    return [
+        Stage("fetch", _fetch, lambda: read_records(paths["raw"]),
+              inputs=FETCH_INPUTS, outputs=[paths["raw"]], code=[fetch, columnar],
+              params=lambda: (fetch.API_URL, fetch.BATCH_SIZE, fetch.MAX_RECORDS, int(time.time() // FETCH_TTL))),
+        Stage("filter_industrial", _filter_industrial, lambda: read_records(paths["industrial"]),
+              deps=["fetch"], inputs=[paths["raw"]], outputs=[paths["industrial"]],
+              code=[filter_industrial, zoning, columnar], params=zoning.load_tables),
+        Stage("validate", _validate,
+              deps=["filter_industrial"], inputs=[paths["industrial"]],
+              outputs=[paths["valid"], paths["validation_report"]], code=[validate, columnar],
+              params=lambda: (validate.VALIDATION_RULES, validate.MAX_ERROR_RATE)),
+        Stage("flag_outliers", _flag_outliers, lambda: read_records(paths["flagged"]),
+              deps=["filter_industrial"], inputs=[paths["industrial"]], outputs=[paths["flagged"]],
+              code=[flag_outliers, spatial, score, columnar], params=lambda: flag_outliers.OUTLIER_RULES),
+        Stage("stats", _stats, lambda: stats.load_stats(paths["stats"]),
+              deps=["flag_outliers"], inputs=[paths["flagged"]], outputs=[paths["stats"]],
+              code=[stats, flag_outliers, spatial, score, columnar],
+              params=lambda: (stats.STATS_FIELDS, stats.CELL_DEGREES, stats.QUANTILES)),
+    ]
+
+
+STAGES = build_stages()
+
+
+def run_pipeline(fetch_data: bool = True, force: bool = False, state_path: str = STATE_PATH,
+                 paths: Optional[Dict[str, str]] = None):
+    """Run the data pipeline in-process; see Pipeline.run"""
+    stages = STAGES if paths is None else build_stages(paths)
+    return Pipeline(stages, state_path).run(force=force, skip=[] if fetch_data else ["fetch"])
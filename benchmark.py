@@ -0,0 +1,313 @@
+#!/usr/bin/env python3
+"""
+Benchmark suite for Starboard on synthetic county-scale data
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from urllib.parse import urlsplit
+
+import numpy as np
+
+from app.comparables.discovery import columns_from_columnar, extract_columns
+from app.comparables.find import batch_comparable_search, comparable_search
+from app.comparables.score import score_batch
+from app.comparables.spatial import GridIndex
+from app.comparables.store import PropertyStore, get_column_minmax
+from app.data_extraction.columnar import columnar_path, load_columnar, write_records
+from app.data_extraction.filter_industrial import filter_industrial
+from app.data_extraction.flag_outliers import flag_outliers
+from app.data_extraction.stats import compute_stats
+from app.data_extraction.synthetic import SCALES, generate_parcels, parse_scale
+from app.data_extraction.validate import record_columns, validate_columns
+
+RESULTS_DIR = "data/logs/benchmarks"
+DEFAULT_SCALES = "10k,100k"
+DEFAULT_REPEAT = 3
+# Relative slowdown of a median time that counts as a regression
+DEFAULT_TOLERANCE = 0.25
+BATCH_SUBJECTS = 100
+API_BATCH_SUBJECTS = 10
+
+def timed(fn, repeat):
+    """Run fn() repeat times; returns (timings, last result)"""
+    timings = []
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        timings.append(time.perf_counter() - start)
+    return timings, result
+
+def result_entry(benchmark, scale, rows, timings):
+    median = statistics.median(timings)
+    return {
+        "benchmark": benchmark,
+        "scale": scale,
+        "rows": rows,
+        "runs": len(timings),
+        "min_s": min(timings),
+        "median_s": median,
+        "max_s": max(timings),
+        "rows_per_s": rows / median if median else None
+    }
+
+def subjects_from(records, count, seed):
+    """Subjects drawn from the data, so searches land in populated areas"""
+    rng = np.random.default_rng(seed)
+    picks = rng.choice(len(records), size=min(count, len(records)), replace=False)
+    fields = ("latitude", "longitude", "square_feet", "year_built", "zoning")
+    return [{k: records[int(i)][k] for k in fields} for i in picks]
+
+def bench_stages(raw, repeat):
+    """filter_industrial, validate, flag_outliers and stats on in-memory records"""
+    results = {}
+    timings, industrial = timed(lambda: filter_industrial([dict(rec) for rec in raw]), repeat)
+    results["stage.filter_industrial"] = (len(raw), timings)
+
+    def validate():
+        valid, _ = validate_columns(record_columns(industrial), len(industrial))
+        return [industrial[i] for i in np.flatnonzero(valid).tolist()]
+    timings, _ = timed(validate, repeat)
+    results["stage.validate"] = (len(industrial), timings)
+
+    timings, flagged = timed(lambda: flag_outliers(industrial), repeat)
+    results["stage.flag_outliers"] = (len(industrial), timings)
+
+    timings, _ = timed(lambda: compute_stats(flagged), repeat)
+    results["stage.stats"] = (len(flagged), timings)
+    return results, flagged
+
+def bench_scoring(flagged, repeat, seed):
+    """score_batch and comparable_search against prebuilt columns"""
+    results = {}
+    columns = extract_columns(flagged)
+    minmax = get_column_minmax(columns)
+    index = GridIndex(columns["latitude"], columns["longitude"])
+    subjects = subjects_from(flagged, BATCH_SUBJECTS, seed)
+    rows = len(flagged)
+
+    timings, _ = timed(lambda: score_batch(subjects[0], columns, minmax), repeat)
+    results["score.score_batch"] = (rows, timings)
+
+    def search_all(use_index):
+        for subject in subjects:
+            comparable_search(subject, flagged, 5, columns=columns, minmax=minmax,
+                              index=index if use_index else None)
+    # Per subject, so timings compare across BATCH_SUBJECTS changes
+    timings, _ = timed(lambda: search_all(True), repeat)
+    results["score.comparable_search"] = (rows, [t / len(subjects) for t in timings])
+    timings, _ = timed(lambda: search_all(False), repeat)
+    results["score.comparable_search_full_scan"] = (rows, [t / len(subjects) for t in timings])
+
+    timings, _ = timed(lambda: list(batch_comparable_search(subjects, flagged, 5, columns=columns, minmax=minmax)),
+                       repeat)
+    results["score.batch_comparable_search"] = (rows, [t / len(subjects) for t in timings])
+    return results
+
+def bench_cache(flagged, workdir, repeat):
+    """Loading the property cache from JSON and from its columnar copy"""
+    results = {}
+    path = os.path.join(workdir, "outlier_flags.json")
+    timings, _ = timed(lambda: write_records(path, flagged), 1)
+    results["cache.write_records"] = (len(flagged), timings)
+
+    def load_json():
+        with open(path, "r") as f:
+            return json.load(f)
+    timings, _ = timed(load_json, repeat)
+    results["cache.json_load"] = (len(flagged), timings)
+
+    timings, _ = timed(lambda: columns_from_columnar(load_columnar(columnar_path(path))), repeat)
+    results["cache.columnar_load"] = (len(flagged), timings)
+
+    timings, _ = timed(lambda: PropertyStore([path]).load(), repeat)
+    results["cache.store_load_columnar"] = (len(flagged), timings)
+
+    # A stale columnar copy sends the store to the JSON file
+    os.utime(path, (time.time() + 60, time.time() + 60))
+    timings, _ = timed(lambda: PropertyStore([path]).load(), repeat)
+    results["cache.store_load_json"] = (len(flagged), timings)
+    shutil.rmtree(columnar_path(path))
+    write_records(path, flagged)
+    return results, path
+
+async def asgi_request(app, method, url, body=None):
+    """Send one request straight to an ASGI app; returns (status, body bytes)"""
+    parts = urlsplit(url)
+    payload = json.dumps(body).encode() if body is not None else b""
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1",
+        "method": method, "scheme": "http", "path": parts.path, "raw_path": parts.path.encode(),
+        "query_string": parts.query.encode(), "root_path": "",
+        "headers": [(b"host", b"benchmark"), (b"content-type", b"application/json"),
+                    (b"content-length", str(len(payload)).encode())],
+        "client": ("127.0.0.1", 0), "server": ("benchmark", 80)
+    }
+    sent = False
+    disconnected = asyncio.Event()
+    response = {"status": None, "body": []}
+
+    async def receive():
+        nonlocal sent
+        if not sent:
+            sent = True
+            return {"type": "http.request", "body": payload, "more_body": False}
+        await disconnected.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            response["status"] = message["status"]
+        elif message["type"] == "http.response.body":
+            response["body"].append(message.get("body", b""))
+            if not message.get("more_body"):
+                disconnected.set()
+
+    await app(scope, receive, send)
+    return response["status"], b"".join(response["body"])
+
+def bench_api(path, flagged, repeat, seed):
+    """API endpoints through an in-process ASGI client (no network or server)"""
+    import main as api
+
+    api.store = PropertyStore([path], fallback=api.sample_properties)
+    api.store.add_listener(lambda snapshot: api.result_cache.clear())
+    subjects = subjects_from(flagged, API_BATCH_SUBJECTS, seed)
+    zoning = subjects[0]["zoning"]
+    requests = [
+        ("api.health", "GET", "/health", None),
+        ("api.properties", "GET", "/properties?limit=100", None),
+        ("api.properties_filtered", "GET", f"/properties?limit=100&zoning={zoning}&exclude_outliers=true", None),
+        ("api.comparable", "POST", "/comparable?n=5&use_cache=false", subjects[0]),
+        ("api.comparable_cached", "POST", "/comparable?n=5", subjects[0]),
+        ("api.comparable_robust_zoning", "POST", "/comparable?n=5&use_cache=false&normalization=robust&scope=zoning",
+         subjects[0]),
+        ("api.comparable_batch", "POST", "/comparable/batch?n=5", subjects),
+    ]
+
+    async def run():
+        results = {}
+        async with api.lifespan(api.app):
+            for name, method, url, body in requests:
+                # One untimed call warms caches and lazy statistics
+                status, _ = await asgi_request(api.app, method, url, body)
+                if status != 200:
+                    raise RuntimeError(f"{method} {url} returned {status}")
+                timings = []
+                for _ in range(repeat):
+                    start = time.perf_counter()
+                    await asgi_request(api.app, method, url, body)
+                    timings.append(time.perf_counter() - start)
+                results[name] = (len(flagged), timings)
+        return results
+
+    return asyncio.run(run())
+
+def environment():
+    try:
+        commit = subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True,
+                                check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "git_commit": commit,
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count()
+    }
+
+def run_benchmarks(scales, repeat=DEFAULT_REPEAT, seed=0, suites=("stages", "scoring", "cache", "api")):
+    """Run the selected suites at each scale; returns the results document"""
+    report = {
+        "created": datetime.now(timezone.utc).isoformat(),
+        "seed": seed,
+        "repeat": repeat,
+        "environment": environment(),
+        "results": []
+    }
+    for scale in scales:
+        rows = parse_scale(scale)
+        print(f"\n📏 Scale {scale}: generating {rows} synthetic parcels...")
+        timings, raw = timed(lambda: generate_parcels(rows, seed), 1)
+        report["results"].append(result_entry("synthetic.generate", scale, rows, timings))
+        workdir = tempfile.mkdtemp(prefix="starboard-bench-")
+        try:
+            results, flagged = bench_stages(raw, repeat if "stages" in suites else 1)
+            del raw
+            if "stages" not in suites:
+                results = {}
+            if "scoring" in suites:
+                results.update(bench_scoring(flagged, repeat, seed))
+            if "cache" in suites or "api" in suites:
+                cache_results, path = bench_cache(flagged, workdir, repeat)
+                if "cache" in suites:
+                    results.update(cache_results)
+                if "api" in suites:
+                    results.update(bench_api(path, flagged, repeat, seed))
+        finally:
+            shutil.rmtree(workdir, ignore_errors=True)
+        for name, (count, timings) in results.items():
+            entry = result_entry(name, scale, count, timings)
+            report["results"].append(entry)
+            print(f"   {name:<36} {entry['median_s'] * 1000:10.2f} ms  ({count} rows)")
+    return report
+
+def compare(report, baseline, tolerance=DEFAULT_TOLERANCE):
+    """Benchmarks whose median time grew by more than ``tolerance`` over the
+    baseline results, as (benchmark, scale, baseline_s, current_s)"""
+    previous = {(r["benchmark"], r["scale"]): r["median_s"] for r in baseline["results"]}
+    regressions = []
+    for r in report["results"]:
+        before = previous.get((r["benchmark"], r["scale"]))
+        if before and r["median_s"] > before * (1 + tolerance):
+            regressions.append((r["benchmark"], r["scale"], before, r["median_s"]))
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark Starboard on synthetic data")
+    parser.add_argument("--scales", default=DEFAULT_SCALES,
+                        help=f"Comma-separated row counts or names ({', '.join(SCALES)})")
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--suites", default="stages,scoring,cache,api",
+                        help="Comma-separated subset of stages,scoring,cache,api")
+    parser.add_argument("--output", help=f"Results file (default {RESULTS_DIR}/benchmark_<timestamp>.json)")
+    parser.add_argument("--compare", help="Earlier results file; exit 1 if any benchmark regressed")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE)
+    args = parser.parse_args()
+
+    print("⏱️ Starboard Benchmarks")
+    print("=" * 50)
+    report = run_benchmarks([s.strip() for s in args.scales.split(",") if s.strip()], args.repeat, args.seed,
+                            tuple(s.strip() for s in args.suites.split(",")))
+
+    output = args.output or os.path.join(RESULTS_DIR, f"benchmark_{datetime.now():%Y%m%d_%H%M%S}.json")
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\n💾 Saved results to {output}")
+
+    if args.compare:
+        with open(args.compare, "r") as f:
+            baseline = json.load(f)
+        regressions = compare(report, baseline, args.tolerance)
+        for benchmark, scale, before, after in regressions:
+            print(f"❌ {benchmark} @ {scale}: {before * 1000:.2f} ms -> {after * 1000:.2f} ms")
+        if regressions:
+            sys.exit(1)
+        print(f"✅ No regressions beyond {args.tolerance:.0%} against {args.compare}")
+
+if __name__ == "__main__":
+    main()
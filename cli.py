@@ -4,10 +4,11 @@ Command Line Interface for Starboard Industrial Property Comparables
 """
 
 import argparse
+import csv
 import json
 import requests
 import sys
-from typing import Dict, Any
+from typing import Dict, Any, Iterator, List
 
 def test_api_connection(base_url: str = "http://localhost:8000") -> bool:
     """Test if the API server is running"""
@@ -17,12 +18,25 @@ def test_api_connection(base_url: str = "http://localhost:8000") -> bool:
     except requests.exceptions.ConnectionError:
         return False
 
-def get_properties(base_url: str = "http://localhost:8000") -> Dict[str, Any]:
-    """Get all available properties"""
-    response = requests.get(f"{base_url}/properties")
+def get_properties(base_url: str = "http://localhost:8000", cursor: str = None, **filters) -> Dict[str, Any]:
+    """Get one page of properties"""
+    params = {k: v for k, v in filters.items() if v is not None}
+    if cursor:
+        params["cursor"] = cursor
+    response = requests.get(f"{base_url}/properties", params=params)
     response.raise_for_status()
     return response.json()
 
+def iter_properties(base_url: str = "http://localhost:8000", **filters) -> Iterator[Dict[str, Any]]:
+    """Iterate over all matching properties, following page cursors"""
+    cursor = None
+    while True:
+        page = get_properties(base_url, cursor, **filters)
+        yield from page["properties"]
+        cursor = page.get("next_cursor")
+        if not cursor:
+            break
+
 def find_comparables(property_data: Dict[str, Any], n: int = 5, base_url: str = "http://localhost:8000") -> Dict[str, Any]:
     """Find comparable properties"""
     response = requests.post(
@@ -33,6 +47,36 @@ def find_comparables(property_data: Dict[str, Any], n: int = 5, base_url: str =
     response.raise_for_status()
     return response.json()
 
+SUBJECT_FIELDS = {
+    "latitude": float,
+    "longitude": float,
+    "square_feet": float,
+    "year_built": int,
+    "zoning": str
+}
+
+def read_subjects(path: str) -> List[Dict[str, Any]]:
+    """Read subject properties from a CSV file (with a header row) or NDJSON"""
+    with open(path, newline="") as f:
+        if path.lower().endswith(".csv"):
+            rows = list(csv.DictReader(f))
+        else:
+            rows = [json.loads(line) for line in f if line.strip()]
+    return [{field: cast(row[field]) for field, cast in SUBJECT_FIELDS.items()} for row in rows]
+
+def find_comparables_batch(subjects: List[Dict[str, Any]], n: int = 5, base_url: str = "http://localhost:8000") -> Iterator[Dict[str, Any]]:
+    """Find comparables for many subjects in one request, yielding results as they stream in"""
+    response = requests.post(
+        f"{base_url}/comparable/batch",
+        params={"n": n},
+        json=subjects,
+        stream=True
+    )
+    response.raise_for_status()
+    for line in response.iter_lines():
+        if line:
+            yield json.loads(line)
+
 def main():
     parser = argparse.ArgumentParser(description="Starboard Industrial Property Comparables CLI")
     parser.add_argument("--base-url", default="http://localhost:8000", help="API base URL")
@@ -44,6 +88,9 @@ def main():
     
     # List properties command
     list_parser = subparsers.add_parser("list", help="List all properties")
+    list_parser.add_argument("--zoning", help="Comma-separated zoning codes to include")
+    list_parser.add_argument("--exclude-outliers", action="store_true", help="Skip size/age outliers")
+    list_parser.add_argument("--page-size", type=int, default=500, help="Properties fetched per request")
     
     # Find comparables command
     compare_parser = subparsers.add_parser("compare", help="Find comparable properties")
@@ -54,6 +101,12 @@ def main():
     compare_parser.add_argument("--zoning", type=str, required=True, help="Property zoning code")
     compare_parser.add_argument("--count", type=int, default=5, help="Number of comparables to return")
     
+    # Batch comparables command
+    batch_parser = subparsers.add_parser("batch", help="Find comparables for subjects in a CSV or NDJSON file")
+    batch_parser.add_argument("--input", required=True, help="CSV (with header) or NDJSON file of subject properties")
+    batch_parser.add_argument("--output", help="Write NDJSON results here instead of stdout")
+    batch_parser.add_argument("--count", type=int, default=5, help="Number of comparables per subject")
+    
     args = parser.parse_args()
     
     if not args.command:
@@ -74,16 +127,23 @@ def main():
             print(f"📍 Service: {result['service']}")
             
         elif args.command == "list":
-            result = get_properties(args.base_url)
-            print(f"📋 Found {result['count']} industrial properties:")
+            properties = iter_properties(
+                args.base_url, limit=args.page_size, zoning=args.zoning,
+                exclude_outliers=args.exclude_outliers or None
+            )
+            print("📋 Industrial properties:")
             print()
-            for prop in result['properties']:
+            # Print each page as it arrives instead of collecting them all
+            count = 0
+            for prop in properties:
                 print(f"🏭 ID: {prop['id']}")
                 print(f"   Address: {prop['address']}")
                 print(f"   Size: {prop['square_feet']:,} sq ft")
                 print(f"   Built: {prop['year_built']}")
                 print(f"   Zoning: {prop['zoning']}")
-                print()
+                print(flush=True)
+                count += 1
+            print(f"📋 Found {count} industrial properties")
                 
         elif args.command == "compare":
             property_data = {
@@ -121,10 +181,27 @@ def main():
             weights = result['weights']
             for factor, weight in weights.items():
                 print(f"   {factor.title()}: {weight:.1%}")
+        
+        elif args.command == "batch":
+            subjects = read_subjects(args.input)
+            out = open(args.output, "w") if args.output else sys.stdout
+            try:
+                count = 0
+                for result in find_comparables_batch(subjects, args.count, args.base_url):
+                    out.write(json.dumps(result) + "\n")
+                    count += 1
+            finally:
+                if args.output:
+                    out.close()
+            if args.output:
+                print(f"✅ Wrote comparables for {count} subjects to {args.output}")
                 
     except requests.exceptions.RequestException as e:
         print(f"❌ Error: {e}")
         sys.exit(1)
+    except (OSError, ValueError) as e:
+        print(f"❌ Error reading subjects: {e}")
+        sys.exit(1)
     except KeyError as e:
         print(f"❌ Error: Missing expected field {e}")
         sys.exit(1)
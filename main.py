@@ -1,13 +1,77 @@
 
 from fastapi import FastAPI, Request, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse, Response, StreamingResponse
+from starlette.concurrency import run_in_threadpool
 from pydantic import BaseModel
-from typing import List, Any
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from typing import List, Any, Optional
+import argparse
+import asyncio
+import base64
+import binascii
 import json
 import os
 import uvicorn
 
-app = FastAPI(title="Starboard Industrial Property Comparables API", version="1.0.0")
+from app.comparables.cache import ResultCache, comparable_cache_key
+from app.comparables.find import batch_comparable_search
+from app.comparables.query import query_rows
+from app.comparables.score import NORMALIZATION_SCOPES, NORMALIZATION_STRATEGIES, normalization_for, weights
+from app.comparables.store import PropertyStore
+from app.comparables.workers import init_worker, search_comparables, worker_search_comparables
+from app.metrics import CONTENT_TYPE, MetricsMiddleware, MetricsRegistry, PhaseTimer, server_timing
+
+# "thread" scores on a thread pool (NumPy releases the GIL in the heavy
+# kernels); "process" scores on worker processes that each hold the store
+SCORING_EXECUTOR = os.getenv("SCORING_EXECUTOR", "thread")
+SCORING_WORKERS = int(os.getenv("SCORING_WORKERS", os.cpu_count() or 4))
+scoring_pool = None
+
+RESULT_CACHE_SIZE = int(os.getenv("RESULT_CACHE_SIZE", 1024))
+RESULT_CACHE_TTL = float(os.getenv("RESULT_CACHE_TTL", 300))
+RESULT_CACHE_PRECISION = int(os.getenv("RESULT_CACHE_PRECISION", 4))
+result_cache = ResultCache(maxsize=RESULT_CACHE_SIZE, ttl=RESULT_CACHE_TTL)
+
+# Add a Server-Timing header (total time, plus the phases of /comparable)
+# to every response; /comparable?debug=true adds it for that request only
+SERVER_TIMING = os.getenv("SERVER_TIMING", "false").lower() in ("1", "true", "yes")
+
+metrics = MetricsRegistry()
+request_latency = metrics.histogram("starboard_request_duration_seconds",
+                                    "HTTP request latency by route", ["method", "route", "status"])
+comparable_phase_seconds = metrics.histogram("starboard_comparable_phase_seconds",
+                                             "Time spent in each phase of /comparable", ["phase"])
+comparable_candidates = metrics.histogram("starboard_comparable_candidates_scored",
+                                          "Candidates scored per /comparable search",
+                                          buckets=(10, 100, 1000, 10000, 100000, 1000000, 10000000))
+result_cache_lookups = metrics.counter("starboard_result_cache_lookups_total",
+                                       "/comparable result cache lookups by outcome", ["result"])
+result_cache_hit_ratio = metrics.gauge("starboard_result_cache_hit_ratio", "/comparable result cache hit ratio")
+result_cache_entries = metrics.gauge("starboard_result_cache_entries", "/comparable result cache entries")
+dataset_records = metrics.gauge("starboard_dataset_records", "Records in the loaded property dataset")
+dataset_info = metrics.gauge("starboard_dataset_info", "Loaded property dataset", ["version", "path"])
+dataset_mtime = metrics.gauge("starboard_dataset_mtime_seconds", "Modification time of the loaded dataset file")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    global scoring_pool
+    # Parse the property cache once at startup rather than on first request
+    await run_in_threadpool(store.load)
+    if SCORING_EXECUTOR == "process":
+        scoring_pool = ProcessPoolExecutor(
+            max_workers=SCORING_WORKERS, initializer=init_worker,
+            initargs=(store.paths, sample_properties)
+        )
+    else:
+        scoring_pool = ThreadPoolExecutor(max_workers=SCORING_WORKERS)
+    yield
+    scoring_pool.shutdown()
+
+app = FastAPI(title="Starboard Industrial Property Comparables API", version="1.0.0", lifespan=lifespan)
+
+app.add_middleware(MetricsMiddleware, latency=request_latency, routes=app.routes, server_timing=SERVER_TIMING)
 
 # Add CORS middleware
 app.add_middleware(
@@ -21,25 +85,42 @@ app.add_middleware(
 DATA_PATH = os.path.join(os.path.dirname(__file__), "data/cache/industrial_properties.json")
 OUTLIER_PATH = os.path.join(os.path.dirname(__file__), "data/cache/outlier_flags.json")
 
+def sample_properties():
+    """Sample data served when no data files exist"""
+    return [
+        {
+            "id": "1001",
+            "address": "123 Industrial Ave, Chicago, IL",
+            "latitude": 41.8781,
+            "longitude": -87.6298,
+            "square_feet": 50000,
+            "year_built": 1995,
+            "zoning": "M1",
+            "property_type": "Industrial"
+        }
+    ]
+
+# Outlier-flagged data is preferred; the store reloads when the file changes
+store = PropertyStore([OUTLIER_PATH, DATA_PATH], fallback=sample_properties)
+# Cached comparables are only valid for the dataset they were computed on
+store.add_listener(lambda snapshot: result_cache.clear())
+
+def collect_service_metrics():
+    stats = result_cache.stats()
+    result_cache_hit_ratio.set(stats["hit_ratio"])
+    result_cache_entries.set(stats["size"])
+    snapshot = store.snapshot()
+    dataset_records.set(len(snapshot))
+    # Only the current dataset has a series; reloads replace it
+    dataset_info.clear()
+    dataset_info.set(1, version=snapshot.version, path=os.path.basename(snapshot.path or "sample"))
+    dataset_mtime.set(snapshot.mtime or 0)
+
+metrics.add_collector(collect_service_metrics)
+
 def load_properties():
     """Load property data, preferring outlier-flagged data if available"""
-    path = OUTLIER_PATH if os.path.exists(OUTLIER_PATH) else DATA_PATH
-    if not os.path.exists(path):
-        # Return sample data if no data files exist
-        return [
-            {
-                "id": "1001",
-                "address": "123 Industrial Ave, Chicago, IL",
-                "latitude": 41.8781,
-                "longitude": -87.6298,
-                "square_feet": 50000,
-                "year_built": 1995,
-                "zoning": "M1",
-                "property_type": "Industrial"
-            }
-        ]
-    with open(path, "r") as f:
-        return json.load(f)
+    return store.snapshot().records
 
 class PropertyInput(BaseModel):
     latitude: float
@@ -52,71 +133,194 @@ class PropertyInput(BaseModel):
 def root():
     return {"message": "Starboard Industrial Property Comparables API", "version": "1.0.0"}
 
+MAX_PAGE_SIZE = 1000
+PAGE_FORMATS = ["json", "ndjson"]
+
+def encode_cursor(version: str, row: int) -> str:
+    return base64.urlsafe_b64encode(f"{version}:{row}".encode()).decode()
+
+def decode_cursor(cursor: str, version: str) -> int:
+    try:
+        cursor_version, row = base64.urlsafe_b64decode(cursor.encode()).decode().split(":")
+        row = int(row)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if cursor_version != version:
+        raise HTTPException(status_code=409, detail="Property data changed since this cursor was issued; restart from the first page")
+    return row
+
+def parse_csv_param(value: Optional[str]) -> Optional[List[str]]:
+    return [v.strip() for v in value.split(",") if v.strip()] if value else None
+
 @app.get("/properties")
-def get_properties():
-    """Get all available industrial properties"""
+async def get_properties(
+    cursor: Optional[str] = None,
+    limit: int = 100,
+    zoning: Optional[str] = None,
+    bbox: Optional[str] = None,
+    min_sqft: Optional[float] = None,
+    max_sqft: Optional[float] = None,
+    min_year: Optional[int] = None,
+    max_year: Optional[int] = None,
+    exclude_outliers: bool = False,
+    fields: Optional[str] = None,
+    format: str = "json"
+):
+    """Get one page of industrial properties.
+    
+    zoning and fields are comma-separated; bbox is min_lon,min_lat,max_lon,max_lat.
+    Pass next_cursor back as cursor for the following page.
+    """
+    if not 1 <= limit <= MAX_PAGE_SIZE:
+        raise HTTPException(status_code=400, detail=f"limit must be between 1 and {MAX_PAGE_SIZE}")
+    if format not in PAGE_FORMATS:
+        raise HTTPException(status_code=400, detail=f"format must be one of {', '.join(PAGE_FORMATS)}")
+    bounds = None
+    if bbox:
+        try:
+            bounds = tuple(float(v) for v in bbox.split(","))
+        except ValueError:
+            bounds = ()
+        if len(bounds) != 4:
+            raise HTTPException(status_code=400, detail="bbox must be min_lon,min_lat,max_lon,max_lat")
+    projection = parse_csv_param(fields)
+    
     try:
-        properties = load_properties()
-        return {"count": len(properties), "properties": properties}
+        snapshot = await run_in_threadpool(store.snapshot)
+        start = decode_cursor(cursor, snapshot.version) if cursor else 0
+        
+        def page():
+            rows, next_row = query_rows(
+                snapshot.columns, snapshot.query_index, start, limit,
+                zonings=parse_csv_param(zoning), bbox=bounds,
+                min_sqft=min_sqft, max_sqft=max_sqft, min_year=min_year, max_year=max_year,
+                exclude_outliers=exclude_outliers
+            )
+            properties = [snapshot.records[int(i)] for i in rows]
+            if projection:
+                properties = [{k: p[k] for k in projection if k in p} for p in properties]
+            return properties, next_row
+        
+        properties, next_row = await run_in_threadpool(page)
+        next_cursor = encode_cursor(snapshot.version, next_row) if next_row is not None else None
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error loading properties: {str(e)}")
+    
+    if format == "ndjson":
+        headers = {"X-Next-Cursor": next_cursor} if next_cursor else {}
+        lines = (json.dumps(p) + "\n" for p in properties)
+        return StreamingResponse(lines, media_type="application/x-ndjson", headers=headers)
+    return {
+        "count": len(properties),
+        "total_records": len(snapshot),
+        "next_cursor": next_cursor,
+        "properties": properties
+    }
+
+def check_normalization(normalization: str, scope: str):
+    if normalization not in NORMALIZATION_STRATEGIES:
+        raise HTTPException(status_code=400, detail=f"normalization must be one of {', '.join(NORMALIZATION_STRATEGIES)}")
+    if scope not in NORMALIZATION_SCOPES:
+        raise HTTPException(status_code=400, detail=f"scope must be one of {', '.join(NORMALIZATION_SCOPES)}")
 
 @app.post("/comparable")
-def find_comparables(input: PropertyInput, n: int = 5):
-    """Find comparable properties for a given input property"""
+async def find_comparables(input: PropertyInput, n: int = 5, use_cache: bool = True,
+                           normalization: str = "minmax", scope: str = "global", debug: bool = False):
+    """Find comparable properties for a given input property.
+    
+    normalization is minmax, robust or zscore; scope is global, zoning
+    (the subject's zoning family) or cell (its geographic cell). debug adds
+    the per-phase timings (milliseconds) to the response and a Server-Timing header.
+    """
+    check_normalization(normalization, scope)
+    timer = PhaseTimer()
     try:
-        from app.comparables.score import score, location_similarity, size_similarity, age_similarity, zoning_match, weights
-        
-        records = load_properties()
-        if not records:
-            raise HTTPException(status_code=404, detail="No property data available")
-        
-        minmax = {
-            "min_size": min([r.get("square_feet", 0) for r in records]),
-            "max_size": max([r.get("square_feet", 0) for r in records]),
-            "min_year": min([r.get("year_built", 0) for r in records]),
-            "max_year": max([r.get("year_built", 0) for r in records])
-        }
-        
         subject = input.dict()
-        scored = []
+        with timer.phase("load"):
+            snapshot = await run_in_threadpool(store.snapshot)
+        key = comparable_cache_key(subject, n, weights, snapshot.version, RESULT_CACHE_PRECISION,
+                                   (normalization, scope))
+        result = None
+        if use_cache:
+            with timer.phase("cache"):
+                cached = result_cache.get(key)
+            result_cache_lookups.inc(result="miss" if cached is None else "hit")
+            if cached is not None:
+                # Quantized keys can match a slightly different subject
+                result = {**cached, "subject": subject}
         
-        for candidate in records:
-            s = score(subject, candidate, minmax)
-            breakdown = {
-                "location": location_similarity(
-                    subject.get("latitude"), subject.get("longitude"),
-                    candidate.get("latitude"), candidate.get("longitude")
-                ),
-                "size": size_similarity(
-                    subject.get("square_feet", 0), candidate.get("square_feet", 0),
-                    minmax["min_size"], minmax["max_size"]
-                ),
-                "year_built": age_similarity(
-                    subject.get("year_built", 0), candidate.get("year_built", 0),
-                    minmax["min_year"], minmax["max_year"]
-                ),
-                "zoning": zoning_match(
-                    subject.get("zoning"), candidate.get("zoning")
-                )
+        if result is None:
+            # Scoring (and any cache reload) runs on the scoring pool, off the event loop
+            loop = asyncio.get_running_loop()
+            if SCORING_EXECUTOR == "process":
+                comparables, total, phases, counts = await loop.run_in_executor(
+                    scoring_pool, worker_search_comparables, subject, n, normalization, scope)
+                timer.merge(phases, counts)
+            else:
+                comparables, total = await loop.run_in_executor(
+                    scoring_pool, search_comparables, store, subject, n, normalization, scope, timer)
+            if not total:
+                raise HTTPException(status_code=404, detail="No property data available")
+            comparable_candidates.observe(timer.counts.get("candidates", 0))
+            
+            result = {
+                "subject": subject,
+                "comparables": comparables,
+                "weights": weights,
+                "normalization": {"strategy": normalization, "scope": scope},
+                "total_found": total
             }
-            scored.append({
-                "id": candidate.get("id"),
-                "score": s,
-                "breakdown": breakdown,
-                "property": candidate
-            })
-        
-        scored.sort(key=lambda x: x["score"], reverse=True)
-        return {
-            "subject": subject,
-            "comparables": scored[:n],
-            "weights": weights,
-            "total_found": len(scored)
-        }
+            if use_cache:
+                result_cache.put(key, result)
         
+        with timer.phase("serialize"):
+            body = json.dumps({**result, "timings": timer.milliseconds()} if debug else result)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error finding comparables: {str(e)}")
+    
+    for phase, seconds in timer.phases.items():
+        comparable_phase_seconds.observe(seconds, phase=phase)
+    headers = {"Server-Timing": server_timing(timer.phases)} if debug or SERVER_TIMING else None
+    return Response(body, media_type="application/json", headers=headers)
+
+@app.post("/comparable/batch")
+def find_comparables_batch(inputs: List[PropertyInput], n: int = 5, normalization: str = "minmax"):
+    """Find comparables for many subjects, streamed back as NDJSON (one line per subject).
+    
+    normalization uses global statistics for every subject in the batch.
+    """
+    check_normalization(normalization, "global")
+    snapshot = store.snapshot()
+    if not snapshot.records:
+        raise HTTPException(status_code=404, detail="No property data available")
+    subjects = [subject.dict() for subject in inputs]
+    field_stats = None
+    if normalization != "minmax":
+        field_stats = normalization_for(snapshot.normalization_stats(), normalization)
+    
+    def lines():
+        results = batch_comparable_search(
+            subjects, snapshot.records, n,
+            columns=snapshot.columns, minmax=snapshot.minmax, normalization=field_stats
+        )
+        for i, (subject, comparables) in enumerate(zip(subjects, results)):
+            yield json.dumps({"index": i, "subject": subject, "comparables": comparables}) + "\n"
+    
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+@app.get("/cache/stats")
+def cache_stats():
+    """Hit/miss statistics for the /comparable result cache"""
+    return result_cache.stats()
+
+@app.get("/metrics")
+def metrics_endpoint():
+    """Service metrics in the Prometheus text format"""
+    return PlainTextResponse(metrics.render(), media_type=CONTENT_TYPE)
 
 @app.get("/health")
 def health_check():
@@ -124,4 +328,14 @@ def health_check():
     return {"status": "healthy", "service": "starboard-api"}
 
 if __name__ == "__main__":
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+    parser = argparse.ArgumentParser(description="Run the Starboard API server")
+    parser.add_argument("--host", default=os.getenv("API_HOST", "0.0.0.0"))
+    parser.add_argument("--port", type=int, default=int(os.getenv("API_PORT", 8000)))
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Uvicorn worker processes; each maps the same columnar cache")
+    args = parser.parse_args()
+    if args.workers > 1:
+        # Multiple workers need an import string so each process builds its own app
+        uvicorn.run("main:app", host=args.host, port=args.port, workers=args.workers)
+    else:
+        uvicorn.run(app, host=args.host, port=args.port)
@@ -3,11 +3,25 @@
 Setup script to initialize the Starboard data pipeline
 """
 
+import argparse
+import json
 import os
 import sys
 import subprocess
+import tempfile
+import time
+from datetime import datetime
 from pathlib import Path
 
+# Exit status of the validate stage when the error rate gate trips
+# (app.data_extraction.validate.GATE_EXIT_CODE)
+VALIDATION_GATE_EXIT_CODE = 2
+
+# Per-stage resource report written by run_data_pipeline, and where
+# --cprofile puts each stage's cProfile stats
+PIPELINE_REPORT_PATH = "data/logs/pipeline_report.json"
+PROFILE_DIR = "data/logs/profiles"
+
 def create_directories():
     """Create necessary data directories"""
     dirs = [
@@ -20,15 +34,86 @@ def create_directories():
         Path(dir_path).mkdir(parents=True, exist_ok=True)
         print(f"✓ Created directory: {dir_path}")
 
-def run_data_pipeline():
-    """Run the complete data processing pipeline"""
+def run_stage(module, stages, cprofile=False, trace_memory=False, argv=()):
+    """Run one stage (with arguments argv) in a subprocess under
+    app.data_extraction.profiling and append its resource report to stages.
+    Raises CalledProcessError on failure."""
+    name = module.rsplit(".", 1)[-1]
+    fd, report_path = tempfile.mkstemp(prefix=f"starboard-{name}-", suffix=".json")
+    os.close(fd)
+    cmd = [sys.executable, "-m", "app.data_extraction.profiling", "--report", report_path]
+    if cprofile:
+        cmd += ["--cprofile", os.path.join(PROFILE_DIR, f"{name}.prof")]
+    if trace_memory:
+        cmd.append("--tracemalloc")
+    start = time.perf_counter()
+    try:
+        subprocess.run(cmd + [module] + list(argv), check=True)
+    finally:
+        try:
+            with open(report_path, "r") as f:
+                stage = json.load(f)
+        except (OSError, ValueError):
+            stage = {"stage": name, "module": module, "status": "failed"}
+        os.remove(report_path)
+        # Includes interpreter start-up and imports, unlike the stage's run_s
+        stage["wall_s"] = time.perf_counter() - start
+        stages.append(stage)
+
+def format_bytes(n):
+    if n is None:
+        return "-"
+    for unit in ("B", "KB", "MB", "GB"):
+        if n < 1024 or unit == "GB":
+            return f"{n:.0f} {unit}" if unit == "B" else f"{n:.1f} {unit}"
+        n /= 1024
+
+def save_pipeline_report(stages, started):
+    """Write the run report and print a per-stage summary"""
+    total = sum(stage["wall_s"] for stage in stages)
+    report = {
+        "started": started.isoformat(),
+        "finished": datetime.now().isoformat(),
+        "total_wall_s": total,
+        "bottleneck": max(stages, key=lambda stage: stage["wall_s"])["stage"] if stages else None,
+        "stages": stages
+    }
+    os.makedirs(os.path.dirname(PIPELINE_REPORT_PATH), exist_ok=True)
+    with open(PIPELINE_REPORT_PATH, "w") as f:
+        json.dump(report, f, indent=2)
+    
+    print(f"\n📋 Stage report ({PIPELINE_REPORT_PATH}):")
+    print(f"   {'stage':<18}{'wall':>9}{'cpu':>9}{'peak RSS':>11}{'records in':>12}{'records out':>13}")
+    for stage in stages:
+        cpu = f"{stage['cpu_s']:.2f}s" if "cpu_s" in stage else "-"
+        records_in = "-" if stage.get("records_in") is None else stage["records_in"]
+        records_out = "-" if stage.get("records_out") is None else stage["records_out"]
+        print(f"   {stage['stage']:<18}{stage['wall_s']:>8.2f}s{cpu:>9}{format_bytes(stage.get('peak_rss_bytes')):>11}"
+              f"{records_in:>12}{records_out:>13}")
+    if stages and total:
+        slowest = max(stages, key=lambda stage: stage["wall_s"])
+        print(f"🐢 Slowest stage: {slowest['stage']} ({slowest['wall_s'] / total:.0%} of pipeline time)")
+
+def run_data_pipeline(cprofile=False, trace_memory=False, workers=1):
+    """Run the complete data processing pipeline.
+    
+    Each stage's wall and CPU time, peak memory, record counts and bytes
+    read/written go to PIPELINE_REPORT_PATH; cprofile also dumps
+    cProfile stats per stage to PROFILE_DIR, and trace_memory tracks the
+    peak Python heap with tracemalloc. With workers > 1 the filter and
+    validate stages split their columnar input across that many processes.
+    """
+    stages = []
+    started = datetime.now()
+    options = {"cprofile": cprofile, "trace_memory": trace_memory}
+    sharded = {**options, "argv": ["--workers", str(workers)]}
     
     print("\n🚀 Starting Starboard data pipeline...")
     
     # Step 1: Fetch data
     print("\n📥 Step 1: Fetching property data...")
     try:
-        subprocess.run([sys.executable, "app/data_extraction/fetch.py"], check=True)
+        run_stage("app.data_extraction.fetch", stages, **options)
         print("✓ Data fetching completed")
     except subprocess.CalledProcessError as e:
         print(f"⚠️ Data fetching failed: {e}")
@@ -36,7 +121,7 @@ def run_data_pipeline():
     # Step 2: Filter industrial properties
     print("\n🏭 Step 2: Filtering industrial properties...")
     try:
-        subprocess.run([sys.executable, "app/data_extraction/filter_industrial.py"], check=True)
+        run_stage("app.data_extraction.filter_industrial", stages, **sharded)
         print("✓ Industrial filtering completed")
     except subprocess.CalledProcessError as e:
         print(f"⚠️ Industrial filtering failed: {e}")
@@ -44,23 +129,91 @@ def run_data_pipeline():
     # Step 3: Validate data
     print("\n✅ Step 3: Validating property data...")
     try:
-        subprocess.run([sys.executable, "app/data_extraction/validate.py"], check=True)
+        run_stage("app.data_extraction.validate", stages, **sharded)
         print("✓ Data validation completed")
     except subprocess.CalledProcessError as e:
+        if e.returncode == VALIDATION_GATE_EXIT_CODE:
+            print("❌ Too many invalid records (VALIDATION_MAX_ERROR_RATE); stopping the pipeline")
+            save_pipeline_report(stages, started)
+            return
         print(f"⚠️ Data validation failed: {e}")
     
     # Step 4: Flag outliers
     print("\n📊 Step 4: Flagging outliers...")
     try:
-        subprocess.run([sys.executable, "app/data_extraction/flag_outliers.py"], check=True)
+        run_stage("app.data_extraction.flag_outliers", stages, **options)
         print("✓ Outlier flagging completed")
     except subprocess.CalledProcessError as e:
         print(f"⚠️ Outlier flagging failed: {e}")
     
+    # Step 5: Normalization statistics
+    print("\n📐 Step 5: Computing normalization statistics...")
+    try:
+        run_stage("app.data_extraction.stats", stages, **options)
+        print("✓ Normalization statistics completed")
+    except subprocess.CalledProcessError as e:
+        print(f"⚠️ Normalization statistics failed: {e}")
+    
+    save_pipeline_report(stages, started)
     print("\n🎉 Data pipeline completed successfully!")
 
+def run_streaming_pipeline():
+    """Run all stages in-process as chained generators over NDJSON"""
+    from app.data_extraction.stream import run_streaming_pipeline as run_stream
+    from app.data_extraction.validate import ValidationGateError
+    
+    print("\n🚀 Starting Starboard streaming data pipeline...")
+    try:
+        counts = run_stream()
+    except ValidationGateError as e:
+        print(f"❌ Too many invalid records ({e}); stopping the pipeline")
+        return
+    print(f"✓ Fetched {counts['raw']} records")
+    print(f"✓ Kept {counts['industrial']} industrial properties")
+    print(f"✓ Validated {counts['valid']} records ({counts['validation_errors']} errors logged)")
+    print(f"✓ Flagged outliers on {counts['flagged']} records")
+    print("\n🎉 Streaming data pipeline completed successfully!")
+
+def run_dag_pipeline(fetch_data=True, force=False):
+    """Run the stages in-process as a DAG, skipping up-to-date stages"""
+    from app.data_extraction.validate import ValidationGateError
+    from app.pipeline import run_pipeline as run_dag
+    
+    print("\n🚀 Starting Starboard data pipeline (in-process DAG)...")
+    start = time.perf_counter()
+    results = run_dag(fetch_data=fetch_data, force=force)
+    icons = {"ran": "✓", "skipped": "⏭️", "failed": "❌", "cancelled": "⏹️"}
+    for name, result in results.items():
+        seconds = f" in {result['seconds']:.3f}s" if "seconds" in result else ""
+        print(f"{icons[result['status']]} {name}: {result['status']}{seconds}")
+    failures = [(name, result["error"]) for name, result in results.items() if result["status"] == "failed"]
+    for name, error in failures:
+        if isinstance(error, ValidationGateError):
+            print(f"❌ Too many invalid records ({error}); stopping the pipeline")
+        else:
+            print(f"⚠️ Stage {name} failed: {error}")
+    if not failures:
+        print(f"\n🎉 Data pipeline completed in {time.perf_counter() - start:.3f}s")
+
 def main():
     """Main setup function"""
+    parser = argparse.ArgumentParser(description="Initialize the Starboard data pipeline")
+    parser.add_argument("--stream", action="store_true",
+                        help="Run stages in-process as a streaming NDJSON pipeline")
+    parser.add_argument("--dag", action="store_true",
+                        help="Run stages in-process as a DAG, skipping stages whose inputs and code are unchanged")
+    parser.add_argument("--no-fetch", action="store_true",
+                        help="With --dag, reuse the existing raw records instead of fetching")
+    parser.add_argument("--force", action="store_true",
+                        help="With --dag, rerun every stage even if it is up to date")
+    parser.add_argument("--cprofile", action="store_true",
+                        help=f"Dump cProfile stats for each stage to {PROFILE_DIR}")
+    parser.add_argument("--tracemalloc", action="store_true",
+                        help="Record each stage's peak Python heap (slower)")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Processes for the filter and validate stages (default 1)")
+    args = parser.parse_args()
+    
     print("🌟 Starboard Industrial Property Comparables Setup")
     print("=" * 50)
     
@@ -68,7 +221,12 @@ def main():
     create_directories()
     
     # Run data pipeline
-    run_data_pipeline()
+    if args.stream:
+        run_streaming_pipeline()
+    elif args.dag:
+        run_dag_pipeline(fetch_data=not args.no_fetch, force=args.force)
+    else:
+        run_data_pipeline(cprofile=args.cprofile, trace_memory=args.tracemalloc, workers=args.workers)
     
     print("\n" + "=" * 50)
     print("🎯 Setup complete! You can now:")
@@ -111,6 +111,24 @@ def test_api_server():
             return False
             
         print(f"✅ API server running, found {data['count']} properties")
+        
+        # Page through with the cursor
+        pages, cursor = [], None
+        while True:
+            params = {"limit": 2, **({"cursor": cursor} if cursor else {})}
+            page = requests.get("http://localhost:8000/properties", params=params, timeout=5).json()
+            pages.extend(p["id"] for p in page["properties"])
+            cursor = page["next_cursor"]
+            if not cursor:
+                break
+        if pages != [p["id"] for p in data["properties"]]:
+            print("❌ Cursor pages do not add up to the unpaged listing")
+            return False
+        
+        response = requests.get("http://localhost:8000/properties", params={"format": "xml"}, timeout=5)
+        if response.status_code != 400:
+            print(f"❌ Unknown format returned {response.status_code}")
+            return False
     except Exception as e:
         print(f"❌ Properties endpoint error: {e}")
         return False
@@ -188,6 +206,1123 @@ def test_cli():
     
     return True
 
+def test_batch_scoring():
+    """Test that vectorized scoring agrees with the scalar score()"""
+    print("\n🧮 Testing batch scoring...")
+    
+    from app.comparables.discovery import extract_columns
+    from app.comparables.find import get_minmax
+    from app.comparables.score import score, score_batch, SCORE_TOLERANCE
+    from app.data_extraction.fetch import create_sample_data
+    
+    records = create_sample_data()
+    minmax = get_minmax(records)
+    columns = extract_columns(records)
+    
+    for subject in records:
+        batch = score_batch(subject, columns, minmax)
+        expected = [score(subject, candidate, minmax) for candidate in records]
+        diff = max(abs(a - b) for a, b in zip(batch["score"], expected))
+        if diff > SCORE_TOLERANCE:
+            print(f"❌ Batch score differs from scalar score by {diff:.5f}")
+            return False
+    
+    print("✅ Batch scoring matches scalar scoring")
+    return True
+
+def test_missing_values():
+    """Test that missing sizes and years neither skew ranges nor score as similar"""
+    print("\n🕳️ Testing missing sizes and years...")
+    
+    from app.comparables.discovery import extract_columns
+    from app.comparables.find import comparable_search, get_minmax
+    from app.comparables.score import score, score_batch, SCORE_TOLERANCE
+    from app.comparables.store import get_column_minmax
+    from app.data_extraction.fetch import create_sample_data
+    
+    records = create_sample_data()
+    records[1]["year_built"] = None
+    records[2].pop("square_feet")
+    records[3]["square_feet"] = None
+    records[3].pop("year_built")
+    columns = extract_columns(records)
+    minmax = get_minmax(records)
+    
+    known_years = [r["year_built"] for r in records if r.get("year_built") is not None]
+    if minmax != get_column_minmax(columns) or minmax["min_year"] != min(known_years):
+        print(f"❌ Missing values leaked into the ranges: {minmax}")
+        return False
+    
+    for subject in records:
+        batch = score_batch(subject, columns, minmax)
+        expected = [score(subject, candidate, minmax) for candidate in records]
+        if max(abs(a - b) for a, b in zip(batch["score"], expected)) > SCORE_TOLERANCE:
+            print(f"❌ Batch and scalar scores disagree for subject {subject['id']}")
+            return False
+        if subject.get("year_built") is None and batch["year_built"].any():
+            print("❌ A subject without a year scored age similarity")
+            return False
+    batch = score_batch(records[0], columns, minmax)
+    if batch["size"][2] or batch["size"][3] or batch["year_built"][1] or batch["year_built"][3]:
+        print("❌ Candidates without a size or year scored similarity for it")
+        return False
+    
+    # The find.py command-line path works from plain records
+    results = comparable_search(records[3], records, 3)
+    if len(results) != 3:
+        print(f"❌ comparable_search returned {len(results)} results")
+        return False
+    
+    print("✅ Missing sizes and years score zero and are left out of ranges")
+    return True
+
+def test_field_normalization():
+    """Test the batched, per-backend field-name cache used by discovery"""
+    print("\n🏷️ Testing field normalization cache...")
+    
+    import tempfile
+    from app.api_discovery import discover
+    
+    names = ["GBA_TOTAL", "YRBLT", "OWNER_NAME", "PIN14", "GBA_TOTAL"]
+    calls = []
+    
+    def stub_backend(field_names):
+        calls.append(list(field_names))
+        return {"GBA_TOTAL": "square_feet", "YRBLT": "construction_year"}
+    
+    cache_path = discover.NORMALIZATION_CACHE_PATH
+    backend = discover.NORMALIZER_BACKENDS["openai"]
+    with tempfile.TemporaryDirectory() as tmp:
+        discover.NORMALIZATION_CACHE_PATH = os.path.join(tmp, "field_normalization.json")
+        discover.NORMALIZER_BACKENDS["openai"] = stub_backend
+        try:
+            first = discover.normalize_fields(names, "openai")
+            second = discover.normalize_fields(names, "openai")
+            fuzzy = discover.normalize_fields(["GBA_TOTAL"], "fuzzy")
+            cache = discover.load_normalization_cache()
+            with open(discover.NORMALIZATION_CACHE_PATH, "w") as f:
+                json.dump({"GBA_TOTAL": "zoning"}, f)
+            legacy = discover.load_normalization_cache()
+        finally:
+            discover.NORMALIZATION_CACHE_PATH = cache_path
+            discover.NORMALIZER_BACKENDS["openai"] = backend
+    
+    expected = {"GBA_TOTAL": "square_feet", "YRBLT": "construction_year", "OWNER_NAME": "OWNER_NAME",
+                "PIN14": "property_id"}
+    if first != expected or second != expected:
+        print(f"❌ Normalized to {first} then {second}")
+        return False
+    # One batched call for the names the rules cannot map; the unresolved one is retried
+    if calls != [["GBA_TOTAL", "YRBLT", "OWNER_NAME"], ["OWNER_NAME"]]:
+        print(f"❌ Backend calls: {calls}")
+        return False
+    if set(cache) != {"openai"} or fuzzy != {"GBA_TOTAL": "square_feet"}:
+        print(f"❌ Fuzzy guesses were cached or mismatched: {cache}, {fuzzy}")
+        return False
+    # Short synonyms match whole tokens only
+    if discover.fuzzy_normalize(["flat_rate", "zone_cd"]) != {"zone_cd": "zoning"}:
+        print(f"❌ Fuzzy matching of short synonyms: {discover.fuzzy_normalize(['flat_rate', 'zone_cd'])}")
+        return False
+    if legacy:
+        print(f"❌ Flat legacy cache entries were kept: {legacy}")
+        return False
+    
+    print("✅ Authoritative normalizations cached per backend, fuzzy guesses recomputed")
+    return True
+
+def test_result_cache():
+    """Test the /comparable result cache: LRU eviction, TTL, key quantization and reload invalidation"""
+    print("\n🗃️ Testing result cache...")
+    
+    import tempfile
+    from app.comparables.cache import ResultCache, comparable_cache_key
+    from app.comparables.store import PropertyStore
+    
+    cache = ResultCache(maxsize=2, ttl=0.2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    cache.get("a")
+    cache.put("c", 3)  # evicts b, the least recently used
+    lru = [cache.get("a"), cache.get("b"), cache.get("c")]
+    time.sleep(0.3)
+    expired = cache.get("a")
+    stats = cache.stats()
+    if lru != [1, None, 3] or expired is not None:
+        print(f"❌ Cache returned {lru} then {expired} after the TTL")
+        return False
+    if (stats["hits"], stats["misses"], stats["evictions"], stats["size"]) != (3, 2, 1, 1):
+        print(f"❌ Cache stats: {stats}")
+        return False
+    
+    subject = {"latitude": 41.88001, "longitude": -87.63001, "square_feet": 50000, "year_built": 1990, "zoning": "M1"}
+    weights = {"distance": 0.4, "size": 0.3}
+    key = comparable_cache_key(subject, 5, weights, "v1")
+    nearby = comparable_cache_key({**subject, "latitude": 41.880012}, 5, dict(reversed(weights.items())), "v1")
+    distinct = [comparable_cache_key({**subject, "latitude": 41.8801}, 5, weights, "v1"),
+                comparable_cache_key(subject, 10, weights, "v1"),
+                comparable_cache_key(subject, 5, weights, "v2"),
+                comparable_cache_key(subject, 5, weights, "v1", options=("zscore", "global"))]
+    if nearby != key or key in distinct:
+        print("❌ Cache keys do not quantize coordinates or ignore n, version or options")
+        return False
+    
+    reloads = []
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "properties.json")
+        with open(path, "w") as f:
+            json.dump([{"id": "p1"}], f)
+        store = PropertyStore([path])
+        store.add_listener(lambda snapshot: reloads.append(snapshot.version))
+        first = store.snapshot()
+        store.snapshot()
+        with open(path, "w") as f:
+            json.dump([{"id": "p1"}, {"id": "p2"}], f)
+        os.utime(path, (first.mtime + 10, first.mtime + 10))
+        second = store.snapshot()
+    if len(reloads) != 2 or first.version == second.version or len(second) != 2:
+        print(f"❌ Store reloads notified {len(reloads)} times (versions {first.version}, {second.version})")
+        return False
+    
+    print("✅ Result cache evicts, expires and keys on the quantized subject and dataset version")
+    return True
+
+def test_normalization_stats():
+    """Test the vectorized normalization statistics and the robust/zscore strategies per scope"""
+    print("\n📐 Testing normalization statistics...")
+    
+    import numpy as np
+    from app.comparables.score import normalization_for, normalized_similarity
+    from app.data_extraction.stats import QUANTILES, cell_key, compute_stats
+    from app.data_extraction.zoning import zoning_family
+    
+    rng = np.random.default_rng(7)
+    records = []
+    for i in range(400):
+        records.append({
+            "zoning": ["M1-1", "I-1", "M2-2", "PMD 4", "B3-2"][i % 5],
+            "latitude": None if i % 17 == 0 else float(41.7 + rng.random() * 0.4),
+            "longitude": None if i % 17 == 0 else float(-87.9 + rng.random() * 0.3),
+            "square_feet": None if i % 11 == 0 else int(rng.integers(5000, 100000)),
+            "year_built": None if i % 13 == 0 else int(rng.integers(1950, 2024))
+        })
+    records += [{"zoning": "M3-1", "latitude": 41.75, "longitude": -87.75, "square_feet": 9e6, "year_built": 1900}] * 3
+    stats = compute_stats(iter(records))
+    
+    def reference(rows):
+        summary = {}
+        for field in ["square_feet", "year_built"]:
+            v = np.array([r[field] for r in rows if r[field] is not None], dtype=float)
+            summary[field] = {"count": len(v), "min": v.min(), "max": v.max(), "mean": v.mean(), "std": v.std(),
+                              **{f"p{q:02d}": np.percentile(v, q) for q in QUANTILES}}
+        return summary
+    
+    groups = {"global": {"all": records}, "zoning": {}, "cells": {}}
+    for rec in records:
+        if zoning_family(rec["zoning"]):
+            groups["zoning"].setdefault(zoning_family(rec["zoning"]), []).append(rec)
+        if cell_key(rec["latitude"], rec["longitude"]):
+            groups["cells"].setdefault(cell_key(rec["latitude"], rec["longitude"]), []).append(rec)
+    for scope, members in groups.items():
+        computed = {"all": stats["global"]} if scope == "global" else stats[scope]
+        if set(computed) != set(members):
+            print(f"❌ {scope} groups {sorted(computed)}, expected {sorted(members)}")
+            return False
+        for key, rows in members.items():
+            for field, expected in reference(rows).items():
+                if any(not np.isclose(computed[key][field][stat], value) for stat, value in expected.items()):
+                    print(f"❌ {scope} {key} {field}: {computed[key][field]} != {expected}")
+                    return False
+    
+    # M1-1 and I-1 share the light_industrial group; the 3 heavy_industrial rows fall back to global
+    light = normalization_for(stats, "robust", "zoning", {"zoning": "I-1"})
+    heavy = normalization_for(stats, "robust", "zoning", {"zoning": "M3-1"})
+    subject = {"latitude": 41.83, "longitude": -87.72}
+    cell = normalization_for(stats, "zscore", "cell", subject)
+    if (light["square_feet"] != stats["zoning"]["light_industrial"]["square_feet"] or
+            heavy["square_feet"] != stats["global"]["square_feet"] or
+            cell["year_built"] != stats["cells"][cell_key(41.83, -87.72)]["year_built"]):
+        print("❌ normalization_for picked the wrong group")
+        return False
+    
+    field_stats = {"mean": 100.0, "std": 10.0, "p05": 50.0, "p95": 150.0}
+    zscore = normalized_similarity(100, [115, 160, np.nan], field_stats, "zscore")
+    robust = normalized_similarity(100, [125, 1000, 40, np.nan], field_stats, "robust")
+    if not np.allclose(zscore, [0.5, 0.0, 0.0]) or not np.allclose(robust, [0.75, 0.5, 0.5, 0.0]):
+        print(f"❌ zscore similarity {zscore}, robust similarity {robust}")
+        return False
+    
+    print("✅ Group statistics match NumPy per zoning family and cell; strategies normalize as documented")
+    return True
+
+def test_radius_query():
+    """Test that GridIndex radius queries match a brute-force haversine filter"""
+    print("\n📍 Testing radius queries...")
+    
+    import numpy as np
+    from app.comparables.score import EARTH_RADIUS_M, haversine_meters
+    from app.comparables.spatial import GridIndex
+    
+    rng = np.random.default_rng(7)
+    radius = 10000.0
+    centers = np.column_stack([rng.uniform(41.6, 42.0, 20), rng.uniform(-87.9, -87.6, 20)])
+    # Points spread over the area plus rings just inside each query radius
+    lat = [rng.uniform(41.5, 42.1, 20000)]
+    lon = [rng.uniform(-88.0, -87.5, 20000)]
+    for center_lat, center_lon in centers:
+        bearing = rng.uniform(0, 2 * np.pi, 500)
+        angle = rng.uniform(0.999, 1.0, 500) * radius / EARTH_RADIUS_M
+        phi = np.radians(center_lat)
+        ring_lat = np.arcsin(np.sin(phi) * np.cos(angle) + np.cos(phi) * np.sin(angle) * np.cos(bearing))
+        ring_lon = np.radians(center_lon) + np.arctan2(np.sin(bearing) * np.sin(angle) * np.cos(phi),
+                                                       np.cos(angle) - np.sin(phi) * np.sin(ring_lat))
+        lat.append(np.degrees(ring_lat))
+        lon.append(np.degrees(ring_lon))
+    lat, lon = np.concatenate(lat), np.concatenate(lon)
+    lat[::97] = np.nan
+    
+    # Small cells put cell edges close to the radius, where a short span misses points
+    for cell_meters in (10000, 25):
+        index = GridIndex(lat, lon, cell_meters=cell_meters)
+        for center_lat, center_lon in centers:
+            expected = np.flatnonzero(haversine_meters(center_lat, center_lon, lat, lon) <= radius)
+            found = index.query_radius(center_lat, center_lon, radius)
+            if not np.array_equal(found, expected):
+                print(f"❌ {cell_meters} m cells found {len(found)} points, brute force {len(expected)}")
+                return False
+    
+    print("✅ Radius queries match brute-force haversine")
+    return True
+
+def test_property_query():
+    """Test /properties filters and cursor pages against a brute-force scan"""
+    print("\n🔎 Testing property queries...")
+    
+    import numpy as np
+    from app.comparables.discovery import extract_columns
+    from app.comparables.query import QueryIndex, query_rows
+    from app.comparables.spatial import GridIndex
+    from app.data_extraction.flag_outliers import flag_outliers
+    from app.data_extraction.synthetic import generate_parcels
+    
+    records = flag_outliers(generate_parcels(20000, seed=11))
+    for rec in records[::50]:
+        rec["square_feet"] = None
+    columns = extract_columns(records)
+    index = QueryIndex(columns, GridIndex(columns["latitude"], columns["longitude"]))
+    zoning = columns["zoning"][0]
+    lat, lon = np.nanmedian(columns["latitude"]), np.nanmedian(columns["longitude"])
+    
+    queries = [
+        {},
+        {"zonings": [zoning, zoning]},
+        {"zonings": [zoning, "NOPE"], "exclude_outliers": True},
+        {"bbox": (lon - 0.05, lat - 0.05, lon + 0.05, lat + 0.05)},
+        {"max_sqft": 20000},
+        {"min_sqft": 10000, "max_sqft": 30000, "max_year": 1980},
+        {"min_year": 2000, "bbox": (lon - 0.2, lat - 0.2, lon + 0.2, lat + 0.2), "zonings": [zoning]},
+    ]
+    for query in queries:
+        expected = [
+            i for i, rec in enumerate(records)
+            if (query.get("zonings") is None or rec.get("zoning") in query["zonings"])
+            and (query.get("bbox") is None or (rec.get("latitude") is not None and
+                 query["bbox"][0] <= rec["longitude"] <= query["bbox"][2] and
+                 query["bbox"][1] <= rec["latitude"] <= query["bbox"][3]))
+            and all(bound is None or (rec.get(field) is not None and compare(rec[field], bound))
+                    for field, bound, compare in [
+                        ("square_feet", query.get("min_sqft"), lambda v, b: v >= b),
+                        ("square_feet", query.get("max_sqft"), lambda v, b: v <= b),
+                        ("year_built", query.get("min_year"), lambda v, b: v >= b),
+                        ("year_built", query.get("max_year"), lambda v, b: v <= b)])
+            and not (query.get("exclude_outliers") and
+                     (rec.get("size_outlier") or rec.get("age_outlier") or rec.get("location_outlier")))
+        ]
+        # Walk every page with the cursor each page returns
+        found, start = [], 0
+        while start is not None:
+            rows, start = query_rows(columns, index, start, 700, **query)
+            found.extend(rows.tolist())
+        if found != expected:
+            print(f"❌ Query {query} returned {len(found)} rows, brute force {len(expected)}")
+            return False
+    
+    print(f"✅ {len(queries)} filter combinations match a full scan across pages")
+    return True
+
+def test_zoning_families():
+    """Test the table-driven zoning-family classifier"""
+    print("\n🏭 Testing zoning families...")
+    
+    import tempfile
+    import numpy as np
+    from app.data_extraction.columnar import DictionaryColumn
+    from app.data_extraction.zoning import ZoningClassifier, family_column, load_tables, zoning_family
+    
+    expected = {
+        # Cook County: Chicago M districts with bulk suffixes, county I districts, PMDs
+        "M1-2": "light_industrial", "I-1": "light_industrial", "M2": "general_industrial",
+        "M3-3": "heavy_industrial", "PMD 4": "planned_industrial", "PMD-11A": "planned_industrial",
+        # Normalization: case, spacing and [Q]/(T) qualifiers
+        " m1-2 ": "light_industrial", "pmd  11": "planned_industrial", "[Q]M2-1VL": "general_industrial",
+        "(T)MR1-1": "light_industrial",
+        # Dallas and Los Angeles County; M-1.5 must not stop at the M-1 alternative
+        "LI": "light_industrial", "IR": "planned_industrial", "M-1": "light_industrial",
+        "M-1.5": "general_industrial", "CM-1": "commercial_manufacturing",
+        # Codes are matched whole, so look-alikes are not industrial
+        "B3-2": None, "RS-3": None, "PD 12": None, "MX": None, "M4": None, "I-4": None, "LIX": None,
+        "": None, None: None,
+    }
+    actual = {code: zoning_family(code) for code in expected}
+    if actual != expected:
+        print(f"❌ Misclassified: { {c: f for c, f in actual.items() if f != expected[c]} }")
+        return False
+    
+    codes = list(expected)
+    column = DictionaryColumn(np.array([1, -1, 0, 1, 3], dtype=np.int32), ["B3-2", "I-1", "M2", "LI"])
+    if (family_column(codes).tolist() != list(expected.values()) or
+            family_column(column).tolist() != ["light_industrial", None, None, "light_industrial", "light_industrial"]):
+        print("❌ family_column disagrees with zoning_family")
+        return False
+    
+    # A ZONING_CODES_PATH file replaces the built-in tables
+    with tempfile.NamedTemporaryFile("w", suffix=".json", delete=False) as f:
+        json.dump({"houston": {"light_industrial": ["LI-\\d"], "port": ["PORT"]}}, f)
+    try:
+        custom = ZoningClassifier(load_tables(f.name))
+    finally:
+        os.remove(f.name)
+    if [custom.family(code) for code in ["li-2", "PORT", "M1-2"]] != ["light_industrial", "port", None]:
+        print("❌ Custom zoning tables were not applied")
+        return False
+    
+    print("✅ Zoning codes classified into families across counties")
+    return True
+
+def test_outlier_rules():
+    """Test grouped, MAD and spatial outlier rules and the streaming path"""
+    print("\n🚩 Testing outlier rules...")
+    
+    import numpy as np
+    from app.comparables.score import haversine_meters
+    from app.data_extraction.flag_outliers import (
+        LOCATION_RULE, MAD_SCALE, MIN_GROUP_SIZE, flag_outliers, iter_flagged, outlier_bounds
+    )
+    from app.data_extraction.synthetic import generate_parcels
+    
+    records = generate_parcels(4000, seed=13)
+    for rec in records[::40]:
+        rec["square_feet"] = None
+    # A zoning class too small for its own statistics
+    for rec in records[:MIN_GROUP_SIZE - 1]:
+        rec["zoning"] = "TINY"
+    rules = [
+        {"flag": "size_outlier", "field": "square_feet", "method": "zscore", "threshold": 2, "by": "zoning"},
+        {"flag": "age_outlier", "field": "year_built", "method": "iqr", "k": 1.0, "by": "zoning"},
+        {"flag": "mad_outlier", "field": "square_feet", "method": "mad", "threshold": 3.5},
+        {**LOCATION_RULE, "radius_m": 2000, "min_neighbors": 3},
+    ]
+    flagged = flag_outliers([dict(rec) for rec in records], rules)
+    
+    def column(field):
+        return np.array([np.nan if rec.get(field) is None else rec[field] for rec in records], dtype=float)
+    
+    sizes, years = column("square_feet"), column("year_built")
+    zonings = np.array([rec.get("zoning") for rec in records], dtype=object)
+    
+    def grouped(values, check):
+        """check(values, reference) per zoning, small groups against all values"""
+        expected = np.zeros(len(values), dtype=bool)
+        known = ~np.isnan(values)
+        for zoning in set(zonings.tolist()):
+            members = zonings == zoning
+            reference = values[members & known]
+            if len(reference) < MIN_GROUP_SIZE:
+                reference = values[known]
+            expected[members] = check(values[members], reference)
+        return expected & known
+    
+    def zscore(v, ref):
+        return (ref.std() > 0) & (np.abs(v - ref.mean()) / ref.std() > 2)
+    
+    def iqr(v, ref):
+        q1, q3 = np.percentile(ref, [25, 75])
+        return (v < q1 - (q3 - q1)) | (v > q3 + (q3 - q1))
+    
+    known = sizes[~np.isnan(sizes)]
+    median = np.median(known)
+    mad = np.median(np.abs(known - median))
+    expected = {
+        "size_outlier": grouped(sizes, zscore),
+        "age_outlier": grouped(years, iqr),
+        "mad_outlier": ~np.isnan(sizes) & (MAD_SCALE * np.abs(sizes - median) / mad > 3.5),
+    }
+    lat, lon = column("latitude"), column("longitude")
+    neighbors = np.array([
+        np.sum(haversine_meters(a, b, lat, lon) <= 2000) - 1 if not np.isnan(a) else 3
+        for a, b in zip(lat, lon)
+    ])
+    expected["location_outlier"] = neighbors < 3
+    
+    for flag, values in expected.items():
+        found = np.array([rec[flag] for rec in flagged])
+        if not np.array_equal(found, values):
+            print(f"❌ {flag} differs from the reference on {int((found != values).sum())} records")
+            return False
+        if not found.any():
+            print(f"❌ The {flag} rule flagged nothing, so it was not exercised")
+            return False
+    
+    bounds = outlier_bounds(iter([dict(rec) for rec in records]), rules)
+    streamed = list(iter_flagged(iter([dict(rec) for rec in records]), bounds, rules))
+    if streamed != flagged:
+        print("❌ Streaming flags differ from the in-memory flags")
+        return False
+    
+    print("✅ Grouped, MAD and spatial rules match references; streaming matches in-memory")
+    return True
+
+def test_columnar_round_trip():
+    """Test that the columnar cache reads back the records written to JSON"""
+    print("\n🗄️ Testing columnar round trip...")
+    
+    import tempfile
+    from app.data_extraction.columnar import read_records, write_records
+    
+    records = [
+        {"id": "1", "address": None, "square_feet": 5000, "year_built": None},
+        {"id": "2", "address": "1 Main St", "square_feet": 7500.5, "zoning": "M1"},
+        {"id": "3", "square_feet": None, "flags": {"size": True}}
+    ]
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "records.json")
+        write_records(path, records)
+        loaded = read_records(path)
+    
+    if loaded != records:
+        print(f"❌ Columnar copy returned {loaded}")
+        return False
+    
+    print("✅ Null and absent fields survive the columnar cache")
+    return True
+
+def test_concurrent_fetch():
+    """Test the concurrent fetcher against a local stub Socrata server"""
+    print("\n📥 Testing concurrent fetch...")
+    
+    import threading
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+    from urllib.parse import urlparse, parse_qs
+    from app.data_extraction.fetch import fetch_all_concurrent
+    
+    rows = [{"id": str(i)} for i in range(2500)]
+    throttled = set()
+    
+    class StubHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            query = parse_qs(urlparse(self.path).query)
+            offset, limit = int(query["$offset"][0]), int(query["$limit"][0])
+            if offset not in throttled:
+                # Throttle the first request for every page
+                throttled.add(offset)
+                self.send_response(429)
+                self.send_header("Retry-After", "0")
+                self.end_headers()
+                return
+            body = json.dumps(rows[offset:offset + limit]).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        
+        def log_message(self, *args):
+            pass
+    
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        records = fetch_all_concurrent(
+            api_url=f"http://127.0.0.1:{server.server_port}/resource/stub.json",
+            workers=4, batch_size=1000, max_records=10000, requests_per_minute=60000
+        )
+    finally:
+        server.shutdown()
+        server.server_close()
+    
+    if records != rows:
+        print(f"❌ Concurrent fetch returned {len(records)} of {len(rows)} records")
+        return False
+    
+    print("✅ Concurrent fetch retrieved all records in order")
+    return True
+
+def test_resumable_fetch():
+    """Test checkpoint resume and incremental merge against a stub Socrata server"""
+    print("\n⏯️ Testing resumable and incremental fetch...")
+    
+    import shutil
+    import threading
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+    from urllib.parse import urlparse, parse_qs
+    from app.data_extraction import fetch
+    
+    # :updated_at is not in :id order, and many rows share a timestamp
+    rows = [{":id": f"row-{i:04d}", "value": i, ":updated_at": f"2024-01-{1 + (i * 7) % 20:02d}T00:00:00"}
+            for i in range(2500)]
+    failing = {1000}
+    requested = []
+    
+    class StubHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            query = parse_qs(urlparse(self.path).query)
+            offset, limit = int(query["$offset"][0]), int(query["$limit"][0])
+            requested.append(offset)
+            if offset in failing:
+                self.send_response(404)
+                self.end_headers()
+                return
+            order = [field.strip() for field in query["$order"][0].split(",")]
+            selected = sorted(rows, key=lambda r: tuple(r[field] for field in order))
+            where = query.get("$where", [None])[0]
+            if where:
+                watermark = where.split("'")[1]
+                selected = [r for r in selected if r[":updated_at"] >= watermark]
+            body = json.dumps(selected[offset:offset + limit]).encode()
+            self.send_response(200)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        
+        def log_message(self, *args):
+            pass
+    
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    dataset_id = "resume-stub"
+    options = {"api_url": f"http://127.0.0.1:{server.server_port}/resource/{dataset_id}.json",
+               "dataset_id": dataset_id, "workers": 1, "batch_size": 500, "requests_per_minute": 60000}
+    try:
+        try:
+            fetch.fetch_resumable(**options)
+            print("❌ A failing page did not raise")
+            return False
+        except fetch.PageFetchError:
+            pass
+        failing.clear()
+        requested.clear()
+        first = fetch.fetch_resumable(**options)
+        if requested[0] != 1000:
+            print(f"❌ Rerun started at offset {requested[0]} instead of resuming at 1000")
+            return False
+        if sorted(r[":id"] for r in first) != sorted(r[":id"] for r in rows):
+            print(f"❌ Resumed fetch returned {len(first)} of {len(rows)} rows")
+            return False
+        
+        # Truncated incremental run: the rest is picked up by the next one
+        watermark = fetch.load_checkpoint(dataset_id)["watermark"]
+        for i in (3, 10, 2400):
+            rows[i] = {**rows[i], "value": -i, ":updated_at": "2024-02-01T00:00:00"}
+        rows.append({":id": "row-9999", "value": 9999, ":updated_at": watermark})
+        cache = [{k: v for k, v in r.items() if k != ":id"} for r in first[:3]] + first
+        changed = fetch.fetch_resumable(incremental=True, max_records=3, **options)
+        merged = fetch.merge_records(cache, changed)
+        changed = fetch.fetch_resumable(incremental=True, **options)
+        merged = fetch.merge_records(merged, changed)
+    finally:
+        server.shutdown()
+        server.server_close()
+        shutil.rmtree(fetch.checkpoint_dir(dataset_id), ignore_errors=True)
+    
+    keyed = {r[":id"]: r for r in merged if ":id" in r}
+    if keyed != {r[":id"]: r for r in rows}:
+        print("❌ Incremental runs missed or duplicated changed rows")
+        return False
+    if len(merged) != len(rows) + 3:
+        print(f"❌ Cached rows without an id were collapsed: {len(merged)} rows")
+        return False
+    
+    print("✅ Fetch resumed from its checkpoint and incremental runs merged every change")
+    return True
+
+def test_catalog_revalidation():
+    """Test ETag revalidation of the catalog and the hash skip of unchanged datasets"""
+    print("\n🗂️ Testing catalog revalidation...")
+    
+    import shutil
+    import tempfile
+    import threading
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+    from app.api_discovery import discover
+    
+    catalog = {"etag": '"v1"', "datasets": [
+        {"id": "stub-zon", "name": "Zoning Districts", "columns": [{"fieldName": "zone_class"}]},
+        {"id": "stub-prop", "name": "Property Sales", "columns": [{"fieldName": "pin"}, {"fieldName": "sale_price"}]},
+        {"id": "stub-crime", "name": "Crimes", "columns": [{"fieldName": "case_number"}]},
+    ]}
+    validators = []
+    
+    class StubHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            validators.append(self.headers.get("If-None-Match"))
+            if self.headers.get("If-None-Match") == catalog["etag"]:
+                self.send_response(304)
+                self.end_headers()
+                return
+            body = json.dumps(catalog["datasets"]).encode()
+            self.send_response(200)
+            self.send_header("ETag", catalog["etag"])
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        
+        def log_message(self, *args):
+            pass
+    
+    probed = []
+    refreshes = []
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    saved = (discover.COOK_COUNTY_API_URL, discover.CATALOG_CACHE_PATH, discover.SCHEMA_DIR,
+             discover.detect_rate_limits, discover.discover_sources, os.environ.get("FIELD_NORMALIZER"))
+    tmp = tempfile.mkdtemp()
+    runs = []
+    try:
+        discover.COOK_COUNTY_API_URL = f"http://127.0.0.1:{server.server_port}/catalog"
+        discover.CATALOG_CACHE_PATH = os.path.join(tmp, "catalog.json")
+        discover.SCHEMA_DIR = tmp
+        discover.detect_rate_limits = lambda dataset_id, probe=None: probed.append(dataset_id) or {}
+        discover.discover_sources = lambda refresh=True, sources=None: refreshes.append(refresh)
+        os.environ["FIELD_NORMALIZER"] = "fuzzy"
+        for change in [None, None, "stub-prop"]:
+            if change:
+                catalog["etag"] = '"v2"'
+                catalog["datasets"][1]["columns"].append({"fieldName": "year_built"})
+            probed.clear()
+            discover.main()
+            runs.append(sorted(probed))
+        schema = discover.load_metadata("stub-prop")
+    finally:
+        (discover.COOK_COUNTY_API_URL, discover.CATALOG_CACHE_PATH, discover.SCHEMA_DIR,
+         discover.detect_rate_limits, discover.discover_sources, normalizer) = saved
+        if normalizer is None:
+            os.environ.pop("FIELD_NORMALIZER", None)
+        else:
+            os.environ["FIELD_NORMALIZER"] = normalizer
+        server.shutdown()
+        server.server_close()
+        shutil.rmtree(tmp)
+    
+    if validators != [None, '"v1"', '"v1"']:
+        print(f"❌ Catalog requests sent If-None-Match {validators}")
+        return False
+    # Unchanged catalog: nothing processed; changed catalog: only the edited dataset
+    if runs != [["stub-prop", "stub-zon"], [], ["stub-prop"]]:
+        print(f"❌ Datasets processed per run: {runs}")
+        return False
+    if refreshes != [True, False, True]:
+        print(f"❌ Ingestion sources refreshed per run: {refreshes}")
+        return False
+    if [field["original"] for field in schema.get("fields", [])] != ["pin", "sale_price", "year_built"]:
+        print(f"❌ Schema not rewritten for the changed dataset: {schema}")
+        return False
+    
+    print("✅ Catalog revalidated with its ETag; only changed datasets were reprocessed")
+    return True
+
+def test_source_ingestion():
+    """Test the source adapters, per-host gating and source discovery against a stub server"""
+    print("\n🔌 Testing source ingestion...")
+    
+    import shutil
+    import tempfile
+    import threading
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+    from urllib.parse import urlparse, parse_qs
+    from app.api_discovery import discover
+    from app.data_extraction import fetch
+    from app.data_extraction.sources import ingest
+    
+    socrata_rows = [{"pin": str(i), "sqft": str(1000 + i)} for i in range(2300)]
+    arcgis_rows = [{"attributes": {"PARCEL": f"A{i}", "SQFT": 2000 + i}, "geometry": {"x": -118.2, "y": 34.0 + i / 1000}}
+                   for i in range(700)]
+    csv_body = "APN,SQFT\n" + "".join(f"D{i},{3000 + i}\n" for i in range(300))
+    requested = []
+    in_flight = [0, 0]  # current, peak
+    lock = threading.Lock()
+    
+    class StubHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            url = urlparse(self.path)
+            query = {k: v[0] for k, v in parse_qs(url.query).items()}
+            with lock:
+                requested.append(url.path)
+                in_flight[0] += 1
+                in_flight[1] = max(in_flight[1], in_flight[0])
+            time.sleep(0.02)
+            with lock:
+                in_flight[0] -= 1
+            if url.path == "/resource/stub-soc.json":
+                offset, limit = int(query.get("$offset", 0)), int(query["$limit"])
+                body = json.dumps(socrata_rows[offset:offset + limit])
+            elif url.path == "/api/views/stub-soc.json":
+                body = json.dumps({"name": "Stub Socrata", "columns": [{"fieldName": "pin"}, {"fieldName": "sqft"}]})
+            elif url.path == "/arcgis/FeatureServer/0/query":
+                offset, limit = int(query.get("resultOffset", 0)), int(query["resultRecordCount"])
+                body = json.dumps({"features": arcgis_rows[offset:offset + limit]})
+            elif url.path == "/arcgis/FeatureServer/0":
+                body = json.dumps({"name": "Stub layer", "fields": [{"name": "PARCEL"}, {"name": "SQFT"}]})
+            elif url.path == "/dallas.csv":
+                body = csv_body
+            else:
+                self.send_response(404)
+                self.end_headers()
+                return
+            body = body.encode()
+            self.send_response(200)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        
+        def log_message(self, *args):
+            pass
+    
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_port}"
+    configs = [
+        {"name": "soc", "type": "socrata", "url": f"{base}/resource/stub-soc.json", "schema": "stub-soc",
+         "batch_size": 500, "workers": 4},
+        {"name": "agol", "type": "arcgis", "url": f"{base}/arcgis/FeatureServer/0", "schema": "stub-arcgis",
+         "batch_size": 200, "workers": 4},
+        {"name": "dallas", "type": "csv", "url": f"{base}/dallas.csv", "schema": "stub-csv"},
+    ]
+    mappings = {"stub-soc": ("pin", "sqft"), "stub-arcgis": ("PARCEL", "SQFT"), "stub-csv": ("APN", "SQFT")}
+    os.makedirs(fetch.SCHEMA_DIR, exist_ok=True)
+    for schema_id, (id_field, size_field) in mappings.items():
+        with open(os.path.join(fetch.SCHEMA_DIR, f"{schema_id}.json"), "w") as f:
+            json.dump({"rate_limits": {"requests_per_minute": 60000}, "fields_of_interest": [
+                {"original": id_field, "normalized": "property_id"},
+                {"original": size_field, "normalized": "square_feet"}
+            ]}, f)
+    schema_dir = discover.SCHEMA_DIR
+    tmp = tempfile.mkdtemp()
+    try:
+        results = ingest(configs, max_concurrency=2)
+        peak = in_flight[1]
+        
+        # Discovery writes its schema files to a scratch directory
+        discover.SCHEMA_DIR = tmp
+        described = []
+        for refresh, sources in [(False, configs), (False, configs),
+                                 (False, configs[:2] + [{**configs[2], "max_records": 10}]), (True, configs)]:
+            requested.clear()
+            discover.discover_sources(refresh=refresh, sources=sources)
+            # The CSV source is also fetched again as its rate-limit probe
+            described.append(sorted(set(requested) &
+                                    {"/api/views/stub-soc.json", "/arcgis/FeatureServer/0", "/dallas.csv"}))
+    finally:
+        discover.SCHEMA_DIR = schema_dir
+        server.shutdown()
+        server.server_close()
+        shutil.rmtree(tmp)
+        for schema_id in mappings:
+            os.remove(os.path.join(fetch.SCHEMA_DIR, f"{schema_id}.json"))
+            if os.path.exists(fetch.export_path(schema_id, "csv")):
+                os.remove(fetch.export_path(schema_id, "csv"))
+    
+    expected = {
+        "soc": [{"id": f"soc:{r['pin']}", "square_feet": int(r["sqft"]), "source": "soc"} for r in socrata_rows],
+        "agol": [{"id": f"agol:{r['attributes']['PARCEL']}", "square_feet": r["attributes"]["SQFT"],
+                  "latitude": r["geometry"]["y"], "longitude": r["geometry"]["x"], "source": "agol"} for r in arcgis_rows],
+        "dallas": [{"id": f"dallas:D{i}", "square_feet": 3000 + i, "source": "dallas"} for i in range(300)],
+    }
+    for name, records in expected.items():
+        if results[name]["error"] or results[name]["records"] != records:
+            print(f"❌ Source {name} returned {len(results[name]['records'])} records ({results[name]['error']})")
+            return False
+    if peak > 2:
+        print(f"❌ {peak} requests in flight to one host with a limit of 2")
+        return False
+    all_sources = ["/api/views/stub-soc.json", "/arcgis/FeatureServer/0", "/dallas.csv"]
+    if described != [all_sources, [], ["/dallas.csv"], all_sources]:
+        print(f"❌ Sources described per discovery run: {described}")
+        return False
+    
+    print("✅ Adapters fetched every source within the host limit; discovery skipped unchanged sources")
+    return True
+
+def test_bulk_download():
+    """Test bulk CSV/GeoJSON export download against a local stub server"""
+    print("\n📦 Testing bulk export download...")
+    
+    import threading
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+    from app.data_extraction import fetch
+    
+    rows = [{"PIN": str(i), "SQFT": f"{50000 + i}", "ZONE": "M1", "ADDR": f"{i} Main St,\nChicago"} for i in range(500)]
+    csv_body = "PIN,SQFT,ZONE,ADDR\n" + "".join(f'{r["PIN"]},{r["SQFT"]},{r["ZONE"]},"{r["ADDR"]}"\n' for r in rows)
+    geojson_body = json.dumps({
+        "type": "FeatureCollection",
+        "name": "features",
+        "features": [
+            {"type": "Feature", "properties": {"PIN": r["PIN"], "SQFT": r["SQFT"], "ZONE": r["ZONE"]},
+             "geometry": {"type": "Point", "coordinates": [-87.6 - int(r["PIN"]) / 1000, 41.8]}}
+            for r in rows
+        ]
+    })
+    
+    class StubHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            body = (csv_body if ".csv" in self.path else geojson_body).encode()
+            self.send_response(200)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        
+        def log_message(self, *args):
+            pass
+    
+    schema_path = os.path.join(fetch.SCHEMA_DIR, "bulk-stub.json")
+    os.makedirs(fetch.SCHEMA_DIR, exist_ok=True)
+    with open(schema_path, "w") as f:
+        json.dump({"fields_of_interest": [
+            {"original": "PIN", "normalized": "property_id"},
+            {"original": "SQFT", "normalized": "square_feet"},
+            {"original": "ZONE", "normalized": "zoning"},
+            {"original": "ADDR", "normalized": "address"}
+        ]}, f)
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        base = f"http://127.0.0.1:{server.server_port}/resource/bulk-stub"
+        csv_records = list(fetch.fetch_bulk(base + ".csv", "bulk-stub", "csv", requests_per_minute=60000))
+        geo_records = list(fetch.fetch_bulk(base + ".geojson", "bulk-stub", "geojson", requests_per_minute=60000))
+        # Decode features across many chunk boundaries
+        small_chunks = list(fetch.iter_geojson_features(fetch.export_path("bulk-stub", "geojson"), chunk_size=97))
+    finally:
+        server.shutdown()
+        server.server_close()
+        os.remove(schema_path)
+        for fmt in ("csv", "geojson"):
+            os.remove(fetch.export_path("bulk-stub", fmt))
+    
+    expected = [{"id": r["PIN"], "square_feet": int(r["SQFT"]), "zoning": r["ZONE"], "address": r["ADDR"]} for r in rows]
+    if csv_records != expected:
+        print(f"❌ CSV export parsed {len(csv_records)} of {len(rows)} records correctly")
+        return False
+    if [{k: rec[k] for k in ("id", "square_feet", "zoning")} for rec in geo_records] != \
+            [{k: rec[k] for k in ("id", "square_feet", "zoning")} for rec in expected] or \
+            geo_records[1]["longitude"] != -87.601 or len(small_chunks) != len(rows):
+        print(f"❌ GeoJSON export parsed {len(geo_records)} of {len(rows)} records correctly")
+        return False
+    
+    print("✅ Bulk CSV and GeoJSON exports parsed and mapped")
+    return True
+
+def test_metrics():
+    """Test the Prometheus rendering and comparable phase timings"""
+    print("\n📈 Testing metrics...")
+    
+    from app.comparables.find import comparable_search
+    from app.data_extraction.fetch import create_sample_data
+    from app.metrics import MetricsRegistry, PhaseTimer
+    
+    registry = MetricsRegistry()
+    latency = registry.histogram("test_latency_seconds", "Test latency", ["route"], buckets=(0.1, 1))
+    latency.observe(0.05, route="/a")
+    latency.observe(0.5, route="/a")
+    lines = registry.render().splitlines()
+    expected = ['test_latency_seconds_bucket{route="/a",le="0.1"} 1',
+                'test_latency_seconds_bucket{route="/a",le="+Inf"} 2',
+                'test_latency_seconds_count{route="/a"} 2']
+    if not all(line in lines for line in expected) or "# TYPE test_latency_seconds histogram" not in lines:
+        print(f"❌ Unexpected metrics output: {lines}")
+        return False
+    
+    records = create_sample_data()
+    timer = PhaseTimer()
+    comparable_search(records[0], records, 3, timer=timer)
+    if set(timer.phases) != {"score", "sort", "build"} or timer.counts.get("candidates") != len(records):
+        print(f"❌ Unexpected phase timings: {timer.phases} {timer.counts}")
+        return False
+    
+    print("✅ Metrics rendered and search phases timed")
+    return True
+
+def test_stage_profiling():
+    """Test that stage reports measure main() alone"""
+    print("\n⏱️ Testing stage profiling...")
+    
+    import tempfile
+    from app.data_extraction import profiling
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        in_path, out_path = os.path.join(tmp, "in.json"), os.path.join(tmp, "out.json")
+        with open(in_path, "w") as f:
+            json.dump([{"id": str(i), "address": f"{i} Industrial Ave"} for i in range(100000)], f)
+        with open(os.path.join(tmp, "stub_stage.py"), "w") as f:
+            f.write(
+                "import json\n"
+                f"IN_PATH = {in_path!r}\n"
+                f"OUT_PATH = {out_path!r}\n"
+                "def main():\n"
+                "    with open(IN_PATH) as f:\n"
+                "        records = json.load(f)\n"
+                "    with open(OUT_PATH, 'w') as f:\n"
+                "        json.dump(records[:10], f)\n"
+            )
+        sys.path.insert(0, tmp)
+        profiling.STAGE_FILES["stub_stage"] = (["IN_PATH"], ["OUT_PATH"])
+        try:
+            # Memory the process touched before the stage must not count as the stage's peak
+            ballast = bytearray(200 * 1024 * 1024)
+            ballast[::4096] = b"x" * len(ballast[::4096])
+            del ballast
+            report = profiling.profile_stage("stub_stage")
+        finally:
+            sys.path.remove(tmp)
+            del profiling.STAGE_FILES["stub_stage"]
+            sys.modules.pop("stub_stage", None)
+        in_bytes = os.path.getsize(in_path)
+    
+    if (report["records_in"], report["records_out"]) != (100000, 10):
+        print(f"❌ Counted {report['records_in']} records in and {report['records_out']} out")
+        return False
+    if report["bytes_read"] is not None and not in_bytes <= report["bytes_read"] < in_bytes * 1.2:
+        print(f"❌ Reported {report['bytes_read']} bytes read for a {in_bytes} byte input")
+        return False
+    if report["peak_rss_bytes"] is not None and report["peak_rss_bytes"] > 150 * 1024 * 1024:
+        print(f"❌ Peak RSS {report['peak_rss_bytes']} includes memory used before the stage")
+        return False
+    
+    print("✅ Bytes read and peak RSS cover the stage alone")
+    return True
+
+def test_column_validation():
+    """Test the column-wise validator against the row-wise rules"""
+    print("\n🧾 Testing column-wise validation...")
+    
+    import tempfile
+    from app.data_extraction import validate
+    from app.data_extraction.columnar import columnar_path, load_columnar, write_records
+    
+    odd_values = {
+        "square_feet": [None, "5000", 1000, 1000.5, True, -3, 250000],
+        "year_built": [None, 1899, 1900, 1950.0, "1950", 2100, False, 1987],
+        "address": [None, "", "   ", 0, "12 Dock Rd", ["list"]],
+        "latitude": [None, 91, -90, "41.8", 41.85],
+        "longitude": [None, -181, 180, -87.6],
+    }
+    records = [
+        {field: values[(i * (k + 3)) % len(values)] for k, (field, values) in enumerate(odd_values.items())}
+        for i in range(400)
+    ]
+    for rec in records[::7]:
+        rec.pop("address")
+    
+    expected_rows = [validate.failed_rules(rec) for rec in records]
+    builder = validate.ReportBuilder(max_reported=len(records))
+    for i, (rec, failed) in enumerate(zip(records, expected_rows)):
+        builder.add(i, rec, failed)
+    expected = builder.report()
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "records.json")
+        write_records(path, records)
+        sources = {
+            "records": validate.record_columns(records),
+            "columnar": validate.columnar_columns(load_columnar(columnar_path(path))),
+        }
+        for name, columns in sources.items():
+            valid, report = validate.validate_columns(columns, len(records), max_reported=len(records))
+            if valid.tolist() != [not failed for failed in expected_rows] or report != expected:
+                print(f"❌ Column-wise validation from {name} differs from the row-wise rules")
+                return False
+        
+        # Both paths cap the listed errors per rule and write the same log
+        capped = validate.ReportBuilder(max_reported=3)
+        for i, (rec, failed) in enumerate(zip(records, expected_rows)):
+            capped.add(i, rec, failed)
+        _, report = validate.validate_columns(sources["records"], len(records), max_reported=3)
+        if report != capped.report() or report["rule_counts"] != expected["rule_counts"]:
+            print("❌ Capped batch and streaming reports differ")
+            return False
+        log_path = os.path.join(tmp, "errors.log")
+        validate.save_errors(report, log_path, os.path.join(tmp, "report.json"))
+        with open(log_path, "r") as f:
+            lines = f.read().splitlines()
+    
+    omitted = [line for line in lines if line.endswith("more errors not listed")]
+    if len(lines) != len(report["errors"]) + len(omitted) or \
+            sum(int(line.split(": ")[1].split()[0]) for line in omitted) != \
+            sum(report["rule_counts"].values()) - len(report["errors"]):
+        print("❌ The capped log does not account for every error")
+        return False
+    
+    print("✅ Column-wise and row-wise validation agree, capped logs count every error")
+    return True
+
+def test_dag_pipeline():
+    """Test that the in-process pipeline skips stages that are up to date"""
+    print("\n🔀 Testing DAG pipeline...")
+    
+    import tempfile
+    from app.data_extraction.columnar import write_records
+    from app.data_extraction.synthetic import generate_parcels
+    from app.pipeline import pipeline_paths, run_pipeline
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        state_path = os.path.join(tmp, "pipeline_state.json")
+        paths = pipeline_paths(tmp, tmp)
+        write_records(paths["raw"], generate_parcels(5000, seed=5))
+        first = run_pipeline(fetch_data=False, state_path=state_path, paths=paths)
+        second = run_pipeline(fetch_data=False, state_path=state_path, paths=paths)
+    
+    ran = [name for name, result in first.items() if result["status"] == "ran"]
+    if ran != ["filter_industrial", "validate", "flag_outliers", "stats"]:
+        print(f"❌ First run should run every stage after fetch: {first}")
+        return False
+    if any(result["status"] != "skipped" for result in second.values()):
+        print(f"❌ Second run should skip every stage: {second}")
+        return False
+    
+    print("✅ Unchanged stages skipped on rerun")
+    return True
+
+def test_parallel_stages():
+    """Test that sharded filter/validate write what the single-process stages write"""
+    print("\n🧩 Testing parallel stages...")
+
+    import tempfile
+    import numpy as np
+    from app.data_extraction import validate
+    from app.data_extraction.columnar import read_records, write_records
+    from app.data_extraction.filter_industrial import filter_industrial
+    from app.data_extraction.parallel import parallel_filter_industrial, parallel_validate
+    from app.data_extraction.synthetic import generate_parcels
+
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = {name: os.path.join(tmp, f"{name}.json") for name in ("raw", "industrial", "valid")}
+        write_records(paths["raw"], generate_parcels(5000, seed=3))
+        expected = filter_industrial(read_records(paths["raw"]))
+        count = parallel_filter_industrial(paths["raw"], paths["industrial"], 2)
+        with open(paths["industrial"], "r") as f:
+            if count != len(expected) or json.load(f) != expected or read_records(paths["industrial"]) != expected:
+                print("❌ Parallel filter output differs from filter_industrial")
+                return False
+
+        valid, expected_report = validate.validate_columns(validate.record_columns(expected), len(expected))
+        report = parallel_validate(paths["industrial"], paths["valid"], 2)
+        if report != expected_report:
+            print("❌ Parallel validation report differs from validate_columns")
+            return False
+        if read_records(paths["valid"]) != [expected[i] for i in np.flatnonzero(valid).tolist()]:
+            print("❌ Parallel validation kept different records")
+            return False
+
+    print(f"✅ Sharded stages match: {count} industrial, {report['valid']} valid")
+    return True
+
 def main():
     """Run all tests"""
     print("🧪 Starboard System Tests")
@@ -196,6 +1331,26 @@ def main():
     tests = [
         ("File Structure", test_file_structure),
         ("Data Pipeline", test_data_pipeline),
+        ("Field Normalization", test_field_normalization),
+        ("Catalog Revalidation", test_catalog_revalidation),
+        ("Batch Scoring", test_batch_scoring),
+        ("Missing Values", test_missing_values),
+        ("Result Cache", test_result_cache),
+        ("Normalization Stats", test_normalization_stats),
+        ("Radius Query", test_radius_query),
+        ("Property Query", test_property_query),
+        ("Zoning Families", test_zoning_families),
+        ("Outlier Rules", test_outlier_rules),
+        ("Columnar Round Trip", test_columnar_round_trip),
+        ("Concurrent Fetch", test_concurrent_fetch),
+        ("Resumable Fetch", test_resumable_fetch),
+        ("Bulk Download", test_bulk_download),
+        ("Source Ingestion", test_source_ingestion),
+        ("Metrics", test_metrics),
+        ("Column Validation", test_column_validation),
+        ("Stage Profiling", test_stage_profiling),
+        ("DAG Pipeline", test_dag_pipeline),
+        ("Parallel Stages", test_parallel_stages),
         ("API Server", test_api_server),
         ("CLI Interface", test_cli)
     ]